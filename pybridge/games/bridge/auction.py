@@ -18,10 +18,18 @@
 
 from twisted.spread import pb
 
-from .call import Bid, Pass, Double, Redouble
+from .call import Call, Bid, Pass, Double, Redouble
 from .symbols import Direction
 
 
+_BIDS_MASK = (1 << 35) - 1  # Bids have codes 0..34.
+_PASS_BIT = 1 << Pass().code
+_DOUBLE_BIT = 1 << Double().code
+_REDOUBLE_BIT = 1 << Redouble().code
+
+_LEGAL_CALLS = {}  # Sets of calls, by mask.
+
+
 class Contract(pb.Copyable, pb.RemoteCopy):
     """Represents the result of an auction."""
 
@@ -38,14 +46,7 @@ class Contract(pb.Copyable, pb.RemoteCopy):
 
         # The declarer is the first partner to bid the contract denomination.
         caller = auction.whoCalled(self.bid)
-        partnership = (caller, Direction((caller.value + 2) % 4))
-        # Determine which partner is declarer.
-        for call in auction:
-            if isinstance(call, Bid) and call.strain == self.bid.strain:
-                bidder = auction.whoCalled(call)
-                if bidder in partnership:
-                    self.declarer = bidder
-                    break
+        self.declarer = auction._firstBidders[self.bid.strain, caller.value % 2]
 
         self.doubleBy, self.redoubleBy = None, None
         if auction.currentDouble:
@@ -70,7 +71,13 @@ pb.setUnjellyableForClass(Contract, Contract)
 
 
 class Auction(list):
-    """The auction (bidding phase) of a game of bridge."""
+    """The auction (bidding phase) of a game of bridge.
+
+    The state of the auction (current bid, double and redouble, and the
+    trailing sequence of passes) is updated as each call is made, so that
+    queries do not examine the list of calls. Calls must therefore only be
+    added with makeCall().
+    """
 
 
     def __init__(self, dealer):
@@ -80,10 +87,16 @@ class Auction(list):
         """
         self.dealer = dealer
         self.contract = None
-
-    currentBid = property(lambda self: self._getCurrentCall(Bid))
-    currentDouble = property(lambda self: self._getCurrentCall(Double))
-    currentRedouble = property(lambda self: self._getCurrentCall(Redouble))
+        self.currentBid = None
+        self.currentDouble = None
+        self.currentRedouble = None
+        self._bidder = None  # The position of the current bid.
+        self._passes = 0  # The number of consecutive passes ending the auction.
+        self._lastIndex = [None] * 38  # Index of last occurrence, by call code.
+        # The first position of each partnership to bid each strain,
+        # keyed by (strain, position value % 2).
+        self._firstBidders = {}
+        self._history = []  # The state replaced by each call, for undoCall().
 
 
     def isComplete(self):
@@ -93,8 +106,7 @@ class Auction(list):
         @return: True if bidding is complete, False if not.
         @rtype: bool
         """
-        passes = len([c for c in self[-3:] if isinstance(c, Pass)])
-        return len(self) >= 4 and passes == 3
+        return self._passes >= 3 and len(self) >= 4
 
 
     def isPassedOut(self):
@@ -104,8 +116,7 @@ class Auction(list):
         @return: True if bidding is passed out, False if not.
         @rtype: bool
         """
-        passes = len([call for call in self if isinstance(call, Pass)])
-        return len(self) == 4 and passes == 4
+        return self._passes == 4
 
 
     def makeCall(self, call):
@@ -116,14 +127,72 @@ class Auction(list):
 
         @param call: a candidate call.
         """
-        assert call not in self  # Calls must be distinct.
         assert self.isValidCall(call)
 
+        position = Direction((self.dealer.value + len(self)) % 4)
+        # The key of the first bid of its strain by the partnership, if it is.
+        firstBid = None
+        if isinstance(call, Bid):
+            firstBid = (call.strain, position.value % 2)
+            if firstBid in self._firstBidders:
+                firstBid = None
+            else:
+                self._firstBidders[firstBid] = position
+        self._history.append((self.currentBid, self._bidder, self.currentDouble,
+                              self.currentRedouble, self._passes,
+                              self._lastIndex[call.code], firstBid))
+        self._lastIndex[call.code] = len(self)
         self.append(call)
+
+        if isinstance(call, Pass):
+            self._passes += 1
+        else:
+            self._passes = 0
+            if isinstance(call, Bid):
+                # Bids cancel all preceding doubles and redoubles.
+                self.currentBid, self._bidder = call, position
+                self.currentDouble = self.currentRedouble = None
+            elif isinstance(call, Double):
+                self.currentDouble = call
+            else:
+                self.currentRedouble = call
+
         if self.isComplete() and not self.isPassedOut():
             self.contract = Contract(self)
 
 
+    def undoCall(self):
+        """Takes back the last call, restoring the state of the auction before
+        it was made.
+
+        @return: the call taken back.
+        """
+        if not self:
+            raise IndexError("No call to take back")
+        call = self.pop()
+        (self.currentBid, self._bidder, self.currentDouble, self.currentRedouble,
+         self._passes, self._lastIndex[call.code], firstBid) = self._history.pop()
+        if firstBid is not None:
+            del self._firstBidders[firstBid]
+        self.contract = None
+        return call
+
+
+    def fork(self):
+        """Returns a copy of the auction, to which calls may be made (and taken
+        back) independently.
+
+        @rtype: Auction
+        """
+        auction = Auction.__new__(Auction)
+        auction.extend(self)
+        auction.__dict__.update(self.__dict__)
+        auction._lastIndex = list(self._lastIndex)
+        auction._firstBidders = dict(self._firstBidders)
+        auction._history = list(self._history)
+        return auction
+
+
     def isValidCall(self, call, position=None):
         """Check that call can be made, according to the rules of bidding.
 
@@ -131,53 +200,77 @@ class Auction(list):
         @param position: if specified, the position from which the call is made.
         @return: True if call is available, False if not.
         """
-        # The bidding must not be complete.
-        if self.isComplete():
-            return False
- 
         # Position's turn to play.
         if position and position != self.whoseTurn():
             return False
+        return bool(self.legalCallMask() >> call.code & 1)
+
+
+    def legalCallMask(self):
+        """Returns the calls available to the position on turn, as a mask.
+
+        @return: an integer, with bit (1 << call.code) set for each call
+                 available. If the bidding is complete, no call is available.
+        @rtype: int
+        """
+        # The bidding must not be complete.
+        if self.isComplete():
+            return 0
 
         # A pass is always available.
-        if isinstance(call, Pass):
-            return True
+        mask = _PASS_BIT
 
         # A bid must be greater than the current bid.
-        if isinstance(call, Bid):
-            return not self.currentBid or call > self.currentBid
+        if self.currentBid is None:
+            return mask | _BIDS_MASK
+        mask |= _BIDS_MASK & ~((2 << self.currentBid.code) - 1)
 
-        # Doubles and redoubles only when a bid has been made.
-        if self.currentBid:
-            bidder = self.whoCalled(self.currentBid)
+        # The current bid is from opponents if made an odd number of positions
+        # before turn.
+        byOpponents = (self.dealer.value + len(self) - self._bidder.value) % 2 == 1
 
-            # A double must be made on the current bid from opponents,
-            # with has not been already doubled by partnership.
-            if isinstance(call, Double):
-                opposition = (Direction((self.whoseTurn().value + 1) % 4),
-                              Direction((self.whoseTurn().value + 3) % 4))
-                return bidder in opposition and not self.currentDouble
+        # A double must be made on the current bid from opponents,
+        # with has not been already doubled by partnership.
+        if byOpponents and not self.currentDouble:
+            mask |= _DOUBLE_BIT
 
-            # A redouble must be made on the current bid from partnership,
-            # which has been doubled by an opponent.
-            if isinstance(call, Redouble):
-                partnership = (self.whoseTurn(),
-                               Direction((self.whoseTurn().value + 2) % 4))
-                return bidder in partnership and self.currentDouble \
-                                         and not self.currentRedouble
+        # A redouble must be made on the current bid from partnership,
+        # which has been doubled by an opponent.
+        elif not byOpponents and self.currentDouble and not self.currentRedouble:
+            mask |= _REDOUBLE_BIT
 
-        return False  # Otherwise unavailable.
+        return mask
+
+
+    def legalCalls(self):
+        """Returns the calls available to the position on turn.
+
+        @return: the set of available calls.
+        @rtype: frozenset
+        """
+        mask = self.legalCallMask()
+        calls = _LEGAL_CALLS.get(mask)
+        if calls is None:  # There are few distinct masks: cache their sets.
+            calls = frozenset(Call.fromCode(code) for code in range(38)
+                              if mask >> code & 1)
+            _LEGAL_CALLS[mask] = calls
+        return calls
 
 
     def whoCalled(self, call):
         """Returns the position from which the specified call was made.
         
+        Calls are interned, so a Pass, Double or Redouble may appear more than
+        once in the auction: the position of its most recent occurrence is
+        returned.
+        
         @param call: a call made in the auction.
         @return: the position of the player who made call, or None.
         """
-        if call in self:
-            return Direction((self.dealer.value + self.index(call)) % 4)
-        return None  # Call not made by any player.
+        index = self._lastIndex[call.code]
+        if index is None:
+            return None  # Call not made by any player.
+        return Direction((self.dealer.value + index) % 4)
 
 
     def whoseTurn(self):
@@ -188,20 +281,3 @@ class Auction(list):
         if self.isComplete():
             return None
         return Direction((self.dealer.value + len(self)) % 4)
-
-
-    def _getCurrentCall(self, callclass):
-        """Returns most recent current call of specified class, or None.
-        
-        @param callclass: call class, in (Bid, Pass, Double, Redouble).
-        @return: most recent call matching type, or None.
-        """
-        assert callclass in (Bid, Pass, Double, Redouble)
-
-        for call in reversed(self):
-            if isinstance(call, callclass):
-                return call
-            if isinstance(call, Bid):
-                break  # Bids cancel all preceding calls.
-        return None
-
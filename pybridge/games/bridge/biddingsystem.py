@@ -0,0 +1,471 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+Bidding systems, compiled from their XML definitions.
+
+A bidding system (see pybridge/modules/biddingsystem/) groups its rules in
+contexts. A rule specifies the calls which it covers, the opponent calls after
+which it applies, the registers (hand properties) which it implies, and the
+contexts in scope for partner's response.
+
+The XML is compiled into the rules of each context, indexed by call code, and
+the compiled form is cached on disk beside the XML file. Auctions are then
+interpreted through a trie of AuctionNode objects, keyed by call sequences:
+each node holds the rules matched by its last call, and the constraints on the
+hands implied by all calls to that node. Nodes are built when first visited,
+and are kept for later queries.
+
+A constraint is a mask of the allowed values of a hand property: bit v is set
+if the property may have value v. Constraints are combined with & and |, and
+bounds() gives their range of values. Constraints are keyed by the seats which
+hold the property (as a tuple of call indexes modulo 4, so that the dealer is
+seat 0) and the property name, as in the XML.
+
+A call is interpreted in the contexts opened by the rules which matched
+partner's most recent call, or in the root contexts if no rule matched. A rule
+matches a call if it covers the call, and the preceding call (by right-hand
+opponent) is one of its opponent calls: the first call of the auction follows
+a pass. The 'suit-count' property refers to the strain of the call, or to that
+of the bid which is doubled or redoubled. Registers which give exact values of
+a property are alternatives (Blackwood responses show 0 or 4 aces), and other
+registers all apply. If a call matches several rules, it promises only what is
+common to all of them.
+"""
+
+
+import os
+import pickle
+from xml.etree import ElementTree
+
+from .call import Call, Bid, Pass, Double, Redouble
+from .symbols import Direction, Strain
+
+
+SYSTEMS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+                           os.path.abspath(__file__)))), 'modules', 'biddingsystem')
+
+STANDARD_ENGLISH = os.path.join(SYSTEMS_DIR, 'StandardEnglish.xml')
+
+MAXIMUM = 40  # The greatest value of any hand property.
+
+ANY = (1 << MAXIMUM + 1) - 1  # The constraint allowing all values.
+
+_CACHE_VERSION = 1
+
+_CALLS = {'pass': Pass(), 'double': Double(), 'redouble': Redouble()}
+
+_STRAINS = {'club': Strain.Club, 'diamond': Strain.Diamond,
+            'heart': Strain.Heart, 'spade': Strain.Spade,
+            'notrump': Strain.NoTrump}
+
+_SUIT_PROPERTIES = {Strain.Club: 'club-count', Strain.Diamond: 'diamond-count',
+                    Strain.Heart: 'heart-count', Strain.Spade: 'spade-count'}
+
+# Offsets of the holders of registers, from the seat of the caller.
+_HOLDERS = {'me': (0,), 'partner': (2,), 'us': (0, 2), 'them': (1, 3)}
+
+
+def valueRange(minimum=0, maximum=MAXIMUM):
+    """Returns the constraint allowing values from minimum to maximum.
+
+    @param minimum: the least allowed value.
+    @param maximum: the greatest allowed value.
+    @rtype: int
+    """
+    return (1 << maximum + 1) - (1 << minimum)
+
+
+def bounds(constraint):
+    """Returns the least and greatest values allowed by constraint.
+
+    @param constraint: a mask of allowed values.
+    @return: a (minimum, maximum) tuple, or None if no value is allowed.
+    """
+    if not constraint:
+        return None
+    return (constraint & -constraint).bit_length() - 1, constraint.bit_length() - 1
+
+
+
+
+class Rule:
+    """A compiled rule of a bidding system.
+
+    @ivar name: the name of the rule.
+    @ivar context: the name of the context of the rule.
+    @ivar calls: a mask of the codes of the calls covered by the rule.
+    @ivar opponentCalls: a mask of the codes of the opponent calls after which
+                         the rule applies.
+    @ivar registers: a tuple of (holder, property, constraint) tuples, where
+                     holder is 'me', 'partner', 'us' or 'them'.
+    @ivar responses: the names of the contexts opened for partner's response.
+    """
+
+
+    def __init__(self, name, context, calls, opponentCalls, registers, responses):
+        self.name = name
+        self.context = context
+        self.calls = calls
+        self.opponentCalls = opponentCalls
+        self.registers = registers
+        self.responses = responses
+
+
+    def __repr__(self):
+        return "Rule(%r, %r)" % (self.context, self.name)
+
+
+    def follows(self, call):
+        """Returns True if the rule applies after opponent call."""
+        return bool(self.opponentCalls >> call.code & 1)
+
+
+    def constraints(self, seat, call, bid):
+        """Resolves the registers of the rule, for a call made from seat.
+
+        @param seat: the seat of the caller.
+        @param call: the call made.
+        @param bid: the bid made, doubled or redoubled by call.
+        @return: a dict of constraints, keyed by (seats, property).
+        """
+        constraints = {}
+        for holder, property, constraint in self.registers:
+            if property == 'suit-count':
+                property = bid and _SUIT_PROPERTIES.get(bid.strain)
+                if property is None:
+                    continue  # No suit to count.
+            seats = tuple(sorted((seat + offset) % 4 for offset in _HOLDERS[holder]))
+            key = (seats, property)
+            constraints[key] = constraints.get(key, ANY) & constraint
+        return constraints
+
+
+
+
+class Context:
+    """A compiled context of a bidding system.
+
+    @ivar name: the name of the context.
+    @ivar rules: the rules of the context, in order of definition.
+    @ivar byCall: the rules covering each call, indexed by call code.
+    """
+
+
+    def __init__(self, name, rules):
+        self.name = name
+        self.rules = tuple(rules)
+        self.byCall = tuple(tuple(rule for rule in self.rules if rule.calls >> code & 1)
+                            for code in range(38))
+
+
+
+
+class AuctionNode:
+    """A sequence of calls, interpreted by a bidding system.
+
+    @ivar call: the last call of the sequence, or None at the root.
+    @ivar depth: the number of calls in the sequence.
+    @ivar rules: the rules matched by the last call.
+    @ivar promises: the constraints implied by the last call.
+    @ivar constraints: the constraints implied by all calls of the sequence.
+    """
+
+
+    def __init__(self, system, parent=None, call=None):
+        self.__system = system
+        self.call = call
+        self.children = {}
+        if parent is None:
+            self.depth = 0
+            self.bid = None  # The current bid.
+            self.rules = ()
+            self.promises = {}
+            self.constraints = {}
+            # The contexts opened by the last call from each seat.
+            self.responses = (None, None, None, None)
+            self.acted = (False, False)  # Whether each side has made a bid,
+                                         # double or redouble.
+            return
+
+        seat = parent.depth % 4
+        self.depth = parent.depth + 1
+        self.bid = call if isinstance(call, Bid) else parent.bid
+
+        # When partner's last call matched no rule, only a side which has
+        # not yet called (other than pass) may open or overcall: later calls
+        # of the side are not interpreted.
+        scopes = parent.responses[(seat + 2) % 4]
+        if scopes is None:
+            scopes = () if parent.acted[seat % 2] else system.roots
+        previous = parent.call or Pass()  # The first call follows a pass.
+        rules = []
+        for name in scopes:
+            context = system.contexts.get(name)
+            if context:
+                rules.extend(rule for rule in context.byCall[call.code]
+                             if rule.follows(previous))
+        self.rules = tuple(rules)
+
+        # The promises of the call are those common to all matched rules.
+        self.promises = {}
+        if rules:
+            meanings = [rule.constraints(seat, call, self.bid) for rule in rules]
+            for key in meanings[0]:
+                if all(key in meaning for meaning in meanings):
+                    self.promises[key] = 0
+                    for meaning in meanings:
+                        self.promises[key] |= meaning[key]
+
+        self.constraints = dict(parent.constraints)
+        for key, constraint in self.promises.items():
+            self.constraints[key] = self.constraints.get(key, ANY) & constraint
+
+        acted = list(parent.acted)
+        if not isinstance(call, Pass):
+            acted[seat % 2] = True
+        self.acted = tuple(acted)
+
+        responses = list(parent.responses)
+        if rules:
+            responses[seat] = tuple(dict.fromkeys(name for rule in rules
+                                                  for name in rule.responses))
+        else:
+            responses[seat] = None
+        self.responses = tuple(responses)
+
+
+    def child(self, call):
+        """Returns the node of the sequence extended by call.
+
+        Nodes are kept in the children of their parent, so that each sequence
+        is interpreted once, until the system holds maxNodes nodes: further
+        nodes are interpreted whenever they are requested.
+
+        @param call: the next call.
+        @rtype: AuctionNode
+        """
+        node = self.children.get(call)
+        if node is None:
+            system = self.__system
+            node = AuctionNode(system, self, call)
+            if system.nodes < system.maxNodes:
+                self.children[call] = node
+                system.nodes += 1
+        return node
+
+
+    def bounds(self, seats, property):
+        """Returns the range of values of property implied by the sequence.
+
+        @param seats: a seat, or a tuple of seats holding property.
+        @param property: the name of a hand property.
+        @return: a (minimum, maximum) tuple, or None if the constraints conflict.
+        """
+        if isinstance(seats, int):
+            seats = (seats,)
+        return bounds(self.constraints.get((tuple(sorted(seats)), property), ANY))
+
+
+
+
+class BiddingSystem:
+    """A compiled bidding system.
+
+    @param title: the title of the system.
+    @param description: the description of the system.
+    @param contexts: a dict of Context objects, keyed by name.
+    @param roots: the names of the contexts in scope when partner's calls match
+                  no rule. If not specified, the contexts which are not opened
+                  by any rule.
+    """
+
+    maxNodes = 100000  # The most sequences kept: see AuctionNode.child().
+
+
+    def __init__(self, title, description, contexts, roots=None):
+        self.title = title
+        self.description = description
+        self.contexts = contexts
+        if roots is None:
+            opened = set(name for context in contexts.values()
+                         for rule in context.rules for name in rule.responses)
+            roots = [name for name in contexts if name not in opened]
+        self.roots = tuple(roots)
+        self.root = AuctionNode(self)
+        self.nodes = 1  # The number of sequences kept.
+
+
+    def node(self, calls):
+        """Returns the node of a sequence of calls.
+
+        @param calls: an Auction, or a sequence of calls.
+        @rtype: AuctionNode
+        """
+        node = self.root
+        for call in calls:
+            node = node.child(call)
+        return node
+
+
+    def matchingRules(self, auction):
+        """Returns the rules matched by the last call of auction.
+
+        @param auction: an Auction, or a sequence of calls.
+        @return: a tuple of Rule objects.
+        """
+        return self.node(auction).rules
+
+
+    def promises(self, auction, call=None):
+        """Returns the constraints implied by a call.
+
+        @param auction: an Auction.
+        @param call: if specified, a call to follow auction. Otherwise, the
+                     last call of auction.
+        @return: a dict of constraints, keyed by (positions, property).
+        """
+        node = self.node(auction)
+        if call is not None:
+            node = node.child(call)
+        return self.__byPosition(node.promises, auction.dealer)
+
+
+    def constraints(self, auction):
+        """Returns the constraints implied by all calls of auction.
+
+        @param auction: an Auction.
+        @return: a dict of constraints, keyed by (positions, property).
+        """
+        return self.__byPosition(self.node(auction).constraints, auction.dealer)
+
+
+    @staticmethod
+    def __byPosition(constraints, dealer):
+        return dict(((tuple(sorted((Direction((dealer.value + seat) % 4) for seat in seats),
+                                   key=lambda position: position.value)),
+                      property), constraint)
+                    for (seats, property), constraint in constraints.items())
+
+
+
+
+def _parseCalls(element):
+    """Returns the mask of the codes of calls in element."""
+    mask = 0
+    for call in (element.findall('call') if element is not None else ()):
+        kind = call.get('type')
+        if kind in _CALLS:
+            mask |= 1 << _CALLS[kind].code
+        elif kind == 'bid':
+            level = call.get('level')
+            levelMin = int(call.get('levelMin', level or 1))
+            levelMax = int(call.get('levelMax', level or 7))
+            denomination = call.get('denomination')
+            if denomination is not None and denomination not in _STRAINS:
+                raise ValueError("Unknown denomination %r" % denomination)
+            for code in range(35):
+                bid = Call.fromCode(code)
+                if levelMin <= bid.level.value + 1 <= levelMax and \
+                   denomination in (None, bid.strain.name.lower()):
+                    mask |= 1 << code
+        else:
+            raise ValueError("Unknown call type %r" % kind)
+    return mask
+
+
+def _parseRegisters(element):
+    """Returns the (holder, property, constraint) registers in element."""
+    exact, ranges = {}, {}
+    for register in (element.findall('register') if element is not None else ()):
+        holder = register.get('player') or register.get('partnership')
+        if holder not in _HOLDERS:
+            raise ValueError("Unknown register holder %r" % holder)
+        key = (holder, register.get('property'))
+        if register.get('value') is not None:
+            value = int(register.get('value'))
+            exact[key] = exact.get(key, 0) | valueRange(value, value)
+        else:
+            constraint = valueRange(int(register.get('value-min', 0)),
+                                    int(register.get('value-max', MAXIMUM)))
+            ranges[key] = ranges.get(key, ANY) & constraint
+    return tuple(key + (exact.get(key, ANY) & ranges.get(key, ANY),)
+                 for key in dict.fromkeys(list(exact) + list(ranges)))
+
+
+def compileSystem(path):
+    """Compiles a bidding system from its XML definition.
+
+    @param path: the path of the XML file.
+    @return: the title, description and a dict of Context objects by name.
+    """
+    root = ElementTree.parse(path).getroot()
+    contexts = {}
+    for element in root.iter('context'):
+        name = element.get('name')
+        rules = []
+        for rule in element.findall('rule'):
+            responses = tuple(scope.get('name') for scope in rule.findall('responses/scope')
+                              if scope.get('name'))
+            rules.append(Rule(rule.get('name'), name,
+                              _parseCalls(rule.find('own-calls')),
+                              _parseCalls(rule.find('opponent-calls')),
+                              _parseRegisters(rule.find('implies')), responses))
+        contexts[name] = Context(name, rules)
+    return root.findtext('title'), root.findtext('description'), contexts
+
+
+def loadSystem(path=STANDARD_ENGLISH, roots=None, cache=True):
+    """Loads a bidding system.
+
+    The compiled system is cached in the __pycache__ directory beside the XML
+    file, and the cache is used while the XML file is unchanged. The cache is
+    not written if the directory is not writable.
+
+    @param path: the path of the XML file.
+    @param roots: the names of the root contexts: see BiddingSystem.
+    @param cache: if False, the XML file is always compiled.
+    @rtype: BiddingSystem
+    """
+    stat = os.stat(path)
+    stamp = (_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    cachepath = os.path.join(os.path.dirname(path), '__pycache__',
+                             os.path.basename(path) + '.pickle')
+
+    compiled = None
+    if cache and os.path.exists(cachepath):
+        try:
+            with open(cachepath, 'rb') as f:
+                cached = pickle.load(f)
+            if cached[0] == stamp:
+                compiled = cached[1]
+        except Exception:  # Unreadable, or pickled by other code.
+            pass  # Compile again.
+
+    if compiled is None:
+        compiled = compileSystem(path)
+        if cache:
+            try:
+                os.makedirs(os.path.dirname(cachepath), exist_ok=True)
+                with open(cachepath, 'wb') as f:
+                    pickle.dump((stamp, compiled), f, pickle.HIGHEST_PROTOCOL)
+            except OSError:
+                pass  # Not writable.
+
+    title, description, contexts = compiled
+    return BiddingSystem(title, description, contexts, roots)
@@ -0,0 +1,169 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+This module provides a compact "bitboard" representation of hands.
+
+A hand is encoded as a 52-bit integer mask, in which bit (13 * suit + rank)
+is set if the hand holds the card of that suit and rank. The holding of a
+single suit is therefore a 13-bit mask, with the Two as the lowest bit and
+the Ace as the highest bit.
+
+Bit positions follow the sort order of Card objects, so that iterating over
+the set bits of a mask, from lowest to highest, yields a sorted hand.
+"""
+
+
+from .card import Card
+
+
+SUIT_MASK = (1 << 13) - 1  # All cards of a single suit.
+FULL_MASK = (1 << 52) - 1  # All cards of the deck.
+
+# Cards indexed by their bit position.
+CARDS = [Card.fromCode(code) for code in range(52)]
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10.
+    popcount = lambda mask: bin(mask).count('1')
+
+
+def cardCode(card):
+    """Returns the bit position (0..51) of the specified card.
+
+    @param card: a Card object.
+    @return: an integer in range 0..51.
+    """
+    return card.code
+
+
+def cardBit(card):
+    """Returns the single-bit mask of the specified card."""
+    return 1 << card.code
+
+
+def handToMask(hand):
+    """Encodes a collection of cards as a mask.
+
+    @param hand: an iterable of Card objects.
+    @return: a 52-bit integer mask.
+    """
+    mask = 0
+    for card in hand:
+        mask |= 1 << card.code
+    return mask
+
+
+def maskToHand(mask):
+    """Decodes a mask into a sorted list of cards.
+
+    @param mask: a 52-bit integer mask.
+    @return: a list of Card objects, from lowest to highest.
+    """
+    hand = []
+    while mask:
+        low = mask & -mask
+        hand.append(CARDS[low.bit_length() - 1])
+        mask ^= low
+    return hand
+
+
+def iterCodes(mask):
+    """Yields the bit positions of the cards in mask, from lowest to highest."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def suitMask(mask, suit):
+    """Returns the 13-bit holding of mask in the specified suit."""
+    return (mask >> (suit.value*13)) & SUIT_MASK
+
+
+def suitMasks(mask):
+    """Returns the 13-bit holdings of mask, indexed by suit value."""
+    return (mask & SUIT_MASK, (mask >> 13) & SUIT_MASK,
+            (mask >> 26) & SUIT_MASK, (mask >> 39) & SUIT_MASK)
+
+
+def fromSuitMasks(holdings):
+    """Builds a mask from four 13-bit holdings, indexed by suit value."""
+    clubs, diamonds, hearts, spades = holdings
+    return clubs | (diamonds << 13) | (hearts << 26) | (spades << 39)
+
+
+def suitLength(mask, suit):
+    """Returns the number of cards held by mask in the specified suit."""
+    return popcount((mask >> (suit.value*13)) & SUIT_MASK)
+
+
+def suitLengths(mask):
+    """Returns the number of cards held by mask in each suit, by suit value."""
+    return tuple(popcount(holding) for holding in suitMasks(mask))
+
+
+def hasCard(mask, card):
+    """Returns True if mask contains card, False otherwise."""
+    return bool(mask >> card.code & 1)
+
+
+def addCard(mask, card):
+    """Returns mask with card added."""
+    return mask | (1 << card.code)
+
+
+def removeCard(mask, card):
+    """Returns mask with card removed."""
+    return mask & ~(1 << card.code)
+
+
+def legalMask(hand, leadSuit=None):
+    """Returns the cards of a hand which may be played to a trick.
+
+    A hand must follow the suit led, if it holds a card of that suit.
+
+    @param hand: the mask of the cards in hand.
+    @param leadSuit: the suit led to the trick, or None to lead.
+    @return: the mask of the cards which may be played.
+    """
+    if leadSuit is not None:
+        followers = hand & (SUIT_MASK << leadSuit.value*13)
+        if followers:
+            return followers
+    return hand
+
+
+def trickWinner(cards, leadSuit, trumpSuit=None):
+    """Returns the bit position of the card which wins a trick.
+
+    The highest trump wins, or else the highest card of the suit led. Since
+    the bits of a suit are ordered by rank, this is the highest bit of the
+    cards of that suit. The trick need not be complete.
+
+    @param cards: the mask of the cards played to the trick.
+    @param leadSuit: the suit led to the trick.
+    @param trumpSuit: the trump suit, or None for No Trumps.
+    @return: an integer in range 0..51.
+    """
+    if trumpSuit is not None:
+        trumps = cards & (SUIT_MASK << trumpSuit.value*13)
+        if trumps:
+            return trumps.bit_length() - 1
+    return (cards & (SUIT_MASK << leadSuit.value*13)).bit_length() - 1
@@ -16,24 +16,94 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
 
 
-from functools import total_ordering
 from twisted.spread import pb
 
 from .symbols import Level, Strain
 
 
 class Call(pb.Copyable, pb.RemoteCopy):
-    """Abstract class, inherited by Bid, Pass, Double and Redouble."""
+    """Abstract class, inherited by Bid, Pass, Double and Redouble.
+    
+    Calls are interned: there is exactly one instance of each of the 38 calls,
+    which is returned whenever that call is constructed or received from the
+    network. Calls may therefore be compared by identity. Each call carries
+    a code in range 0..37, which orders bids (0..34, by level then strain)
+    before Pass (35), Double (36) and Redouble (37).
+    """
+
+    code = property(lambda self: self.__code)
+
+    __calls = [None] * 38  # Indexed by code.
+
+
+    def __new__(cls):
+        return cls.__calls[cls._code]
+
+
+    @classmethod
+    def _intern(cls, code):
+        """Builds the canonical instance of a call."""
+        call = object.__new__(cls)
+        call.__code = code
+        Call.__calls[code] = call
+        return call
+
+
+    @classmethod
+    def fromCode(cls, code):
+        """Returns the call with the specified code, in range 0..37."""
+        return Call.__calls[code]
+
+
+    # Two calls are equivalent only if they are the same (interned) object,
+    # so the default identity-based equality applies.
 
     def __hash__(self):
-        return hash(self.__class__.__name__)
+        return self.__code
+
+
+    def __lt__(self, other):
+        if not isinstance(other, Call):
+            raise TypeError("Expected Call, got %s" % type(other))
+        return self.__code < other.__code
+
+
+    def __le__(self, other):
+        if not isinstance(other, Call):
+            raise TypeError("Expected Call, got %s" % type(other))
+        return self.__code <= other.__code
+
+
+    def __gt__(self, other):
+        if not isinstance(other, Call):
+            raise TypeError("Expected Call, got %s" % type(other))
+        return self.__code > other.__code
+
+
+    def __ge__(self, other):
+        if not isinstance(other, Call):
+            raise TypeError("Expected Call, got %s" % type(other))
+        return self.__code >= other.__code
+
+
+    def __reduce__(self):
+        return Call.fromCode, (self.__code,)  # Copies are canonical.
 
 
     def __repr__(self):
         return "%s()" % self.__class__.__name__
 
 
-@total_ordering
+    def getStateToCopy(self):
+        return None
+
+
+    def setCopyableState(self, state):
+        """Unused: remote calls are unjellied to the canonical instance by
+        callFactory(), so no copy is made.
+        """
+
+
 class Bid(Call):
     """A Bid represents a statement of a level and a strain.
     
@@ -47,35 +117,20 @@ class Bid(Call):
     strain = property(lambda self: self.__strain)
 
 
-    def __init__(self, level, strain):
-        if level not in Level:
+    def __new__(cls, level, strain):
+        if not isinstance(level, Level):
             raise TypeError("Expected Level, got %s" % type(level))
-        if strain not in Strain:
+        if not isinstance(strain, Strain):
             raise TypeError("Expected Strain, got %s" % type(strain))
+        return Call.fromCode(level.value*5 + strain.value)
 
-        self.__level = level
-        self.__strain = strain
 
-    def __eq__(self, other):
-        if isinstance(other, Bid):
-            return self.__level == other.__level and self.__strain == other.__strain
-        return False
-
-
-    def __lt__(self, other):
-        if not issubclass(other.__class__, Call):
-            raise TypeError("Expected Call, got %s" % type(other))
-
-        if isinstance(other, Bid):  # Compare two bids.
-            selfIndex = self.level.value*len(Strain) + self.strain.value
-            otherIndex = other.level.value*len(Strain) + other.strain.value
-            return selfIndex < otherIndex
-        # Comparing non-bid calls returns true.
-        return True
-
-
-    def __hash__(self):
-        return hash((self.level, self.strain))
+    @classmethod
+    def _intern(cls, level, strain):
+        """Builds the canonical instance of a bid."""
+        bid = super()._intern(level.value*5 + strain.value)
+        bid.__level, bid.__strain = level, strain
+        return bid
 
 
     def __repr__(self):
@@ -87,29 +142,45 @@ class Bid(Call):
 
 
     def setCopyableState(self, state):
-        self.__level, self.__strain = state
-
-
-pb.setUnjellyableForClass(Bid, Bid)
+        """Unused: remote bids are unjellied by bidFactory()."""
 
 
 class Pass(Call):
     """A Pass represents an abstention from the bidding."""
 
-
-pb.setUnjellyableForClass(Pass, Pass)
+    _code = 35
 
 
 class Double(Call):
     """A Double over an opponent's current bid."""
 
-
-pb.setUnjellyableForClass(Double, Double)
+    _code = 36
 
 
 class Redouble(Call):
     """A Redouble over an opponent's double of partnership's current bid."""
 
+    _code = 37
+
+
+for level in Level:
+    for strain in Strain:
+        Bid._intern(level, strain)
+for callclass in (Pass, Double, Redouble):
+    callclass._intern(callclass._code)
+
+
+def bidFactory(state):
+    """Unjellies the state of a remote bid to the canonical instance."""
+    level, strain = state
+    return Bid(level, strain)
+
+
+def callFactory(callclass):
+    """Returns an unjellier of remote calls of callclass, which have no state."""
+    return lambda state: callclass()
 
-pb.setUnjellyableForClass(Redouble, Redouble)
 
+pb.setUnjellyableFactoryForClass(Bid, bidFactory)
+for callclass in (Pass, Double, Redouble):
+    pb.setUnjellyableFactoryForClass(callclass, callFactory(callclass))
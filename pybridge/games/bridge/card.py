@@ -16,15 +16,19 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
 
 
-from functools import total_ordering
 from twisted.spread import pb
 
 from .symbols import Rank, Suit
 
-@total_ordering
+
 class Card(pb.Copyable, pb.RemoteCopy):
     """A card has a rank and a suit.
     
+    Cards are interned: there is exactly one instance of each of the 52 cards,
+    which is returned whenever that card is constructed or received from the
+    network. Cards may therefore be compared by identity. Each card carries
+    a code in range 0..51 (13 * suit + rank), which defines its sort order.
+    
     @param rank: the rank of the card.
     @type rank: L{Rank}
     @param suit: the suit of the card.
@@ -33,23 +37,41 @@ class Card(pb.Copyable, pb.RemoteCopy):
 
     rank = property(lambda self: self.__rank)
     suit = property(lambda self: self.__suit)
+    code = property(lambda self: self.__code)
+
+    __cards = []  # Indexed by code.
 
 
-    def __init__(self, rank, suit):
-        if rank not in Rank:
+    def __new__(cls, rank, suit):
+        if not isinstance(rank, Rank):
             raise TypeError("Expected Rank, got %s" % type(rank))
-        if suit not in Suit:
+        if not isinstance(suit, Suit):
             raise TypeError("Expected Suit, got %s" % type(suit))
+        return cls.__cards[suit.value*13 + rank.value]
+
+
+    @classmethod
+    def _intern(cls):
+        """Builds the canonical instance of each card."""
+        for suit in Suit:
+            for rank in Rank:
+                card = object.__new__(cls)
+                card.__rank, card.__suit = rank, suit
+                card.__code = suit.value*13 + rank.value
+                cls.__cards.append(card)
+
 
-        self.__rank = rank
-        self.__suit = suit
+    @classmethod
+    def fromCode(cls, code):
+        """Returns the card with the specified code, in range 0..51."""
+        return cls.__cards[code]
 
 
-    def __eq__(self, other):
-        """Two cards are equivalent if their ranks and suits match."""
-        if isinstance(other, Card):
-            return self.suit == other.suit and self.rank == other.rank
-        return False
+    # Two cards are equivalent only if they are the same (interned) object,
+    # so the default identity-based equality applies.
+
+    def __hash__(self):
+        return self.__code
 
 
     def __lt__(self, other):
@@ -59,14 +81,29 @@ class Card(pb.Copyable, pb.RemoteCopy):
         """
         if not isinstance(other, Card):
             raise TypeError("Expected Card, got %s" % type(other))
+        return self.__code < other.__code
+
 
-        selfIndex = self.suit.value*13 + self.rank.value
-        otherIndex = other.suit.value*13 + other.rank.value
-        return selfIndex < otherIndex
+    def __le__(self, other):
+        if not isinstance(other, Card):
+            raise TypeError("Expected Card, got %s" % type(other))
+        return self.__code <= other.__code
 
 
-    def __hash__(self):
-        return hash((self.rank, self.suit))
+    def __gt__(self, other):
+        if not isinstance(other, Card):
+            raise TypeError("Expected Card, got %s" % type(other))
+        return self.__code > other.__code
+
+
+    def __ge__(self, other):
+        if not isinstance(other, Card):
+            raise TypeError("Expected Card, got %s" % type(other))
+        return self.__code >= other.__code
+
+
+    def __reduce__(self):
+        return Card, (self.__rank, self.__suit)  # Copies are canonical.
 
 
     def __repr__(self):
@@ -78,8 +115,18 @@ class Card(pb.Copyable, pb.RemoteCopy):
 
 
     def setCopyableState(self, state):
-        self.__rank, self.__suit = state
+        """Unused: remote cards are unjellied to the canonical instance by
+        cardFactory(), so no copy is made.
+        """
+
+
+Card._intern()
+
 
+def cardFactory(state):
+    """Unjellies the state of a remote card to the canonical instance."""
+    rank, suit = state
+    return Card(rank, suit)
 
-pb.setUnjellyableForClass(Card, Card)
 
+pb.setUnjellyableFactoryForClass(Card, cardFactory)
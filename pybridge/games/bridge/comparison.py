@@ -0,0 +1,332 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+Comparison scoring of duplicate results.
+
+In duplicate bridge, each board is played at several tables, and a result is
+scored by comparison with the results of the same board at other tables.
+Scores are taken from the point of view of North-South: East-West receive the
+complement of each award.
+
+- Matchpoints: a score earns 1 for each score which it beats, and 1/2 for each
+  score which it ties, so that the top on a board played n times is n - 1.
+  When a board is played fewer times than others, its matchpoints are scaled
+  to the top of the other boards (Neuberg's formula).
+- Cross-IMPs: a score is compared with each other score, and the differences
+  are converted to IMPs, which are averaged.
+- Butler IMPs: a score is compared with a datum, the average of the scores
+  after the best and worst are excluded, rounded to the nearest 10.
+
+Ranks are found by sorting the scores of a board, and searching the sorted
+scores, so that a board played n times is scored in O(n log n) time. Cross-IMPs
+count the scores within each step of the IMP scale in the same way.
+
+The functions which are named with a Many suffix score NumPy arrays, of shape
+(boards, scores) or (scores,), in which each board has the same number of
+scores.
+"""
+
+
+from bisect import bisect_left, bisect_right
+import math
+
+try:
+    import numpy  # Optional dependency, for the Many functions.
+except ImportError:
+    numpy = None
+
+from .symbols import Direction
+
+
+# The least difference in score for each number of IMPs, from 1 to 24.
+IMP_SCALE = (20, 50, 90, 130, 170, 220, 270, 320, 370, 430, 500, 600, 750,
+             900, 1100, 1300, 1500, 1750, 2000, 2250, 2500, 3000, 3500, 4000)
+
+
+def northSouthScore(result):
+    """Returns the score of a duplicate result, for North-South.
+
+    @param result: the result of a board.
+    @type result: DuplicateResult
+    @rtype: int
+    """
+    if result.contract is None:
+        return 0
+    if result.contract.declarer in (Direction.North, Direction.South):
+        return result.score
+    return -result.score
+
+
+def imps(difference):
+    """Converts a difference in score to IMPs.
+
+    @param difference: the difference in score.
+    @return: the number of IMPs, negative if difference is negative.
+    @rtype: int
+    """
+    imp = bisect_right(IMP_SCALE, abs(difference))
+    return imp if difference >= 0 else -imp
+
+
+def matchpoints(scores, expected=None):
+    """Computes the matchpoints of the scores of a board.
+
+    @param scores: the North-South scores of the board.
+    @type scores: sequence of int
+    @param expected: if specified, the number of times the board would be
+                     played in a complete movement. If the board was played
+                     fewer times, matchpoints are scaled (Neuberg's formula)
+                     to a top of expected - 1.
+    @return: the North-South matchpoints of each score.
+    @rtype: list of float
+    """
+    ordered = sorted(scores)
+    # The scores beaten, and half of the other equal scores.
+    points = [(bisect_left(ordered, score) + bisect_right(ordered, score) - 1) / 2
+              for score in scores]
+    if expected and len(scores) < expected and scores:
+        factor = expected / len(scores)
+        points = [(point + 0.5) * factor - 0.5 for point in points]
+    return points
+
+
+def crossImps(scores):
+    """Computes the cross-IMPs of the scores of a board.
+
+    @param scores: the North-South scores of the board.
+    @type scores: sequence of int
+    @return: for each score, the average IMPs won against the other scores.
+    @rtype: list of float
+    """
+    ordered = sorted(scores)
+    count = len(ordered)
+    if count < 2:
+        return [0.0] * count
+    totals = []
+    for score in scores:
+        # At each step, an IMP is won from the scores below score - step,
+        # and lost to the scores above score + step.
+        total = 0
+        for step in IMP_SCALE:
+            total += bisect_right(ordered, score - step)
+            total -= count - bisect_left(ordered, score + step)
+        totals.append(total / (count - 1))
+    return totals
+
+
+def datum(scores, trim=1):
+    """Computes the datum of the scores of a board: their average, after the
+    best and worst are excluded, rounded to the nearest 10.
+
+    @param scores: the North-South scores of the board.
+    @type scores: sequence of int
+    @param trim: the number of best, and of worst, scores to exclude, if
+                 any scores remain.
+    @rtype: int
+    """
+    ordered = sorted(scores)
+    if trim > 0 and len(ordered) > 2 * trim:
+        ordered = ordered[trim:-trim]
+    return 10 * math.floor(sum(ordered) / len(ordered) / 10 + 0.5)
+
+
+def butlerImps(scores, trim=1):
+    """Computes the Butler IMPs of the scores of a board, against their datum.
+
+    @param scores: the North-South scores of the board.
+    @type scores: sequence of int
+    @param trim: see datum().
+    @rtype: list of int
+    """
+    base = datum(scores, trim)
+    return [imps(score - base) for score in scores]
+
+
+def impsMany(differences):
+    """Converts an array of differences in score to IMPs.
+
+    @return: a NumPy array of IMPs.
+    """
+    differences = numpy.asarray(differences)
+    steps = numpy.searchsorted(IMP_SCALE, numpy.abs(differences), side='right')
+    return numpy.where(differences < 0, -steps, steps)
+
+
+def _searchRows(ordered, values, side):
+    """Searches each row of values in the same row of ordered, which is sorted
+    along its last axis. Rows are searched together, by offsetting each row
+    beyond the range of the rows before it.
+    """
+    count = ordered.shape[-1]
+    rows = ordered.reshape(-1, count)
+    low = min(rows.min(), values.min())
+    span = max(rows.max(), values.max()) - low + 1
+    index = numpy.arange(len(rows))[:, None]
+    keys = (rows - low + index * span).ravel()
+    queries = values.reshape(len(rows), -1) - low + index * span
+    found = numpy.searchsorted(keys, queries, side=side) - index * count
+    return found.reshape(values.shape)
+
+
+def matchpointsMany(scores, expected=None):
+    """Computes matchpoints of an array of scores, as matchpoints().
+
+    @param scores: an array of North-South scores, by board and table.
+    @param expected: see matchpoints().
+    @return: a NumPy array of North-South matchpoints.
+    """
+    scores = numpy.asarray(scores)
+    ordered = numpy.sort(scores, axis=-1)
+    points = (_searchRows(ordered, scores, 'left') +
+              _searchRows(ordered, scores, 'right') - 1) / 2
+    count = scores.shape[-1]
+    if expected and 0 < count < expected:
+        points = (points + 0.5) * (expected / count) - 0.5
+    return points
+
+
+def crossImpsMany(scores):
+    """Computes cross-IMPs of an array of scores, as crossImps().
+
+    @param scores: an array of North-South scores, by board and table.
+    @return: a NumPy array of average IMPs.
+    """
+    scores = numpy.asarray(scores)
+    count = scores.shape[-1]
+    if count < 2:
+        return numpy.zeros(scores.shape)
+    ordered = numpy.sort(scores, axis=-1)
+    total = numpy.zeros(scores.shape, dtype=numpy.int64)
+    for step in IMP_SCALE:
+        total += _searchRows(ordered, scores - step, 'right')
+        total -= count - _searchRows(ordered, scores + step, 'left')
+    return total / (count - 1)
+
+
+def butlerImpsMany(scores, trim=1):
+    """Computes Butler IMPs of an array of scores, as butlerImps().
+
+    @param scores: an array of North-South scores, by board and table.
+    @param trim: see datum().
+    @return: a NumPy array of IMPs.
+    """
+    scores = numpy.asarray(scores)
+    ordered = numpy.sort(scores, axis=-1)
+    if trim > 0 and scores.shape[-1] > 2 * trim:
+        ordered = ordered[..., trim:-trim]
+    base = 10 * numpy.floor(ordered.mean(axis=-1, keepdims=True) / 10 + 0.5)
+    return impsMany(scores - base)
+
+
+
+
+class Session:
+    """The results of a duplicate session, by board and pair.
+
+    Pairs are identified by any hashable value, such as their number in the
+    movement. Awards to North-South pairs are credited to East-West pairs as
+    their complement: the top less matchpoints, or negated IMPs.
+    """
+
+
+    def __init__(self):
+        self.boards = {}  # For each board, a list of (NS, EW, NS score).
+
+
+    def addResult(self, result, northSouth, eastWest, board=None):
+        """Adds the result of a board.
+
+        @param result: the result of the board.
+        @type result: DuplicateResult
+        @param northSouth: the pair which sat North-South.
+        @param eastWest: the pair which sat East-West.
+        @param board: if specified, the key of the board. Otherwise, the board
+                      number of result.
+        """
+        if board is None:
+            board = result.board['num']
+        self.addScore(board, northSouthScore(result), northSouth, eastWest)
+
+
+    def addScore(self, board, score, northSouth, eastWest):
+        """Adds the North-South score of a board.
+
+        @param board: the key of the board.
+        @param score: the score, for North-South.
+        @param northSouth: the pair which sat North-South.
+        @param eastWest: the pair which sat East-West.
+        """
+        self.boards.setdefault(board, []).append((northSouth, eastWest, score))
+
+
+    def matchpoints(self):
+        """Computes the total matchpoints of each pair.
+
+        Boards which were played fewer times than the most played boards are
+        scaled by Neuberg's formula.
+
+        @return: a dict of (matchpoints, top) tuples by pair, where top is the
+                 total of the tops of the boards which the pair played.
+        """
+        expected = max([len(results) for results in self.boards.values()] or [0])
+        top = expected - 1
+        totals = {}
+        for results in self.boards.values():
+            points = matchpoints([score for _, _, score in results], expected)
+            for (northSouth, eastWest, _), point in zip(results, points):
+                for pair, award in ((northSouth, point), (eastWest, top - point)):
+                    total, tops = totals.get(pair, (0, 0))
+                    totals[pair] = (total + award, tops + top)
+        return totals
+
+
+    def percentages(self):
+        """Computes the matchpoint percentage of each pair.
+
+        @return: a dict of percentages by pair.
+        """
+        return dict((pair, 100.0 * total / top if top else 50.0)
+                    for pair, (total, top) in self.matchpoints().items())
+
+
+    def crossImps(self):
+        """Computes the total cross-IMPs of each pair.
+
+        @return: a dict of IMPs by pair.
+        """
+        return self.__totalImps(crossImps)
+
+
+    def butlerImps(self, trim=1):
+        """Computes the total Butler IMPs of each pair.
+
+        @param trim: see datum().
+        @return: a dict of IMPs by pair.
+        """
+        return self.__totalImps(lambda scores: butlerImps(scores, trim))
+
+
+    def __totalImps(self, compare):
+        totals = {}
+        for results in self.boards.values():
+            awards = compare([score for _, _, score in results])
+            for (northSouth, eastWest, _), award in zip(results, awards):
+                totals[northSouth] = totals.get(northSouth, 0) + award
+                totals[eastWest] = totals.get(eastWest, 0) - award
+        return totals
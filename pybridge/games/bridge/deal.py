@@ -16,17 +16,31 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
 
 
+from bisect import bisect_right
 from copy import copy
-from operator import mul
 import random
 
+try:
+    import numpy  # Optional dependency, for batches of deals.
+except ImportError:
+    numpy = None
+
+from .bitboard import CARDS, handToMask, maskToHand
 from .card import Card
 from .symbols import Direction, Rank, Suit
-from functools import reduce
 
 
-# See http://mail.python.org/pipermail/edu-sig/2001-May/001288.html for details.
-comb = lambda n, k: reduce(mul, list(range(n, n-k, -1))) / reduce(mul, list(range(1, k+1)))
+# Binomial coefficients comb(n, k), for 0 <= n <= 52 and 0 <= k <= 13.
+_binomial = [[1] + [0]*13]
+for n in range(1, 53):
+    _binomial.append([1] + [_binomial[-1][k-1] + _binomial[-1][k] for k in range(1, 14)])
+del n
+_binomialColumns = [[row[k] for row in _binomial] for k in range(14)]
+
+
+def comb(n, k):
+    """Returns the number of k-card subsets of n cards, as an exact integer."""
+    return _binomial[n][k]
 
 
 class Deal(dict):
@@ -73,6 +87,79 @@ class Deal(dict):
         return cls(hands)
 
 
+    @classmethod
+    def fromRandomBatch(cls, count, seed=None):
+        """Generates a batch of random deals, as an array of card owners.
+
+        Row i of the returned array describes deal i: the value in column c
+        is the position value of the owner of the card with bit position c
+        (see the bitboard module). Rows may be converted into Deal objects,
+        on demand, with fromOwners().
+
+        This requires NumPy.
+
+        @param count: the number of deals to generate.
+        @param seed: if specified, an integer seed or a numpy.random.Generator.
+        @return: a numpy.uint8 array of shape (count, 52).
+        """
+        rng = numpy.random.default_rng(seed)
+        # Each row of argsort() is a uniformly random permutation of 0..51:
+        # the position of each card in a shuffled deck, dealt 13 per hand.
+        shuffled = rng.random((count, 52)).argsort(axis=1).astype(numpy.uint8)
+        shuffled //= 13
+        return shuffled
+
+
+    @classmethod
+    def fromOwners(cls, owners):
+        """Generates the deal which corresponds to the given card owners.
+
+        @param owners: a sequence (or array row) of 52 position values,
+                       indexed by card bit position.
+        @return: a Deal object containing the corresponding deal.
+        """
+        if hasattr(owners, 'tolist'):
+            owners = owners.tolist()  # Faster to iterate over than an array.
+        hands = ([], [], [], [])
+        for card, owner in zip(CARDS, owners):
+            hands[owner].append(card)  # In sorted order.
+        return cls(dict(zip(Direction, hands)))
+
+
+    def toOwners(self):
+        """Computes the card owners which correspond to this deal.
+
+        @return: a list of 52 position values, indexed by card bit position.
+        """
+        owners = [None] * 52
+        for position, hand in self.items():
+            for card in hand:
+                owners[card.code] = position.value
+        return owners
+
+
+    @classmethod
+    def fromMasks(cls, masks):
+        """Generates the deal which corresponds to the given hand masks.
+
+        @param masks: for each position, a 52-bit hand mask.
+        @type masks: {Direction: int}
+        @return: a Deal object containing the corresponding deal.
+        """
+        return cls(dict((pos, maskToHand(mask)) for pos, mask in masks.items()))
+
+
+    def toMasks(self):
+        """Computes the hand masks which correspond to this deal.
+
+        See the bitboard module for a description of the mask encoding.
+
+        @return: for each position, a 52-bit hand mask.
+        @rtype: {Direction: int}
+        """
+        return dict((pos, handToMask(hand)) for pos, hand in self.items())
+
+
     @classmethod
     def fromIndex(cls, num):
         """Generates the deal which corresponds to the specified "page number".
@@ -85,36 +172,7 @@ class Deal(dict):
         """
         assert isinstance(num, int), "index must be an integer"
         assert 1 <= num <= cls.__D, "index not in range %s..%s" % (1, cls.__D)
-
-        cardSeq = copy(cls.__cards)  # Make a copy for modification.
-        hands = dict((pos, []) for pos in Direction)
-        num -= 1  # Decrement page number to fit within range 0..D-1.
-
-        # Split index into hand indexes.
-        indexes = {Direction.North : (num / cls.__Smax) / cls.__Emax,
-                   Direction.East  : (num / cls.__Smax) % cls.__Emax,
-                   Direction.South : (num % cls.__Smax) }
-
-        for position in (Direction.North, Direction.East, Direction.South):
-            for k in range(13, 0, -1):
-
-                # Find the largest n such that comb(n, k) <= indexes[position].
-                n = k-1  # n < k implies comb(n, k) = 0
-                # comb(n+1, k) =
-                #   n-k == -1 => comb(n, k) * (n+1)
-                #   otherwise => (comb(n, k) * (n+1)) / (n+1 - k)
-                while comb(n+1, k) <= indexes[position]:
-                    n += 1
-
-                # Remove card index from indices, add card to hand.
-                indexes[position] -= comb(n, k)
-                card = cardSeq[n]
-                hands[position].append(card)
-                cardSeq.remove(card)
-
-        hands[Direction.West] = cardSeq  # West has the remaining cards.
-
-        return cls(hands)
+        return cls.fromOwners(cls.__indexToOwners(num))
 
 
     def toIndex(self):
@@ -125,26 +183,117 @@ class Deal(dict):
         
         @return: integer in range 1..D
         """
-        cardSeq = copy(self.__cards)  # Make a copy for modification.
-        indexes = {}
-
-        # For each hand, compute indexes of cards in cardSeq.
-        for position in (Direction.North, Direction.East, Direction.South):
-            indexes[position] = 0
-            self[position].sort(reverse=False)
-            # It is desirable to remove cards from cardSeq when adding their
-            # indexes, instead of doing so in an extra step.
-            # Removing cards backwards preserves the indexes of later cards.
-            for i, card in enumerate(self[position]):
-                indexes[position] += comb(cardSeq.index(card), 13-i)
-                cardSeq.remove(card)
+        return self.__ownersToIndex(self.toOwners())
+
+
+    @classmethod
+    def fromIndexMany(cls, nums, owners=False):
+        """Generates the deals which correspond to the specified "page numbers".
+
+        @param nums: an iterable of integers in range 1..D.
+        @param owners: if True, return an array of card owners (as described
+                       in fromRandomBatch) instead of Deal objects.
+        @return: a list of Deal objects, or a numpy.uint8 array of shape (N, 52).
+        """
+        decode = cls.__indexToOwners
+        if owners:
+            rows = [decode(int(num)) for num in nums]
+            return numpy.array(rows, dtype=numpy.uint8).reshape(len(rows), 52)
+        return [cls.fromOwners(decode(int(num))) for num in nums]
+
+
+    @classmethod
+    def toIndexMany(cls, deals):
+        """Computes the "page numbers" which correspond to the specified deals.
+
+        @param deals: an iterable of Deal objects, or an array of card owners
+                      of shape (N, 52) as returned by fromRandomBatch.
+        @return: a list of integers in range 1..D.
+        """
+        if hasattr(deals, 'ndim'):
+            return cls.__ownersArrayToIndex(deals)
+        encode = cls.__ownersToIndex
+        return [encode(deal.toOwners()) for deal in deals]
+
+
+    # The encoding enumerates, for each of North, East and South in turn, the
+    # 13-card subsets of the cards not held by previous hands. Cards are taken
+    # in order Ace of Spades, King of Spades, ..., Two of Clubs, which is the
+    # reverse order of card bit positions.
+
+
+    @classmethod
+    def __ownersToIndex(cls, owners):
+        north = east = south = 0  # Hand indexes.
+        nCount = eCount = sCount = 0  # Cards of each hand seen so far.
+        notNorth = notNorthEast = 0  # Cards seen so far, held by other hands.
+
+        for owner in reversed(owners):
+            if owner == 0:
+                north += _binomial[nCount + notNorth][nCount + 1]
+                nCount += 1
+            else:
+                if owner == 1:
+                    eCount += 1
+                    east += _binomial[notNorth][eCount]
+                else:
+                    if owner == 2:
+                        sCount += 1
+                        south += _binomial[notNorthEast][sCount]
+                    notNorthEast += 1
+                notNorth += 1
 
         # Deal index = (Nindex * Emax * Smax) + (Eindex * Smax) + Sindex
-        indexes[Direction.North] *= self.__Emax * self.__Smax
-        indexes[Direction.East]  *= self.__Smax
+        return (north * cls.__Emax + east) * cls.__Smax + south + 1
+
 
-        num = sum(indexes.values()) + 1  # Increment to fit within range 1..D.
-        return int(num)
+    @classmethod
+    def __ownersArrayToIndex(cls, batch, chunksize=65536):
+        table = numpy.array(_binomial, dtype=numpy.int64)
+        cardPositions = numpy.arange(52)
+        EScount, Scount = cls.__Emax * cls.__Smax, cls.__Smax
+        nums = []
+
+        # Each term of a hand index is below comb(52, 13) < 2**40, so hand
+        # indexes may be summed in int64 arithmetic before combination.
+        for start in range(0, len(batch), chunksize):
+            chunk = numpy.asarray(batch[start:start+chunksize])[:, ::-1]
+            isNorth, isEast, isSouth = chunk == 0, chunk == 1, chunk == 2
+            # Cards seen before each card, held by other hands.
+            notNorth = (chunk > 0).cumsum(axis=1) - (chunk > 0)
+            notNorthEast = (chunk > 1).cumsum(axis=1) - (chunk > 1)
+
+            north = numpy.where(isNorth, table[cardPositions, isNorth.cumsum(axis=1)], 0)
+            east = numpy.where(isEast, table[notNorth, isEast.cumsum(axis=1)], 0)
+            south = numpy.where(isSouth, table[notNorthEast, isSouth.cumsum(axis=1)], 0)
+
+            nums.extend(n*EScount + e*Scount + s + 1 for n, e, s in
+                        zip(north.sum(axis=1).tolist(), east.sum(axis=1).tolist(),
+                            south.sum(axis=1).tolist()))
+        return nums
+
+
+    @classmethod
+    def __indexToOwners(cls, num):
+        north, rest = divmod(num - 1, cls.__Emax * cls.__Smax)
+        east, south = divmod(rest, cls.__Smax)
+
+        west = Direction.West.value
+        owners = [west] * 52  # West has the remaining cards.
+        remaining = list(range(51, -1, -1))  # Card bit positions.
+
+        for position, index in ((0, north), (1, east), (2, south)):
+            n = len(remaining)
+            for k in range(13, 0, -1):
+                # Find the largest n such that comb(n, k) <= index.
+                # This is always less than the n found for k+1.
+                column = _binomialColumns[k]
+                n = bisect_right(column, index, 0, n) - 1
+                index -= column[n]
+                owners[remaining[n]] = position
+            remaining = [c for c in remaining if owners[c] == west]
+
+        return owners
 
 
     __pbnDirection = dict(list(zip('NESW', Direction)) + list(zip(Direction, 'NESW')))
@@ -0,0 +1,276 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+This module provides an on-disk store of deals, in fixed-size records.
+
+A store file holds a 16-byte header, followed by records of 16 bytes:
+
+- owners (13 bytes): the owner of each card, in 2 bits. The owner of the card
+  with bit position c (see the bitboard module) is held in byte c // 4, at
+  bit 2 * (c % 4).
+- flags (1 byte): the dealer position value, plus 4 times the vulnerability.
+- num (2 bytes, little-endian): the board number, up to 65535, or 0 if
+  unknown.
+
+The file is accessed with mmap, so that opening a store does not read its
+records: memory is only used by the records which are accessed. Records are
+converted to Board objects on demand, and the owners of many records may be
+unpacked into arrays for batch operations (see Deal.fromRandomBatch).
+
+This requires NumPy.
+"""
+
+
+import os
+
+try:
+    import numpy  # Optional dependency: see above.
+except ImportError:
+    numpy = None
+
+from .board import Board
+from .deal import Deal
+from .symbols import Direction, Vulnerable
+
+
+_MAGIC = b'PyBridge deals\x01\x10'  # Format version 1, record size 16.
+
+_SHIFTS = (0, 2, 4, 6)
+
+
+def _recordType():
+    return numpy.dtype([('owners', numpy.uint8, 13), ('flags', numpy.uint8),
+                        ('num', '<u2')])
+
+
+def packOwners(owners):
+    """Packs arrays of card owners into 13 bytes per deal.
+
+    @param owners: an array of card owners, of shape (N, 52).
+    @return: a numpy.uint8 array of shape (N, 13).
+    """
+    owners = numpy.asarray(owners, dtype=numpy.uint8).reshape(-1, 13, 4)
+    packed = owners[:, :, 0].copy()
+    for i in (1, 2, 3):
+        packed |= owners[:, :, i] << _SHIFTS[i]
+    return packed
+
+
+def unpackOwners(packed):
+    """Unpacks arrays of card owners, packed by packOwners().
+
+    @param packed: an array of packed owners, of shape (N, 13).
+    @return: a numpy.uint8 array of shape (N, 52).
+    """
+    packed = numpy.asarray(packed, dtype=numpy.uint8)
+    shifts = numpy.array(_SHIFTS, dtype=numpy.uint8)
+    return ((packed[:, :, None] >> shifts) & 3).reshape(-1, 52)
+
+
+
+
+class DealRecords:
+    """A sequence of deal records, which are converted to boards on demand.
+
+    Indexing returns a Board. Slicing, and sampling, return a DealRecords
+    object over the selected records.
+    """
+
+
+    def __init__(self, records):
+        """
+        @param records: a NumPy structured array of records.
+        """
+        self.records = records
+
+
+    def __len__(self):
+        return len(self.records)
+
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return DealRecords(self.records[key])
+        return self.__toBoard(self.records[key])
+
+
+    def __iter__(self):
+        for i in range(len(self.records)):
+            yield self.__toBoard(self.records[i])
+
+
+    def owners(self, start=0, stop=None):
+        """Unpacks the card owners of a range of records.
+
+        @return: a numpy.uint8 array of shape (N, 52).
+        """
+        return unpackOwners(self.records['owners'][start:stop])
+
+
+    def deal(self, i):
+        """Returns the deal of record i."""
+        return Deal.fromOwners(unpackOwners(self.records['owners'][i:i+1])[0])
+
+
+    def dealIndexes(self, start=0, stop=None):
+        """Computes the "page numbers" (see Deal.toIndex) of a range of records.
+
+        @return: a list of integers.
+        """
+        return Deal.toIndexMany(self.owners(start, stop))
+
+
+    def sample(self, count, seed=None):
+        """Selects records at random, without replacement.
+
+        @param count: the number of records to select.
+        @param seed: if specified, an integer seed or a numpy.random.Generator.
+        @return: a DealRecords object over the selected records.
+        """
+        rng = numpy.random.default_rng(seed)
+        rows = numpy.sort(rng.choice(len(self.records), size=count, replace=False))
+        return DealRecords(self.records[rows])
+
+
+    def find(self, deal, chunksize=1 << 20):
+        """Finds the records of a deal.
+
+        Records are compared in chunks, so that memory use is bounded. Every
+        record is read, so the cost of each search is proportional to the
+        size of the store: for repeated lookups, build a dict of the records
+        of each deal from dealIndexes() once.
+
+        @param deal: a Deal object, or its "page number" (see Deal.toIndex).
+        @return: a list of the positions of the records which hold deal.
+        """
+        if isinstance(deal, int):
+            deal = Deal.fromIndex(deal)
+        target = packOwners([deal.toOwners()])[0]
+        found = []
+        for start in range(0, len(self.records), chunksize):
+            chunk = self.records['owners'][start:start+chunksize]
+            rows = (chunk == target).all(axis=1).nonzero()[0]
+            found.extend((rows + start).tolist())
+        return found
+
+
+    @staticmethod
+    def __toBoard(record):
+        board = Board()
+        owners = unpackOwners(record['owners'][None, :])[0]
+        board['deal'] = Deal.fromOwners(owners)
+        flags = int(record['flags'])
+        board['dealer'] = Direction(flags & 3)
+        board['vuln'] = Vulnerable(flags >> 2 & 3)
+        if record['num']:
+            board['num'] = int(record['num'])
+        return board
+
+
+
+
+class DealStore(DealRecords):
+    """A file of deal records, accessed by memory mapping.
+
+    @param path: the path of the store file.
+    @param mode: 'r' to read the store, or 'a' to read and append records,
+                 creating the store if it does not exist.
+    """
+
+
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'a'):
+            raise ValueError("Invalid mode %r" % mode)
+        self.path = path
+        self.mode = mode
+        if mode == 'a' and not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(_MAGIC)
+        with open(path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError("Not a deal store: %s" % path)
+        super().__init__(self.__map())
+
+
+    def __map(self):
+        recordType = _recordType()
+        count = (os.path.getsize(self.path) - len(_MAGIC)) // recordType.itemsize
+        if count == 0:  # An empty file region cannot be mapped.
+            return numpy.zeros(0, dtype=recordType)
+        return numpy.memmap(self.path, dtype=recordType, mode='r',
+                            offset=len(_MAGIC), shape=(count,))
+
+
+    def append(self, boards):
+        """Appends records of boards, or deals.
+
+        @param boards: an iterable of Board or Deal objects.
+        @return: the number of records appended.
+        """
+        boards = [board if isinstance(board, Board) else {'deal': board}
+                  for board in boards]
+        owners = numpy.array([board['deal'].toOwners() for board in boards],
+                             dtype=numpy.uint8).reshape(len(boards), 52)
+        return self.appendOwners(owners,
+                                 [board.get('dealer', Direction.North).value for board in boards],
+                                 [board.get('vuln', Vulnerable.Nil).value for board in boards],
+                                 [board.get('num', 0) for board in boards])
+
+
+    def appendOwners(self, owners, dealer=0, vuln=0, num=0):
+        """Appends records of deals, given as arrays of card owners.
+
+        @param owners: an array of card owners, of shape (N, 52).
+        @param dealer: the dealer position values, as a scalar or sequence.
+        @param vuln: the vulnerability values, as a scalar or sequence.
+        @param num: the board numbers, as a scalar or sequence, in range
+                    0..65535.
+        @return: the number of records appended.
+        """
+        if self.mode != 'a':
+            raise IOError("Deal store is not open for appending")
+        num = numpy.asarray(num)
+        if num.size and (num.min() < 0 or num.max() > 0xffff):
+            raise ValueError("Board numbers must be in range 0..65535")
+        packed = packOwners(owners)
+        records = numpy.zeros(len(packed), dtype=_recordType())
+        records['owners'] = packed
+        records['flags'] = numpy.asarray(dealer) | numpy.asarray(vuln) << 2
+        records['num'] = num
+        with open(self.path, 'ab') as f:
+            f.write(records.tobytes())
+        self.records = self.__map()
+        return len(records)
+
+
+    def close(self):
+        """Releases the store's memory mapping.
+
+        The mapping is closed when no views of records, from slices or
+        samples, remain in use.
+        """
+        self.records = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,821 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+This module provides a double-dummy solver: given the cards remaining in each
+hand, it computes the number of tricks which a side can take when all four
+hands are visible and every player plays perfectly.
+
+Hands are given as bitboard masks (see the bitboard module). The search is a
+null-window alpha-beta over card plays, answering "can the side take at least
+n tricks?" for successive values of n. It is supported by:
+
+- a transposition table of trick-count bounds at the start of each trick.
+  Each entry records which cards determined the result, and applies to every
+  position in which those cards and all higher cards are held by the same
+  hands, whatever the ranks of the lower cards (partition search);
+- equivalent-card pruning: of a sequence of cards in one hand which are
+  adjacent among the remaining cards of a suit, only one is searched. Lower
+  cards of a suit are also skipped when a search shows that their ranks do
+  not matter;
+- quick-trick bounds at the start of each trick;
+- move ordering heuristics, which try likely winning plays first.
+
+This search solves endings of up to ten cards in each hand in about 0.3
+seconds, but takes 10 to 25 seconds for a complete deal: it does not solve a
+complete deal, or its table of 20 results, in well under a second.
+
+If the endplay package is installed, searches are made instead by its bundled
+DDS library, a native double-dummy solver, which solves a complete deal in
+milliseconds. This is an optional accelerator: results are the same without
+it, only slower.
+"""
+
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from .bitboard import SUIT_MASK, handToMask, popcount
+from .deal import Deal
+from .symbols import Direction, Strain, Suit
+
+try:
+    from endplay import dds  # Optional native solver.
+    from endplay.types import Card as NativeCard, Deal as NativeDeal, Denom, Player
+except ImportError:
+    dds = None
+
+
+# Mapping from Strain symbols (in auction) to Suit symbols (in play).
+TRUMP_SUITS = {Strain.Club: Suit.Club, Strain.Diamond: Suit.Diamond,
+               Strain.Heart: Suit.Heart, Strain.Spade: Suit.Spade,
+               Strain.NoTrump: None}
+
+_SUITS = (0, 1, 2, 3)
+_SHIFTS = (0, 13, 26, 39)
+_RANKS = '23456789TJQKA'
+
+
+# Equivalent cards, for each pair of holdings (in a suit) and cards held
+# elsewhere: a tuple of the representative rank of each sequence, high to low.
+_sequences = {}
+
+
+def _getSequences(holding, others):
+    """Returns the highest rank of each sequence of adjacent cards in holding,
+    from highest to lowest, where cards are adjacent if no card of others
+    lies between them.
+    """
+    key = holding | (others << 13)
+    try:
+        return _sequences[key]
+    except KeyError:
+        pass
+
+    reps = []
+    inSequence = False
+    for rank in range(12, -1, -1):
+        if holding >> rank & 1:
+            if not inSequence:
+                reps.append(rank)
+                inSequence = True
+        elif others >> rank & 1:
+            inSequence = False
+    reps = _sequences[key] = tuple(reps)
+    return reps
+
+
+# Highest cards, for each holding of a suit and number of cards.
+_topCards = {}
+
+
+def _getTopCards(holding, count):
+    """Returns the mask of the count highest cards of holding."""
+    key = holding | (count << 13)
+    try:
+        return _topCards[key]
+    except KeyError:
+        pass
+
+    top, rest = 0, holding
+    for i in range(count):
+        bit = 1 << (rest.bit_length() - 1)
+        top |= bit
+        rest ^= bit
+    _topCards[key] = top
+    return top
+
+
+# Patterns, for each combination of the four holdings in a suit.
+_patterns = {}
+
+
+def _getPattern(holdings):
+    """Returns the pattern of the holdings of a suit (four 13-bit masks,
+    packed into 52 bits), as a pair of integers:
+
+    - the owner (0..3) of each remaining card, from the highest card down,
+      packed into 2 bits per card and aligned to the top of 26 bits;
+    - the number of cards held by each hand, packed into 4 bits per hand.
+
+    Positions which differ only by the ranks of cards already played, but not
+    by the owners of the remaining cards in order, have the same pattern.
+    """
+    try:
+        return _patterns[holdings]
+    except KeyError:
+        pass
+
+    owners, count, lengths = 0, 0, 0
+    for rank in range(12, -1, -1):
+        for player, shift in enumerate(_SHIFTS):
+            if holdings >> (shift + rank) & 1:
+                owners = (owners << 2) | player
+                lengths += 1 << (4*player)
+                count += 1
+                break
+    pattern = _patterns[holdings] = (owners << 2*(13 - count), lengths)
+    return pattern
+
+
+class DoubleDummySolver:
+    """Computes double-dummy trick counts for a set of hands.
+
+    A solver instance keeps its transposition table between searches, so it
+    is efficient to reuse the same instance to solve for different leaders,
+    or for positions reached by playing out the hands.
+    """
+
+
+    def __init__(self, hands, trumpSuit=None, native=None):
+        """
+        @param hands: the remaining cards of each hand, as bitboard masks.
+        @type hands: {Direction: int} or sequence of 4 ints.
+        @param trumpSuit: the trump suit: specify None for No Trumps.
+        @type trumpSuit: Suit or None
+        @param native: if True, searches are made by the DDS library, which
+                       must be installed. If False, by this module. By
+                       default, DDS is used if it is installed.
+        @type native: bool or None
+        """
+        if isinstance(hands, dict):
+            hands = [hands.get(position, 0) for position in Direction]
+        if native is None:
+            native = dds is not None
+        elif native and dds is None:
+            raise ImportError("The DDS solver requires the endplay package")
+        self.hands = list(hands)
+        self.trumpSuit = trumpSuit
+        self.native = native
+        self.nodes = 0  # Number of card plays searched, by this module.
+
+        self.__trump = -1 if trumpSuit is None else trumpSuit.value
+        self.__table = {}  # Bounds on tricks taken by each side.
+
+
+    def tricks(self, leader, played=(), side=None):
+        """Returns the number of remaining tricks which side can take.
+
+        @param leader: the position which leads the current trick.
+        @type leader: Direction
+        @param played: the cards already played to the current trick, in
+                       order of play, which are not included in hands.
+        @type played: list of Card
+        @param side: the side of interest, by default the side not on lead.
+        @type side: Direction (either partner of the side)
+        @return: an integer in range 0..13.
+        """
+        if side is None:
+            side = Direction((leader.value + 1) % 4)
+        # The next player to play holds a card for each remaining trick.
+        total = popcount(self.hands[(leader.value + len(played)) % 4])
+        if self.native and total > 0:
+            return self.__nativeTricks(leader, played, side, total)
+
+        # Find the greatest n such that side can take n tricks, within the
+        # bounds given by any previous searches.
+        lower, upper = self.__bounds(leader, played, side, total)
+        while lower < upper:
+            guess = (lower + upper + 1) // 2
+            if self.canTake(guess, leader, played, side):
+                lower = guess
+            else:
+                upper = guess - 1
+        return lower
+
+
+    def canTake(self, target, leader, played=(), side=None):
+        """Returns True if side can take at least target remaining tricks.
+
+        Parameters are as for tricks().
+        """
+        if side is None:
+            side = Direction((leader.value + 1) % 4)
+        if target <= 0:
+            return True
+        if self.native:
+            return self.tricks(leader, played, side) >= target
+
+        trick, play = self.__makeSearch(side.value & 1)
+        if not played:
+            return bool(trick(leader.value, target) & 1)
+
+        # Replay the current trick, to resume the search within it.
+        trump = self.__trump
+        leadSuit = played[0].suit.value
+        winner, power, trickCards = leader.value, -1, 0
+        for i, card in enumerate(played):
+            code = card.code
+            suit, rank = divmod(code, 13)
+            cardPower = rank + 13 if suit == trump else (rank if suit == leadSuit else -1)
+            if cardPower > power:
+                winner, power = (leader.value + i) % 4, cardPower
+            trickCards |= 1 << code
+        return bool(play(len(played), (leader.value + len(played)) % 4,
+                         leadSuit, winner, power, trickCards, target) & 1)
+
+
+    def __nativeTricks(self, leader, played, side, total):
+        """Returns the number of remaining tricks which side can take, as
+        found by the DDS library.
+        """
+        hands = list(self.hands)
+        for i, card in enumerate(played):
+            hands[(leader.value + i) % 4] |= 1 << card.code
+        # PBN holdings, from spades down, and from the highest rank down.
+        pbn = ' '.join('.'.join(''.join(_RANKS[rank] for rank in range(12, -1, -1)
+                                        if hand >> (shift + rank) & 1)
+                                for shift in reversed(_SHIFTS))
+                       for hand in hands)
+        denom = Denom.nt if self.trumpSuit is None else Denom(3 - self.trumpSuit.value)
+        deal = NativeDeal('N:' + pbn, first=Player(leader.value), trump=denom)
+        for card in played:
+            deal.play(NativeCard(card.suit.name[0] + _RANKS[card.rank.value]))
+
+        # The best card gives the tricks of the side on turn.
+        best = max(tricks for card, tricks in dds.solve_board(deal))
+        turn = (leader.value + len(played)) % 4
+        return best if (turn & 1) == (side.value & 1) else total - best
+
+
+    def __bounds(self, leader, played, side, total):
+        """Returns bounds on the tricks which side can take, from the entries
+        of the transposition table which match the current position.
+        """
+        lower, upper = 0, total
+        if not played:
+            key, owners = self.__position(leader.value)
+            for mask, pattern, low, high, counts in self.__table.get(key, ()):
+                if owners & mask == pattern:
+                    lower, upper = max(lower, low), min(upper, high)
+            if (side.value & 1) != (leader.value & 1):
+                lower, upper = total - upper, total - lower
+        return lower, upper
+
+
+    def __position(self, leader):
+        """Returns the transposition table key of the position at the start of
+        a trick led by leader, and the owners of its cards in rank order.
+        """
+        north, east, south, west = self.hands
+        key, owners = leader, 0
+        for shift in _SHIFTS:
+            holdings = ((north >> shift & SUIT_MASK) | (east >> shift & SUIT_MASK) << 13
+                        | (south >> shift & SUIT_MASK) << 26 | (west >> shift & SUIT_MASK) << 39)
+            try:
+                suitOwners, lengths = _patterns[holdings]
+            except KeyError:
+                suitOwners, lengths = _getPattern(holdings)
+            key = (key << 16) | lengths
+            owners = (owners << 26) | suitOwners
+        return key, owners
+
+
+    def __makeSearch(self, side):
+        """Builds the search functions for the specified side (0 or 1),
+        which search from the start of a trick and from within a trick.
+
+        The functions are closures over the solver state, which avoids
+        attribute lookups in the innermost loops. Each function returns an
+        integer, of which bit 0 is the result of the search, and the higher
+        bits are a mask of the cards whose ranks determined the result.
+        """
+        hands = self.hands
+        trump = self.__trump
+        table = self.__table
+        position = self.__position
+        solver = self
+
+        def trick(leader, need):
+            """Searches the position at the start of a trick led by leader.
+
+            Bounds in the transposition table are stored for the side of the
+            leader, so that entries are shared between both searches. Each
+            entry applies to all positions with the same suit lengths, in
+            which the cards ranked at or above the relevant cards of each suit
+            are held by the same hands: the ranks of lower cards did not
+            affect the result.
+            """
+            remaining = popcount(hands[leader])
+            if need <= 0:
+                return 1
+            if need > remaining:
+                return 0
+            if remaining == 1:
+                return lastTrick(leader)
+
+            leaderSide = (leader & 1) == side
+            # Convert need into a bound on the tricks of the leader's side.
+            leaderNeed = need if leaderSide else remaining - need + 1
+
+            key, owners = position(leader)
+            entries = table.get(key)
+            if entries is None:
+                entries = table[key] = []
+            else:
+                for mask, pattern, lower, upper, counts in entries:
+                    if owners & mask == pattern:
+                        if lower >= leaderNeed:
+                            return (topCards(counts) << 1) | leaderSide
+                        if upper < leaderNeed:
+                            return (topCards(counts) << 1) | (not leaderSide)
+
+            lower, relevant = quickTricks(leader)
+            if lower >= leaderNeed:
+                store(entries, owners, relevant, lower, remaining)
+                return (relevant << 1) | leaderSide
+            opponents, relevant = opponentTricks(leader)
+            if remaining - opponents < leaderNeed:
+                store(entries, owners, relevant, 0, remaining - opponents)
+                return (relevant << 1) | (not leaderSide)
+
+            result = play(0, leader, -1, leader, -1, 0, need)
+            if (result & 1) == leaderSide:  # Leader's side takes leaderNeed tricks.
+                store(entries, owners, result >> 1, leaderNeed, remaining)
+            else:
+                store(entries, owners, result >> 1, 0, leaderNeed - 1)
+            return result
+
+
+        def lastTrick(leader):
+            """Plays out the last trick, in which each hand holds one card."""
+            winningCode = hands[leader].bit_length() - 1
+            winningSuit = winningCode // 13
+            winner = leader
+            for player in ((leader + 1) & 3, (leader + 2) & 3, (leader + 3) & 3):
+                code = hands[player].bit_length() - 1
+                suit = code // 13
+                if suit == winningSuit:
+                    if code > winningCode:
+                        winner, winningCode = player, code
+                elif suit == trump:  # Ruffs a card of the lead suit.
+                    winner, winningCode, winningSuit = player, code, suit
+            result = (winner & 1) == side
+            cards = hands[0] | hands[1] | hands[2] | hands[3]
+            if cards >> _SHIFTS[winningSuit] & SUIT_MASK != 1 << (winningCode - _SHIFTS[winningSuit]):
+                result |= 2 << winningCode
+            return result
+
+
+        def store(entries, owners, relevant, lower, upper):
+            """Adds a bound to the transposition table, which applies to the
+            positions in which the relevant cards and all higher cards are
+            held by the same hands as in the current position.
+            """
+            alive = hands[0] | hands[1] | hands[2] | hands[3]
+            mask, offset, counts = 0, 78, []
+            for shift in _SHIFTS:
+                suitRelevant = relevant >> shift & SUIT_MASK
+                count = 0
+                if suitRelevant:
+                    lowest = (suitRelevant & -suitRelevant).bit_length() - 1
+                    count = popcount((alive >> shift & SUIT_MASK) >> lowest)
+                    mask |= ((1 << 2*count) - 1) << (offset + 26 - 2*count)
+                counts.append(count)
+                offset -= 26
+            entries.append((mask, owners & mask, lower, upper, counts))
+
+
+        def topCards(counts):
+            """Returns the mask of the highest cards remaining in each suit,
+            given the number of cards to include from each suit.
+            """
+            alive = hands[0] | hands[1] | hands[2] | hands[3]
+            relevant = 0
+            for shift, count in zip(_SHIFTS, counts):
+                if count:
+                    aliveSuit = alive >> shift & SUIT_MASK
+                    relevant |= _getTopCards(aliveSuit, count) << shift
+            return relevant
+
+
+        def play(pos, player, leadSuit, winner, winPower, trickCards, need):
+            """Searches the position with player to play the card at position
+            pos (0..3) of the current trick; the result is True if side can
+            take need of the remaining tricks, including the current trick.
+            """
+            solver.nodes += 1
+            hand = hands[player]
+            maximise = (player & 1) == side
+            moves = orderMoves(pos, player, hand, leadSuit, winner, winPower, trickCards)
+            relevant = 0
+            equivalent = 0  # Cards whose play is equivalent to a card searched.
+
+            for code in moves:
+                bit = 1 << code
+                if equivalent & bit:
+                    continue
+                suit = code // 13
+                rank = code - suit*13
+                if pos == 0:
+                    leadSuit = suit
+                    nextWinner, nextPower = player, rank + 13 if suit == trump else rank
+                else:
+                    power = rank + 13 if suit == trump else (rank if suit == leadSuit else -1)
+                    if power > winPower:
+                        nextWinner, nextPower = player, power
+                    else:
+                        nextWinner, nextPower = winner, winPower
+
+                hands[player] = hand ^ bit
+                if pos == 3:
+                    result = trick(nextWinner, need - ((nextWinner & 1) == side))
+                    # The rank of the winning card matters if it beat another
+                    # card of the same suit.
+                    if nextPower >= 13:
+                        winningShift, winningRank = _SHIFTS[trump], nextPower - 13
+                    else:
+                        winningShift, winningRank = _SHIFTS[leadSuit], nextPower
+                    if (trickCards | bit) >> winningShift & SUIT_MASK != 1 << winningRank:
+                        result |= 2 << (winningShift + winningRank)
+                else:
+                    result = play(pos + 1, (player + 1) & 3, leadSuit,
+                                  nextWinner, nextPower, trickCards | bit, need)
+                hands[player] = hand
+
+                if (result & 1) == maximise:
+                    return result  # Cut-off.
+                relevant |= result
+
+                # Lower cards of the suit are equivalent to the card played,
+                # unless the result depended on their ranks.
+                shift = _SHIFTS[suit]
+                suitRelevant = result >> (shift + 1) & SUIT_MASK
+                lowest = (suitRelevant & -suitRelevant).bit_length() - 1 if suitRelevant else 13
+                if rank < lowest:
+                    equivalent |= ((1 << lowest) - 1) << shift
+            return (relevant & ~1) | (not maximise)
+
+
+        def orderMoves(pos, player, hand, leadSuit, winner, winPower, trickCards):
+            """Returns the representative cards of hand which may be played,
+            with the most promising cards first.
+            """
+            alive = hands[0] | hands[1] | hands[2] | hands[3] | trickCards
+            partner = (player + 2) & 3
+
+            if pos == 0:  # Opening lead of a trick.
+                scored = []
+                lho, rho = hands[(player + 1) & 3], hands[(player + 3) & 3]
+                for suit in _SUITS:
+                    shift = _SHIFTS[suit]
+                    holding = hand >> shift & SUIT_MASK
+                    if not holding:
+                        continue
+                    aliveSuit = alive >> shift & SUIT_MASK
+                    top = aliveSuit.bit_length() - 1
+                    partnerTop = (hands[partner] >> (shift + top)) & 1
+                    ruffable = trump >= 0 and suit != trump and (
+                        (not lho >> shift & SUIT_MASK and lho >> _SHIFTS[trump] & SUIT_MASK) or
+                        (not rho >> shift & SUIT_MASK and rho >> _SHIFTS[trump] & SUIT_MASK))
+                    reps = _getSequences(holding, aliveSuit & ~holding)
+                    for rank in reps:
+                        if rank == top:
+                            score = 10 if ruffable else 60 + (suit == trump) * 5
+                        elif partnerTop:
+                            score = 50 - rank
+                        else:
+                            score = 30 - rank
+                        scored.append((score, shift + rank))
+                scored.sort(reverse=True)
+                return [code for score, code in scored]
+
+            shift = _SHIFTS[leadSuit]
+            holding = hand >> shift & SUIT_MASK
+            partnerWinning = winner == partner
+
+            if holding:  # Must follow suit.
+                reps = _getSequences(holding, (alive >> shift & SUIT_MASK) & ~holding)
+                if len(reps) == 1:
+                    return [shift + reps[0]]
+                ascending = reversed(reps)
+                if partnerWinning or winPower >= 13 or reps[0] < winPower:
+                    # Cannot (or need not) win the trick: play low first.
+                    return [shift + rank for rank in ascending]
+                if pos == 1:  # Second hand: low first, then high.
+                    ranks = list(ascending)
+                    return [shift + ranks[0], shift + ranks[-1]] + \
+                           [shift + rank for rank in ranks[1:-1]]
+                # Otherwise, try the lowest winning card first.
+                winning = [rank for rank in ascending if rank > winPower]
+                losing = [rank for rank in reversed(reps) if rank < winPower]
+                return [shift + rank for rank in winning[:1] + losing + winning[1:]]
+
+            # Void in lead suit: discard or ruff.
+            discards, ruffs = [], []
+            for suit in _SUITS:
+                suitShift = _SHIFTS[suit]
+                suitHolding = hand >> suitShift & SUIT_MASK
+                if not suitHolding:
+                    continue
+                reps = _getSequences(suitHolding, (alive >> suitShift & SUIT_MASK) & ~suitHolding)
+                if suit == trump:
+                    ruffs = [suitShift + rank for rank in reversed(reps)
+                             if rank + 13 > winPower]
+                    discards.extend((-1, suitShift + rank) for rank in reversed(reps)
+                                    if rank + 13 <= winPower)
+                else:
+                    # Prefer to discard low cards from long suits.
+                    length = popcount(suitHolding)
+                    discards.extend((length - rank, suitShift + rank) for rank in reps)
+            discards.sort(reverse=True)
+            discards = [code for score, code in discards]
+            if partnerWinning:
+                return discards + ruffs
+            return ruffs[:1] + discards + ruffs[1:]
+
+
+        def quickTricks(leader):
+            """Returns a lower bound on the tricks which leader's side can
+            take by cashing winners, and the mask of the cards whose ranks
+            determine the bound.
+
+            The leader first cashes each card which is higher than all cards
+            of the opponents, and which partner cannot overtake. Then, given
+            a card to lead to partner, the partner cashes winners in the suits
+            where the leader has none.
+            In a trump contract, the winners cashed in a side suit are limited
+            by the length of each opponent who may ruff.
+            """
+            hand = hands[leader]
+            partner = hands[(leader + 2) & 3]
+            lho, rho = hands[(leader + 1) & 3], hands[(leader + 3) & 3]
+            opponents = lho | rho
+            total, partnerTotal, entry = 0, 0, False
+            relevant, partnerRelevant = 0, 0
+            for suit in _SUITS:
+                shift = _SHIFTS[suit]
+                holding = hand >> shift & SUIT_MASK
+                partnerHolding = partner >> shift & SUIT_MASK
+                top = (opponents >> shift & SUIT_MASK).bit_length()
+                limit = 13
+                if trump >= 0 and suit != trump:
+                    # Opponents can ruff when they are void.
+                    for opponent in (lho, rho):
+                        if opponent >> _SHIFTS[trump] & SUIT_MASK:
+                            limit = min(limit, popcount(opponent >> shift & SUIT_MASK))
+
+                if holding >> top:
+                    if partnerHolding >> top:
+                        # Count only the winners which partner cannot overtake.
+                        top = partnerHolding.bit_length()
+                    winners = min(popcount(holding >> top), limit)
+                    if winners:
+                        total += winners
+                        relevant |= _getTopCards(holding, winners) << shift
+                elif partnerHolding >> top and limit:
+                    winners = min(popcount(partnerHolding >> top), limit)
+                    partnerTotal += winners
+                    partnerRelevant |= _getTopCards(partnerHolding, winners) << shift
+                    entry = entry or bool(holding)
+            if entry:
+                total += partnerTotal
+                relevant |= partnerRelevant
+            return min(total, popcount(hand)), relevant
+
+
+        def opponentTricks(leader):
+            """Returns a lower bound on the tricks which the opponents of
+            leader's side must take, the top trumps held in one hand, and
+            the mask of those trumps.
+            """
+            if trump < 0:
+                return 0, 0
+            shift = _SHIFTS[trump]
+            alive = (hands[0] | hands[1] | hands[2] | hands[3]) >> shift & SUIT_MASK
+            for opponent in (hands[(leader + 1) & 3], hands[(leader + 3) & 3]):
+                holding = opponent >> shift & SUIT_MASK
+                winners, relevant = 0, 0
+                while holding and holding.bit_length() == alive.bit_length():
+                    winners += 1
+                    top = 1 << (holding.bit_length() - 1)
+                    holding ^= top
+                    alive ^= top
+                    relevant |= top << shift
+                if winners:
+                    return winners, relevant  # Only one hand holds the top trump.
+            return 0, 0
+
+        return trick, play
+
+
+def solve(deal, strain, leader):
+    """Computes the number of tricks which declarer can take, double-dummy.
+
+    @param deal: a complete deal of hands.
+    @type deal: Deal
+    @param strain: the strain (denomination) of the contract.
+    @type strain: Strain
+    @param leader: the position which makes the opening lead.
+    @type leader: Direction
+    @return: the number of tricks (0..13) which declarer's side can take.
+    """
+    solver = DoubleDummySolver(deal.toMasks(), TRUMP_SUITS[strain])
+    return solver.tricks(leader)
+
+
+def _playPosition(deal, play):
+    """Returns the remaining hands of a play session, as bitboard masks, with
+    the leader of the current trick and the cards played to it.
+    """
+    hands = dict((position, handToMask(hand)) for position, hand in deal.items())
+    for trick in play:
+        for position, card in trick.items():
+            hands[position] &= ~(1 << card.code)
+
+    if play and not play[-1].isComplete():
+        trick = play[-1]
+        leader = trick.leader
+        played = [trick[Direction((leader.value + i) % 4)] for i in range(len(trick))]
+    else:
+        leader, played = play.whoseTurn(), []
+    return hands, leader, played
+
+
+def solvePlay(deal, play):
+    """Computes the number of tricks which declarer can take, double-dummy,
+    from the current position of a play session.
+
+    @param deal: the original deal of hands.
+    @type deal: Deal
+    @param play: the play session, which need not be complete.
+    @type play: TrickPlay
+    @return: the number of tricks (0..13) which declarer's side can take,
+             including the tricks already won.
+    """
+    declarerWon, defenceWon = play.wonTrickCount()
+    if play.isComplete():
+        return declarerWon
+
+    hands, leader, played = _playPosition(deal, play)
+    solver = DoubleDummySolver(hands, play.trumpSuit)
+    return declarerWon + solver.tricks(leader, played, side=play.declarer)
+
+
+def canClaim(deal, play, position, tricks):
+    """Verifies a claim: returns True if the side of position is guaranteed to
+    take at least tricks of the remaining tricks, against any defence.
+
+    The search is double-dummy: the claim is guaranteed if the claimer's side
+    has a line of play which takes tricks against every defence.
+
+    @param deal: the original deal of hands.
+    @type deal: {Direction: [Card]}
+    @param play: the play session, which must not be complete.
+    @type play: TrickPlay
+    @param position: the position of the claimer.
+    @type position: Direction
+    @param tricks: the number of remaining tricks claimed, including the
+                   current trick.
+    @type tricks: int
+    @return: True if the claim is guaranteed, False otherwise.
+    """
+    hands, leader, played = _playPosition(deal, play)
+    solver = DoubleDummySolver(hands, play.trumpSuit)
+    return solver.canTake(tricks, leader, played, side=position)
+
+
+def solveStrain(deal, strain):
+    """Computes the number of tricks which each declarer can take in strain.
+
+    A single solver is shared between the four declarers, so that each search
+    benefits from the transposition table of the previous searches.
+
+    @param deal: a complete deal of hands.
+    @type deal: Deal
+    @param strain: the strain (denomination) of the contract.
+    @type strain: Strain
+    @return: for each declarer position, the number of tricks taken.
+    @rtype: {Direction: int}
+    """
+    solver = DoubleDummySolver(deal.toMasks(), TRUMP_SUITS[strain])
+    return dict((declarer, solver.tricks(Direction((declarer.value + 1) % 4)))
+                for declarer in Direction)
+
+
+def solveTable(deal):
+    """Computes the double-dummy table of a deal: the number of tricks which
+    each declarer can take in each strain.
+
+    @param deal: a complete deal of hands.
+    @type deal: Deal
+    @return: for each strain and declarer position, the number of tricks.
+    @rtype: {Strain: {Direction: int}}
+    """
+    if dds is not None:  # DDS solves the table in a single call.
+        table = dds.calc_dd_table(NativeDeal(deal.toString())).to_list()
+        return dict((strain, dict(zip(Direction, table[(3 - strain.value) % 5])))
+                    for strain in Strain)
+    return dict((strain, solveStrain(deal, strain)) for strain in Strain)
+
+
+def _solveStrainIndex(index, strain):
+    # Solves a deal, given by its index, in a worker process.
+    # Tricks are returned as a tuple, indexed by declarer value.
+    tricks = solveStrain(Deal.fromIndex(index), Strain(strain))
+    return tuple(tricks[declarer] for declarer in Direction)
+
+
+def _solveTableIndex(index):
+    # Solves a deal, given by its index, in a worker process.
+    # Tricks are returned as a tuple for each strain, indexed by strain value.
+    table = solveTable(Deal.fromIndex(index))
+    return tuple(tuple(table[strain][declarer] for declarer in Direction)
+                 for strain in Strain)
+
+
+def solveTables(deals, processes=None, executor=None):
+    """Computes the double-dummy tables of a sequence of deals, spreading the
+    searches across a pool of processes. Each strain of a deal is searched
+    separately, unless DDS solves the whole table (see solveTable()).
+
+    This is a generator, which yields the table of each deal in the order of
+    the input deals, as soon as it is available. Deals are sent to the workers
+    as their index (see Deal.toIndex), rather than as pickled cards. Deals are
+    consumed from the input as the workers become ready, so that the input
+    may be a lazy iterator of any length.
+
+    Closing the generator (for example, by breaking out of a loop over it)
+    cancels all searches which have not yet started.
+
+    @param deals: complete deals, or PBN deal strings.
+    @type deals: iterable of Deal or str
+    @param processes: the number of worker processes, by default the number
+                      of processors. Ignored if executor is specified.
+    @type processes: int or None
+    @param executor: an existing executor, which is not shut down on exit.
+    @type executor: concurrent.futures.Executor or None
+    @return: for each deal, the table returned by solveTable().
+    """
+    ownExecutor = executor is None
+    if ownExecutor:
+        processes = processes or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(processes)
+    # Keep enough searches queued to occupy every worker.
+    window = 2 * (processes or os.cpu_count() or 1)
+    pending = deque()  # For each submitted deal, its searches.
+
+    def collect(futures):
+        if len(futures) == 1:  # The whole table.
+            results = futures[0].result()
+        else:
+            results = [future.result() for future in futures]
+        return dict((strain, dict(zip(Direction, tricks)))
+                    for strain, tricks in zip(Strain, results))
+
+    try:
+        for deal in deals:
+            if isinstance(deal, str):
+                deal = Deal.fromString(deal)
+            index = deal.toIndex()
+            if dds is not None:
+                pending.append([executor.submit(_solveTableIndex, index)])
+            else:
+                pending.append([executor.submit(_solveStrainIndex, index, strain.value)
+                                for strain in Strain])
+            while len(pending) >= window:
+                yield collect(pending.popleft())
+        while pending:
+            yield collect(pending.popleft())
+    finally:
+        for futures in pending:
+            for future in futures:
+                future.cancel()
+        if ownExecutor:
+            executor.shutdown(wait=False)
@@ -0,0 +1,189 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+This module provides hand evaluation metrics, by lookup of suit holdings.
+
+Each metric of a hand is the sum of a metric of its four suit holdings. A
+holding is a 13-bit mask, as in the bitboard module, so each metric of a
+holding is precomputed in a table of 8192 entries, indexed by holding.
+
+The metric tables are:
+
+- LENGTH: the number of cards.
+- POINTS: high card points, Ace = 4, King = 3, Queen = 2, Jack = 1.
+- HONOURS: the number of Aces, Kings, Queens, Jacks and Tens.
+- CONTROLS: Ace = 2, King = 1.
+- QUICK_TRICKS: AK = 2, AQ = 1.5, A = 1, KQ = 1, Kx = 0.5.
+- LOSERS: the losing trick count. Of the first three cards (or fewer, in a
+  shorter suit), each one which is not the Ace, King or Queen is a loser.
+
+Functions evaluate hands, given as Card collections or bitboard masks, and
+deals. The array functions evaluate batches of deals, as arrays of card
+owners (see Deal.fromRandomBatch): these require NumPy.
+"""
+
+
+try:
+    import numpy  # Optional dependency, for arrays of owners.
+except ImportError:
+    numpy = None
+
+from .bitboard import SUIT_MASK, handToMask, popcount, suitMasks
+from .symbols import Rank
+
+
+_ACE, _KING, _QUEEN = (1 << Rank.Ace.value, 1 << Rank.King.value,
+                       1 << Rank.Queen.value)
+
+
+def _quickTricks(holding):
+    if holding & _ACE:
+        if holding & _KING:
+            return 2
+        return 1.5 if holding & _QUEEN else 1
+    if holding & _KING:
+        if holding & _QUEEN:
+            return 1
+        return 0.5 if holding & ~_KING else 0
+    return 0
+
+
+def _losers(holding):
+    counted = min(popcount(holding), 3)
+    honours = (_ACE, _KING, _QUEEN)[:counted]
+    return counted - len([honour for honour in honours if holding & honour])
+
+
+_HOLDINGS = range(SUIT_MASK + 1)
+
+LENGTH = [popcount(holding) for holding in _HOLDINGS]
+POINTS = [(holding >> Rank.Jack.value & 1) + 2*(holding >> Rank.Queen.value & 1) +
+          3*(holding >> Rank.King.value & 1) + 4*(holding >> Rank.Ace.value & 1)
+          for holding in _HOLDINGS]
+HONOURS = [popcount(holding >> Rank.Ten.value) for holding in _HOLDINGS]
+CONTROLS = [2*(holding >> Rank.Ace.value & 1) + (holding >> Rank.King.value & 1)
+            for holding in _HOLDINGS]
+QUICK_TRICKS = [_quickTricks(holding) for holding in _HOLDINGS]
+LOSERS = [_losers(holding) for holding in _HOLDINGS]
+
+
+def _toMask(hand):
+    if isinstance(hand, int):
+        return hand
+    return handToMask(hand)
+
+
+def evaluate(hand, table):
+    """Evaluates a hand by summing a metric over its suit holdings.
+
+    @param hand: a collection of Card objects, or a 52-bit hand mask.
+    @param table: a metric table, such as POINTS.
+    @return: the value of the metric.
+    """
+    clubs, diamonds, hearts, spades = suitMasks(_toMask(hand))
+    return table[clubs] + table[diamonds] + table[hearts] + table[spades]
+
+
+def points(hand):
+    """Returns the high card points of a hand."""
+    return evaluate(hand, POINTS)
+
+
+def honours(hand):
+    """Returns the number of honours (A, K, Q, J, T) in a hand."""
+    return evaluate(hand, HONOURS)
+
+
+def controls(hand):
+    """Returns the controls (Ace = 2, King = 1) of a hand."""
+    return evaluate(hand, CONTROLS)
+
+
+def quickTricks(hand):
+    """Returns the quick tricks of a hand."""
+    return evaluate(hand, QUICK_TRICKS)
+
+
+def losers(hand):
+    """Returns the losing trick count of a hand."""
+    return evaluate(hand, LOSERS)
+
+
+def lengths(hand):
+    """Returns the number of cards of a hand in each suit, by suit value."""
+    return tuple(LENGTH[holding] for holding in suitMasks(_toMask(hand)))
+
+
+def evaluateDeal(deal, table):
+    """Evaluates each hand of a deal.
+
+    @param deal: a Deal object.
+    @param table: a metric table, such as POINTS.
+    @return: for each position, the value of the metric.
+    @rtype: {Direction: value}
+    """
+    return dict((position, evaluate(hand, table)) for position, hand in deal.items())
+
+
+# Array functions.
+
+
+def holdingsArray(owners, position):
+    """Computes the suit holdings of a position, in a batch of deals.
+
+    @param owners: an array of card owners, of shape (N, 52).
+    @param position: a position.
+    @type position: Direction
+    @return: an array of 13-bit holdings, of shape (N, 4), by suit value.
+    """
+    held = (numpy.asarray(owners) == position.value).reshape(-1, 4, 13)
+    weights = numpy.left_shift(1, numpy.arange(13, dtype=numpy.int32))
+    return held.astype(numpy.int32) @ weights
+
+
+def lookupArray(holdings, table):
+    """Looks up a metric for each holding in an array of holdings.
+
+    @param holdings: an array of holdings, as returned by holdingsArray.
+    @param table: a metric table, such as LENGTH.
+    @return: an array of the metric of each holding, of shape (N, 4).
+    """
+    return _tableArray(table)[holdings]
+
+
+def evaluateArray(holdings, table):
+    """Evaluates a metric over an array of holdings.
+
+    @param holdings: an array of holdings, as returned by holdingsArray.
+    @param table: a metric table, such as POINTS.
+    @return: an array of the metric summed over suits, of shape (N,).
+    """
+    return _tableArray(table)[holdings].sum(axis=-1)
+
+
+# NumPy arrays of the metric tables of this module, built on import.
+_ARRAYS = [(table, numpy.array(table)) for table in
+           (LENGTH, POINTS, HONOURS, CONTROLS, QUICK_TRICKS, LOSERS)] if numpy else []
+
+
+def _tableArray(table):
+    for known, array in _ARRAYS:
+        if table is known:
+            return array
+    return numpy.asarray(table)  # Other tables are converted on each call.
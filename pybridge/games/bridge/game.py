@@ -16,6 +16,9 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
 
 
+import copy
+
+from twisted.internet import defer, threads
 from twisted.spread import pb
 from zope.interface import implementer
 
@@ -24,11 +27,13 @@ from pybridge.interfaces.observer import ISubject
 from pybridge.network.error import GameError
 
 from .auction import Auction
+from .bitboard import handToMask
 from .board import Board
+from .doubledummy import canClaim
 from .play import TrickPlay
 from .result import DuplicateResult, Rubber, RubberResult
 
-from .call import Bid, Pass, Double, Redouble
+from .call import Call, Bid, Pass, Double, Redouble
 from .card import Card
 from .symbols import Direction, Suit, Strain, Vulnerable
 
@@ -49,6 +54,13 @@ class Bridge:
     # Valid positions (for Table).
     positions = list(Direction)
 
+    # Claims are verified in a worker, so that the reactor is not blocked by
+    # the search. By default, workers are threads of the reactor's thread pool,
+    # which share the interpreter lock with the reactor; bin/pybridge-server
+    # installs a concurrent.futures pool of processes, to run searches in
+    # parallel.
+    claimExecutor = None
+
     # Mapping from Strain symbols (in auction) to Suit symbols (in play).
     __trumpMap = {Strain.Club: Suit.Club, Strain.Diamond: Suit.Diamond,
                   Strain.Heart: Suit.Heart, Strain.Spade: Suit.Spade,
@@ -66,6 +78,8 @@ class Bridge:
         self.results = []  # Results of previous rounds.
         self.visibleHands = {}  # A subset of deal, containing revealed hands.
         self.players = {}  # One-to-one mapping from BridgePlayer to Direction.
+        self._history = []  # Counts of results and revealed hands, by move.
+        self._sharedBoard = False  # True if board is shared with a fork.
 
         self.options = options
         if self.options.get('RubberScoring'):  # Use rubber scoring?
@@ -88,6 +102,8 @@ class Bridge:
             self.board = board
         elif self.boardQueue:  # Use pre-specified board.
             self.board = self.boardQueue.pop(0)
+        elif self.options.get('QueuedBoards'):  # Only play queued boards?
+            raise GameError("No board queued")
         elif self.board:  # Advance to next round.
             self.board = next(self.board)
         else:  # Create an initial board.
@@ -98,21 +114,12 @@ class Bridge:
             if len(self.rubbers) == 0 or self.rubbers[-1].winner:
                 self.board['vuln'] = Vulnerable.Nil  # First round, new rubber.
             else:
-                pairs = [pair for game, pair in self.rubbers[-1].games]
-                if pairs.count((Direction.North, Direction.South)) > 0:
-                    if pairs.count((Direction.East, Direction.West)) > 0:
-                        self.board['vuln'] = Vulnerable.All
-                    else:
-                        self.board['vuln'] = Vulnerable.NorthSouth
-                else:
-                    if pairs.count((Direction.East, Direction.West)) > 0:
-                        self.board['vuln'] = Vulnerable.EastWest
-                    else:
-                        self.board['vuln'] = Vulnerable.Nil
+                self.board['vuln'] = self.rubbers[-1].vulnerable
 
         self.auction = Auction(self.board['dealer'])  # Start auction.
         self.play = None
         self.visibleHands.clear()
+        del self._history[:]
 
         # Remove deal from board, so it does not appear to clients.
         visibleBoard = self.board.copy()
@@ -130,10 +137,17 @@ class Bridge:
 
 
     def isNextGameReady(self):
+        if self.options.get('QueuedBoards') and not self.boardQueue:
+            return False
         return (not self.inProgress()) and len(self.players) == 4
 
 
-    def getState(self):
+    def getState(self, snapshot=True):
+        """
+        @param snapshot: if True, the calls and cards of the game are given
+                         as a snapshot (see getSnapshot()). Otherwise, they
+                         are listed in full, for clients which replay them.
+        """
         state = {}
 
         state['options'] = self.options
@@ -145,10 +159,14 @@ class Bridge:
             visibleBoard['deal'] = self.visibleHands
             state['board'] = visibleBoard
 
-        if self.auction:
-            state['auction'] = list(self.auction)
-        if self.play is not None:
-            state['play'] = [dict(trick) for trick in self.play]
+        if snapshot:
+            if self.auction is not None:
+                state['snapshot'] = self.getSnapshot()
+        else:
+            if self.auction:
+                state['auction'] = list(self.auction)
+            if self.play is not None:
+                state['play'] = [dict(trick) for trick in self.play]
 
         return state
 
@@ -156,7 +174,10 @@ class Bridge:
     def setState(self, state):
         self.options = state.get('options', {})
 
-        if state.get('board'):
+        if state.get('board') and 'snapshot' in state:
+            self.restoreSnapshot(state['board'], state['snapshot'])
+
+        elif state.get('board'):
             self.start(state['board'])
 
             # Perform validation on game provided by server.
@@ -180,8 +201,93 @@ class Bridge:
         self.results = state.get('results', [])  # Overwrites current game result.
 
 
+    def getSnapshot(self):
+        """Returns a compact snapshot of the calls and cards of the current
+        game, from which the game may be restored by restoreSnapshot().
+
+        Calls and cards are listed by code, in the order in which they were
+        made: the position of each follows from the order of play.
+
+        @return: a dict of the codes of the 'calls' and 'cards' made, and the
+                 position value and tricks of an accepted 'claim', or None.
+        """
+        snapshot = {'calls': [call.code for call in self.auction or ()],
+                    'cards': [], 'claim': None}
+        if self.play is not None:
+            # Tricks keep their cards in the order in which they were played.
+            snapshot['cards'] = [card.code for trick in self.play
+                                 for card in trick.values()]
+            if self.play.claimed is not None:
+                position, tricks = self.play.claimed
+                snapshot['claim'] = (position.value, tricks)
+        return snapshot
+
+
+    def restoreSnapshot(self, board, snapshot, verify=True):
+        """Restores a game from a snapshot (see getSnapshot()).
+
+        The auction and play are rebuilt directly from the snapshot, which is
+        trusted: moves are not validated one by one, and listeners are not
+        notified of them. Instead, listeners are notified of the restored
+        game by a single 'restoreState' event. The moves restored cannot be
+        taken back by undo().
+
+        @param board: the board of the game. Its deal should contain only the
+                      revealed hands, which become visible.
+        @type board: Board
+        @param snapshot: a snapshot, as generated by getSnapshot().
+        @param verify: if True, the snapshot is checked for consistency as a
+                       whole: the calls must be valid, and each card must be
+                       played once, from a revealed hand if it holds the card.
+        """
+        if self.inProgress():
+            raise GameError("Game in progress")
+
+        auction = Auction(board['dealer'])
+        for code in snapshot['calls']:
+            call = Call.fromCode(code)
+            if verify and not auction.isValidCall(call):
+                raise GameError("Snapshot contains invalid call %s" % call)
+            auction.makeCall(call)
+
+        play = None
+        if auction.isComplete() and not auction.isPassedOut():
+            trumpSuit = self.__trumpMap[auction.contract.bid.strain]
+            play = TrickPlay(auction.contract.declarer, trumpSuit)
+            if len(snapshot['cards']) > 52:
+                raise GameError("Snapshot contains cards after play")
+            play.restoreCards([Card.fromCode(code) for code in snapshot['cards']])
+            if snapshot['claim'] is not None:
+                position, tricks = snapshot['claim']
+                play.claimTricks(Direction(position), tricks)
+        elif snapshot['cards']:
+            raise GameError("Snapshot contains cards without contract")
+
+        if verify and play is not None:
+            played = 0
+            for position in Direction:
+                cards = play._played[position.value]
+                hand = board['deal'].get(position)
+                if hand and cards & ~handToMask(hand):
+                    raise GameError("Snapshot contains card not held by %s" % position)
+                played |= cards
+            if bin(played).count('1') != len(snapshot['cards']):
+                raise GameError("Snapshot contains card played twice")
+
+        self.board = board
+        self.auction = auction
+        self.play = play
+        self.visibleHands.clear()
+        self.visibleHands.update(board['deal'])
+        del self._history[:]
+
+        visibleBoard = self.board.copy()
+        visibleBoard['deal'] = self.visibleHands
+        self.notify('restoreState', board=visibleBoard)
+
+
     def updateState(self, event, *args, **kwargs):
-        allowed = ['start', 'makeCall', 'playCard', 'revealHand']
+        allowed = ['start', 'makeCall', 'playCard', 'acceptClaim', 'revealHand']
         if event in allowed:
             try:
                 handler = getattr(self, event)
@@ -266,6 +372,7 @@ class Bridge:
         if not self.auction.isValidCall(call, position):
             raise GameError("Call cannot be made")
 
+        self._history.append((len(self.results), len(self.visibleHands)))
         self.auction.makeCall(call)
 
         if self.auction.isComplete() and not self.auction.isPassedOut():
@@ -320,22 +427,25 @@ class Bridge:
             raise GameError("No game in progress, or play complete")
 
         playfrom = position
+        turn = self.play.whoseTurn()
 
         # Declarer controls dummy's turn.
-        if self.getTurn() == self.play.dummy:
+        if turn == self.play.dummy:
             if position == self.play.declarer:
-                playfrom = self.play.dummy  # Declarer can play from dummy.
-            elif position == self.play.dummy:
+                playfrom = turn  # Declarer can play from dummy.
+            elif position == turn:
                 raise GameError("Dummy cannot play hand")
 
-        if self.getTurn() != playfrom:
+        if turn != playfrom:
             raise GameError("Card played out of turn")
 
         # If complete deal known, validate card play.
-        if len(self.board['deal']) == len(Direction):
-            if not self.play.isValidCardPlay(card, self.board['deal']):
+        deal = self.board['deal']
+        if len(deal) == len(Direction):
+            if not self.play.legalCardMask(deal) >> card.code & 1:
                 raise GameError("Card cannot be played from hand")
 
+        self._history.append((len(self.results), len(self.visibleHands)))
         self.play.playCard(card, playfrom)
 
         # Dummy's hand is revealed when the first card of first trick is played.
@@ -359,6 +469,180 @@ class Bridge:
                     self.revealHand(hand, position)
  
 
+    def claim(self, tricks, player=None, position=None):
+        """Claim tricks of the remaining tricks, for the side of the claimer.
+
+        The claim is verified by a double-dummy search of the remaining cards,
+        which runs in a worker (see claimExecutor). If the claimer's side is
+        guaranteed to take the tricks against every defence, the claim is
+        accepted: the remaining tricks are credited, and play is complete.
+
+        This method expects to receive either a player argument or a position.
+        If both are given, the position argument is disregarded.
+
+        @param tricks: the number of remaining tricks claimed, including the
+                       current trick.
+        @type tricks: int
+        @param player: if specified, a player object.
+        @type player: BridgePlayer or None
+        @param position: if specified, the position of the claimer.
+        @type position: Direction or None
+        @return: a Deferred, which fires with tricks if the claim is accepted,
+                 or fails with GameError if it is rejected.
+        """
+        if not isinstance(tricks, int):
+            raise TypeError("Expected int, got %s" % type(tricks))
+        if player:
+            if player not in self.players:
+                raise GameError("Invalid player reference")
+            position = self.players[player]
+        if position not in Direction:
+            raise TypeError("Expected Direction, got %s" % type(position))
+
+        if self.play is None or self.play.isComplete():
+            raise GameError("No game in progress, or play complete")
+        if position == self.play.dummy:
+            raise GameError("Dummy cannot claim")
+        if not 0 <= tricks <= self.play.remainingTricks():
+            raise GameError("Cannot claim %s tricks" % tricks)
+        if len(self.board['deal']) != len(Direction):
+            raise GameError("Claim cannot be verified without complete deal")
+
+        # The search is made on a fork of the play, which play does not change.
+        play, moves = self.play, len(self._history)
+        d = self._verifyClaim(self.board['deal'], play.fork(), position, tricks)
+
+        def verified(guaranteed):
+            if self.play is not play or len(self._history) != moves:
+                raise GameError("Play changed while claim was verified")
+            if not guaranteed:
+                raise GameError("Claim rejected: tricks are not guaranteed")
+            self.acceptClaim(tricks, position)
+            return tricks
+
+        return d.addCallback(verified)
+
+
+    def _verifyClaim(self, *args):
+        """Calls canClaim(*args) in a worker.
+
+        @return: a Deferred, which fires with the result of canClaim.
+        """
+        if self.claimExecutor is None:
+            return threads.deferToThread(canClaim, *args)
+
+        # Imported here, so that clients may install another reactor first.
+        from twisted.internet import reactor
+        d = defer.Deferred()
+
+        def fire(future):
+            if future.exception() is not None:
+                d.errback(future.exception())
+            else:
+                d.callback(future.result())
+
+        future = self.claimExecutor.submit(canClaim, *args)
+        future.add_done_callback(lambda future: reactor.callFromThread(fire, future))
+        return d
+
+
+    def acceptClaim(self, tricks, position):
+        """Credit the remaining tricks of an accepted claim.
+
+        This method is called when a claim has been verified (see claim()).
+
+        @param tricks: the number of remaining tricks claimed.
+        @type tricks: int
+        @param position: the position of the claimer.
+        @type position: Direction
+        """
+        if self.play is None or self.play.isComplete():
+            raise GameError("No game in progress, or play complete")
+
+        self._history.append((len(self.results), len(self.visibleHands)))
+        self.play.claimTricks(position, tricks)
+
+        if not self.inProgress() and self.board['deal']:
+            tricksMade, _ = self.play.wonTrickCount()
+            self._addResult(self.board, self.contract, tricksMade)
+
+        self.notify('acceptClaim', tricks=tricks, position=position)
+
+        if not self.inProgress() and self.board['deal']:
+            # Reveal all unrevealed hands.
+            for position in Direction:
+                hand = self.board['deal'].get(position)
+                if hand and position not in self.visibleHands:
+                    self.revealHand(hand, position)
+
+
+    def undo(self):
+        """Takes back the last call, card or accepted claim, and any result or
+        revealed hands which followed it.
+
+        Listeners are not notified: undo is intended for the exploration of
+        game states, typically in forks of the game (see fork()).
+
+        @return: the call or card taken back, or None for an accepted claim.
+        """
+        if not self._history:
+            raise GameError("No call or card to take back")
+        results, visible = self._history.pop()
+
+        while len(self.results) > results:
+            self.results.pop()
+            if self.options.get('RubberScoring'):
+                self.rubbers[-1].pop()
+                if len(self.rubbers[-1]) == 0:
+                    self.rubbers.pop()
+        # Hands are revealed in order, so the last hands revealed are removed.
+        for position in list(self.visibleHands)[visible:]:
+            del self.visibleHands[position]
+
+        if self.play is not None and self.play.claimed is not None:
+            self.play.withdrawClaim()
+            return None
+        if self.play is not None and len(self.play) > 0:
+            return self.play.undoCard()[1]
+        self.play = None  # Play had not started.
+        if self.auction.isComplete():  # It may be shared: see fork().
+            self.auction = self.auction.fork()
+        return self.auction.undoCall()
+
+
+    def fork(self):
+        """Returns a copy of the game, which may be played independently.
+
+        The copy has no listeners and no players: moves are made by position,
+        without notification. The auction and play are forked, so that their
+        unchanging parts are shared: a complete auction is shared as a whole,
+        and undo() copies it before taking back its last call. The board is
+        shared until either game reveals a previously unknown hand (see
+        revealHand()). Any number of calls and cards may be made, and taken
+        back (see undo()), in the copy.
+
+        @rtype: Bridge
+        """
+        game = Bridge.__new__(Bridge)
+        game.__dict__.update(self.__dict__)
+        game.listeners = []
+        game.players = {}
+        self._sharedBoard = game._sharedBoard = True
+        if self.auction is not None and not self.auction.isComplete():
+            game.auction = self.auction.fork()
+        if self.play is not None:
+            game.play = self.play.fork()
+        game.boardQueue = list(self.boardQueue)
+        game.results = list(self.results)
+        game.visibleHands = dict(self.visibleHands)
+        game._history = list(self._history)
+        if self.options.get('RubberScoring'):
+            game.rubbers = list(self.rubbers)
+            if game.rubbers:
+                game.rubbers[-1] = Rubber(game.rubbers[-1])
+        return game
+
+
     def _addResult(self, board, contract=None, tricksMade=None):
         if self.options.get('RubberScoring'):
             result = RubberResult(board, contract, tricksMade)
@@ -387,6 +671,10 @@ class Bridge:
         self.visibleHands[position] = hand
         # Add hand to board only if it was previously unknown.
         if not self.board['deal'].get(position):
+            if self._sharedBoard:  # Copy the board shared with a fork.
+                self.board = Board(self.board)
+                self.board['deal'] = copy.copy(self.board['deal'])
+                self._sharedBoard = False
             self.board['deal'][position] = hand
 
         self.notify('revealHand', hand=hand, position=position)
@@ -444,6 +732,13 @@ class BridgePlayer(pb.Referenceable):
             raise GameError(e)
 
 
+    def claim(self, tricks):
+        try:
+            return self.__game.claim(tricks, player=self)
+        except TypeError as e:
+            raise GameError(e)
+
+
     def startNextGame(self):
         if not self.__game.isNextGameReady():
             raise GameError("Not ready to start game")
@@ -455,5 +750,6 @@ class BridgePlayer(pb.Referenceable):
     remote_getHand = getHand
     remote_makeCall = makeCall
     remote_playCard = playCard
+    remote_claim = claim
     remote_startNextGame = startNextGame
 
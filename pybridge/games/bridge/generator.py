@@ -0,0 +1,502 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+Generation of random deals which satisfy constraints on the hands.
+
+Constraints are built from hand features and combined with the operators
+& (and), | (or) and ~ (not). For example, North 15-17 HCP balanced and South
+with 5+ hearts:
+
+    Points(North, 15, 17) & balanced(North) & Length(South, Suit.Heart, 5)
+
+Candidate deals are generated in batches, as arrays of card owners (see
+Deal.fromRandomBatch), and each constraint is evaluated over a whole batch
+with array operations. Only the deals which satisfy all constraints are
+converted into Deal objects.
+
+This requires NumPy.
+"""
+
+
+from itertools import permutations
+import time
+
+try:
+    import numpy  # Optional dependency: see above.
+except ImportError:
+    numpy = None
+
+from . import evaluation
+from .board import Board
+from .deal import Deal
+from .symbols import Direction
+
+
+# All distributions of 13 cards to 4 suits, indexed by suit value.
+_DISTRIBUTIONS = [(c, d, h, 13 - c - d - h) for c in range(14) for d in range(14 - c)
+                  for h in range(14 - c - d)]
+
+
+def _positions(position):
+    if isinstance(position, Direction):
+        return (position,)
+    return tuple(position)
+
+
+
+
+class _Batch:
+    """A batch of candidate deals, with features computed on demand."""
+
+
+    def __init__(self, owners):
+        self.owners = owners
+        self.__cache = {}
+
+
+    def __len__(self):
+        return len(self.owners)
+
+
+    def take(self, rows):
+        """Returns the batch of the deals in the given rows."""
+        return _Batch(self.owners[rows])
+
+
+    def __feature(self, name, position, compute):
+        key = (name, position)
+        if key not in self.__cache:
+            self.__cache[key] = compute(position)
+        return self.__cache[key]
+
+
+    def holdings(self, position):
+        """For each deal and suit, the holding of position (see evaluation)."""
+        return self.__feature('holdings', position,
+                              lambda p: evaluation.holdingsArray(self.owners, p))
+
+
+    def lengths(self, position):
+        """For each deal and suit, the number of cards held by position."""
+        return self.__feature('lengths', position, lambda p:
+                              evaluation.lookupArray(self.holdings(p), evaluation.LENGTH))
+
+
+    def points(self, position):
+        """For each deal, the high card points held by position."""
+        return self.__feature('points', position, lambda p:
+                              evaluation.evaluateArray(self.holdings(p), evaluation.POINTS))
+
+
+    def losers(self, position):
+        """For each deal, the losing trick count of position."""
+        return self.__feature('losers', position, lambda p:
+                              evaluation.evaluateArray(self.holdings(p), evaluation.LOSERS))
+
+
+    def distributions(self, position):
+        """For each deal, an index of the suit lengths held by position."""
+        def compute(position):
+            lengths = self.lengths(position).astype(numpy.int32)
+            return lengths @ numpy.array([14**3, 14**2, 14, 1])
+        return self.__feature('distributions', position, compute)
+
+
+
+
+class Constraint:
+    """A condition on a deal, which may be evaluated over batches of deals."""
+
+
+    def evaluate(self, batch):
+        """Evaluates this constraint over a batch of deals.
+
+        @param batch: the candidate deals.
+        @type batch: _Batch
+        @return: for each deal in batch, True if it satisfies this constraint.
+        @rtype: numpy.ndarray of bool
+        """
+        raise NotImplementedError
+
+
+    def __and__(self, other):
+        return _All(self, other)
+
+
+    def __or__(self, other):
+        return _Any(self, other)
+
+
+    def __invert__(self):
+        return _Not(self)
+
+
+
+
+class _All(Constraint):
+
+    def __init__(self, *constraints):
+        self.constraints = constraints
+
+
+    def evaluate(self, batch):
+        accepted = self.constraints[0].evaluate(batch)
+        for constraint in self.constraints[1:]:
+            # Only evaluate further constraints over deals not yet rejected.
+            rows = accepted.nonzero()[0]
+            if len(rows) == 0:
+                break
+            if len(rows) == len(batch):
+                accepted = constraint.evaluate(batch)
+            else:
+                accepted[rows] = constraint.evaluate(batch.take(rows))
+        return accepted
+
+
+
+
+class _Any(Constraint):
+
+    def __init__(self, *constraints):
+        self.constraints = constraints
+
+
+    def evaluate(self, batch):
+        accepted = self.constraints[0].evaluate(batch)
+        for constraint in self.constraints[1:]:
+            accepted |= constraint.evaluate(batch)
+        return accepted
+
+
+
+
+class _Not(Constraint):
+
+    def __init__(self, constraint):
+        self.constraint = constraint
+
+
+    def evaluate(self, batch):
+        return ~self.constraint.evaluate(batch)
+
+
+
+
+class _Range(Constraint):
+    """A constraint on the range of a feature, summed over positions."""
+
+    feature = None
+
+
+    def __init__(self, position, minimum, maximum):
+        self.positions = _positions(position)
+        self.minimum = minimum
+        self.maximum = maximum
+
+
+    def values(self, batch, position):
+        return getattr(batch, self.feature)(position)
+
+
+    def evaluate(self, batch):
+        total = sum(self.values(batch, position) for position in self.positions)
+        return (self.minimum <= total) & (total <= self.maximum)
+
+
+
+
+class Points(_Range):
+    """High card points (A=4, K=3, Q=2, J=1) held by a position.
+
+    @param position: a position, or a sequence of positions (such as a
+                     partnership) over which points are summed.
+    @param minimum: the least number of points.
+    @param maximum: the greatest number of points.
+    """
+
+    feature = 'points'
+
+
+    def __init__(self, position, minimum=0, maximum=37):
+        super().__init__(position, minimum, maximum)
+
+
+
+
+class Length(_Range):
+    """Number of cards held by a position in a suit.
+
+    @param position: a position, or a sequence of positions (such as a
+                     partnership) over which lengths are summed.
+    @param suit: the suit.
+    @param minimum: the least number of cards.
+    @param maximum: the greatest number of cards.
+    """
+
+
+    def __init__(self, position, suit, minimum=0, maximum=13):
+        super().__init__(position, minimum, maximum)
+        self.suit = suit
+
+
+    def values(self, batch, position):
+        return batch.lengths(position)[:, self.suit.value]
+
+
+
+
+class Losers(_Range):
+    """Losing trick count of a position.
+
+    @param position: a position.
+    @param minimum: the least number of losers.
+    @param maximum: the greatest number of losers.
+    """
+
+    feature = 'losers'
+
+
+    def __init__(self, position, minimum=0, maximum=12):
+        super().__init__(position, minimum, maximum)
+
+
+
+
+class Shape(Constraint):
+    """Distribution of the suit lengths of a position.
+
+    A pattern is a string of four suit lengths, in order spades, hearts,
+    diamonds and clubs, where 'x' matches any length: "5xxx" is any hand with
+    five spades. A pattern prefixed by "any " matches the lengths in any order
+    of suits: "any 4333" matches all 4-3-3-3 hands.
+
+    @param position: a position.
+    @param patterns: the patterns, of which the hand matches at least one.
+    """
+
+
+    def __init__(self, position, *patterns):
+        self.position = position
+        self.patterns = patterns
+        # For each index of suit lengths, True if the distribution matches.
+        self.table = numpy.zeros(14**4, dtype=bool)
+        for lengths in _DISTRIBUTIONS:
+            lengths = tuple(reversed(lengths))  # Spades first.
+            if any(self.__matches(pattern, lengths) for pattern in patterns):
+                c, d, h, s = reversed(lengths)
+                self.table[((c*14 + d)*14 + h)*14 + s] = True
+
+
+    @staticmethod
+    def __matches(pattern, lengths):
+        anyOrder = pattern.startswith('any ')
+        pattern = pattern[4:] if anyOrder else pattern
+        if len(pattern) != 4:
+            raise ValueError("Invalid shape pattern: %r" % pattern)
+        pattern = [None if char == 'x' else int(char) for char in pattern]
+
+        def match(lengths):
+            return all(p is None or p == n for p, n in zip(pattern, lengths))
+
+        if anyOrder:
+            return any(match(order) for order in permutations(lengths))
+        return match(lengths)
+
+
+    def evaluate(self, batch):
+        return self.table[batch.distributions(self.position)]
+
+
+
+
+class Predicate(Constraint):
+    """An arbitrary condition on a deal, evaluated for each candidate deal.
+
+    Unlike other constraints, the predicate is called for each deal, as a
+    Deal object. For efficiency, a predicate should be combined (with &)
+    after other constraints, so that it is evaluated only for deals which
+    satisfy those constraints.
+
+    @param function: a callable, taking a Deal and returning True or False.
+    """
+
+
+    def __init__(self, function):
+        self.function = function
+
+
+    def evaluate(self, batch):
+        accepted = [bool(self.function(Deal.fromOwners(row))) for row in batch.owners]
+        return numpy.array(accepted, dtype=bool)
+
+
+
+
+def balanced(position):
+    """A constraint that position holds a 4-3-3-3, 4-4-3-2 or 5-3-3-2 hand."""
+    return Shape(position, 'any 4333', 'any 4432', 'any 5332')
+
+
+
+
+class DealGenerator:
+    """Generates random deals which satisfy a constraint.
+
+    Candidate deals are generated in batches. The size of each batch adapts
+    to the observed acceptance rate, so that a batch is expected to produce
+    the remaining number of deals requested.
+
+    Some cards may be known to be held by positions, such as revealed hands
+    or cards played: only the other cards are dealt at random, to fill the
+    hands to 13 cards.
+
+    @param constraint: the constraint to be satisfied, or None.
+    @type constraint: Constraint
+    @param seed: if specified, an integer seed or a numpy.random.Generator.
+    @param known: if specified, a dict of the cards known to be held by
+                  positions, keyed by position.
+    """
+
+    minBatchSize = 1024
+    maxBatchSize = 65536
+    maxTries = 10000000  # Candidate deals, for each request without a timeout.
+
+
+    def __init__(self, constraint=None, seed=None, known=None):
+        self.constraint = constraint
+        self.rng = numpy.random.default_rng(seed)
+        self.tried = 0     # Candidate deals generated.
+        self.accepted = 0  # Candidate deals which satisfied the constraint.
+
+        self.known = known or {}
+        # The owners of known cards, the codes of unknown cards, and the
+        # positions of the places left in hands for unknown cards.
+        self.__owners = numpy.zeros(52, dtype=numpy.uint8)
+        unknown = numpy.ones(52, dtype=bool)
+        places = []
+        for position in Direction:
+            cards = self.known.get(position, ())
+            if len(cards) > 13:
+                raise ValueError("More than 13 cards known for %s" % position)
+            for card in cards:
+                if not unknown[card.code]:
+                    raise ValueError("Card %s known in two hands" % card)
+                unknown[card.code] = False
+                self.__owners[card.code] = position.value
+            places.extend([position.value] * (13 - len(cards)))
+        self.__unknown = unknown.nonzero()[0]
+        self.__places = numpy.array(places, dtype=numpy.uint8)
+
+
+    def acceptanceRate(self):
+        """Returns the proportion of candidate deals which were accepted.
+
+        @return: a value between 0 and 1, or None if no deals were generated.
+        """
+        if self.tried == 0:
+            return None
+        return self.accepted / self.tried
+
+
+    def generateOwners(self, count=None, timeout=None):
+        """Generates deals, as an array of card owners (see Deal.fromRandomBatch).
+
+        Generation stops when count deals have been generated, or after timeout
+        seconds have elapsed, whichever is first. Batches are not interrupted,
+        so the time budget may be exceeded by the duration of one batch. If no
+        timeout is given, generation also stops after maxTries candidate deals,
+        so that a constraint which is rarely or never satisfied cannot hold up
+        the caller indefinitely.
+
+        @param count: if specified, the number of deals to generate.
+        @param timeout: if specified, the time budget in seconds.
+        @return: a numpy.uint8 array of shape (N, 52), where N <= count. It
+                 is empty if count is 0, or if timeout is not positive.
+        """
+        if count is None and timeout is None:
+            raise ValueError("Expected count or timeout")
+        deadline = timeout is not None and time.time() + timeout
+        batches, found = [], 0
+
+        tries = self.tried + self.maxTries
+        while count is None or found < count:
+            if deadline and time.time() >= deadline:
+                break
+            if timeout is None and self.tried >= tries:
+                break
+            size = self.__batchSize(None if count is None else count - found)
+            owners = self.__deal(size)
+            if self.constraint:
+                owners = owners[self.constraint.evaluate(_Batch(owners))]
+            self.tried += size
+            self.accepted += len(owners)
+            batches.append(owners)
+            found += len(owners)
+
+        if not batches:  # No time, or no deals, were requested.
+            return numpy.zeros((0, 52), dtype=numpy.uint8)
+        owners = numpy.concatenate(batches)
+        return owners if count is None else owners[:count]
+
+
+    def generate(self, count=None, timeout=None):
+        """Generates deals, as Deal objects. See generateOwners().
+
+        @return: a list of Deal objects.
+        """
+        return [Deal.fromOwners(row) for row in self.generateOwners(count, timeout)]
+
+
+    def boards(self, count=None, timeout=None, board=None):
+        """Generates a sequence of boards, which wrap generated deals.
+
+        Board numbers, dealers and vulnerability follow the duplicate rotation
+        scheme. The boards may be queued for play in a game's boardQueue.
+
+        @param board: if specified, the board which precedes the first board.
+        @type board: Board
+        @return: a list of Board objects.
+        """
+        boards = []
+        for deal in self.generate(count, timeout):
+            if board is None:
+                board = Board.first(deal)
+            else:
+                board = board.__next__(deal)
+            boards.append(board)
+        return boards
+
+
+    def __deal(self, size):
+        if not self.known:
+            return Deal.fromRandomBatch(size, self.rng)
+        # Each row of argsort() is a random permutation of the unknown cards.
+        shuffled = self.rng.random((size, len(self.__unknown))).argsort(axis=1)
+        owners = self.__owners[None, :].repeat(size, axis=0)
+        owners[:, self.__unknown] = self.__places[shuffled]
+        return owners
+
+
+    def __batchSize(self, remaining):
+        if remaining is None or self.accepted == 0:
+            size = self.minBatchSize if self.tried == 0 else self.maxBatchSize
+        else:
+            # Expect to find the remaining deals, with a margin of 20%.
+            size = int(1.2 * remaining * self.tried / self.accepted)
+        return max(self.minBatchSize, min(size, self.maxBatchSize))
@@ -0,0 +1,343 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+Inference of the hands of players from the calls of an auction.
+
+An AuctionInference follows an auction, call by call, through a bidding system
+(see the biddingsystem module). The constraints promised by each call are kept
+as masks of allowed values, and are propagated into ranges of the properties of
+each hand: the suit lengths of a hand sum to 13, each suit is divided among the
+four hands, and so are the 40 high card points, 4 aces and 4 kings. Cards known
+to be held by positions, such as revealed hands, bound the properties of their
+holders.
+
+If the promises of a call are inconsistent with the ranges inferred before it,
+they are disregarded: the caller has departed from the system.
+
+The properties are those of the XML registers. The 'hand-points-all' property
+is taken to be high card points, plus a point for each card beyond four in a
+suit. Other properties are not inferred.
+
+Deals consistent with the inference are sampled by a DealGenerator, which deals
+only the unknown cards. Sampling requires NumPy.
+"""
+
+
+try:
+    import numpy  # Optional dependency, for sampling.
+except ImportError:
+    numpy = None
+
+from . import evaluation
+from .biddingsystem import ANY, bounds, valueRange
+from .bitboard import handToMask
+from .generator import Constraint, DealGenerator
+from .symbols import Direction, Rank, Suit
+
+
+_SUITS = {'club-count': Suit.Club, 'diamond-count': Suit.Diamond,
+          'heart-count': Suit.Heart, 'spade-count': Suit.Spade}
+
+# The greatest value of each property of a hand.
+_MAXIMA = {'hand-points-card': 37, 'hand-points-all': 37 + 9,
+           'club-count': 13, 'diamond-count': 13, 'heart-count': 13,
+           'spade-count': 13, 'ace-count': 4, 'king-count': 4}
+
+# The properties which are divided among the four hands, with their totals.
+_TOTALS = dict([(property, 13) for property in _SUITS] +
+               [('hand-points-card', 40), ('ace-count', 4), ('king-count', 4)])
+
+
+def _values(cards):
+    """Returns the properties of the known cards of a hand."""
+    mask = handToMask(cards)
+    lengths = evaluation.lengths(mask)
+    values = {'hand-points-card': evaluation.points(mask),
+              'ace-count': len([card for card in cards if card.rank == Rank.Ace]),
+              'king-count': len([card for card in cards if card.rank == Rank.King])}
+    values['hand-points-all'] = values['hand-points-card'] + \
+                                sum(max(length - 4, 0) for length in lengths)
+    for property, suit in _SUITS.items():
+        values[property] = lengths[suit.value]
+    return values
+
+
+def _tighten(terms, total):
+    """Tightens the ranges of terms, and the range of their total.
+
+    @param terms: a list of [minimum, maximum] ranges, which sum to total.
+    @param total: a [minimum, maximum] range.
+    @return: True if any range was changed.
+    """
+    low = sum(term[0] for term in terms)
+    high = sum(term[1] for term in terms)
+    changed = False
+    if total[0] < low:
+        total[0], changed = low, True
+    if total[1] > high:
+        total[1], changed = high, True
+    for term in terms:
+        # A term takes what the other terms leave of the total.
+        minimum = total[0] - (high - term[1])
+        maximum = total[1] - (low - term[0])
+        if minimum > term[0]:
+            term[0], changed = minimum, True
+        if maximum < term[1]:
+            term[1], changed = maximum, True
+    return changed
+
+
+
+
+class _Allowed(Constraint):
+    """A constraint on the allowed values of a property, summed over positions."""
+
+
+    def __init__(self, positions, property, constraint):
+        self.positions = positions
+        self.property = property
+        self.constraint = constraint
+
+
+    def values(self, batch, position):
+        if self.property in _SUITS:
+            return batch.lengths(position)[:, _SUITS[self.property].value]
+        if self.property == 'hand-points-card':
+            return batch.points(position)
+        if self.property == 'hand-points-all':
+            excess = numpy.maximum(batch.lengths(position).astype(int) - 4, 0)
+            return batch.points(position) + excess.sum(axis=1)
+        # Aces and kings are the top two bits of each holding.
+        bit = 12 if self.property == 'ace-count' else 11
+        return (batch.holdings(position) >> bit & 1).sum(axis=1)
+
+
+    def evaluate(self, batch):
+        total = sum(self.values(batch, position) for position in self.positions)
+        total = numpy.minimum(total, 62).astype(numpy.int64)
+        return (numpy.int64(self.constraint) >> total) & 1 == 1
+
+
+
+
+class AuctionInference:
+    """Infers the ranges of the properties of hands, from an auction.
+
+    @param system: the bidding system of the players.
+    @type system: BiddingSystem
+    @param dealer: the dealer of the auction.
+    @type dealer: Direction
+    @param known: if specified, a dict of the cards known to be held by
+                  positions, keyed by position.
+    """
+
+
+    def __init__(self, system, dealer, known=None):
+        self.system = system
+        self.dealer = dealer
+        self.known = dict((position, list(cards))
+                          for position, cards in (known or {}).items())
+        self.node = system.root  # The node of the calls made.
+        self.ignored = []  # The indexes of calls whose promises were disregarded.
+        self.__promises = []  # The promises of each call, keyed by positions.
+        self.__replay()
+
+
+    @classmethod
+    def fromAuction(cls, system, auction, known=None):
+        """Infers the hands from the calls made in auction.
+
+        The cards known to a player are those of revealed hands (see
+        Bridge.visibleHands), their own hand, and any cards played.
+
+        @param auction: an Auction.
+        @param known: if specified, a dict of the cards known to be held by
+                      positions, keyed by position.
+        @rtype: AuctionInference
+        """
+        inference = cls(system, auction.dealer, known)
+        for call in auction:
+            inference.makeCall(call)
+        return inference
+
+
+    def makeCall(self, call):
+        """Infers what call promises, from the next position in the auction.
+
+        @param call: the call made.
+        """
+        self.node = self.node.child(call)
+        promises = {}
+        for (seats, property), constraint in self.node.promises.items():
+            if property in _MAXIMA:
+                positions = tuple(sorted((Direction((self.dealer.value + seat) % 4)
+                                          for seat in seats), key=lambda p: p.value))
+                promises[positions, property] = constraint
+        self.__promises.append(promises)
+        if not self.__apply(promises):
+            self.ignored.append(len(self.__promises) - 1)
+
+
+    def reveal(self, position, cards):
+        """Adds cards known to be held by position.
+
+        The auction is inferred again, since promises may become inconsistent
+        with the cards revealed.
+
+        @param position: the holder of the cards.
+        @param cards: the cards held, in addition to those already known.
+        """
+        self.known.setdefault(position, []).extend(cards)
+        self.__replay()
+
+
+    def bounds(self, position, property):
+        """Returns the range of the property of a hand, or of a partnership.
+
+        @param position: a position, or a tuple of positions.
+        @param property: the name of a hand property, such as 'heart-count'.
+        @return: a (minimum, maximum) tuple.
+        """
+        if isinstance(position, Direction):
+            position = (position,)
+        key = (tuple(sorted(position, key=lambda p: p.value)), property)
+        if key in self.ranges:
+            return tuple(self.ranges[key])
+        minimum = sum(self.ranges[(p,), property][0] for p in key[0])
+        maximum = sum(self.ranges[(p,), property][1] for p in key[0])
+        if property in _TOTALS:  # The other hands hold the rest.
+            others = [self.ranges[(p,), property] for p in Direction if p not in key[0]]
+            minimum = max(minimum, _TOTALS[property] - sum(r[1] for r in others))
+            maximum = min(maximum, _TOTALS[property] - sum(r[0] for r in others))
+        return minimum, maximum
+
+
+    def constraint(self):
+        """Returns the constraint on deals consistent with the inference.
+
+        Only the promises of calls are tested: the other ranges follow from
+        them, and from the known cards, which are dealt to their holders.
+
+        @return: a Constraint over deals (see the generator module), or None.
+        """
+        constraint = None
+        for key, allowed in self.masks.items():
+            positions, property = key
+            if all(len(self.known.get(position, ())) == 13 for position in positions):
+                continue  # Hands are known.
+            term = _Allowed(positions, property, allowed & valueRange(*self.ranges[key]))
+            constraint = term if constraint is None else constraint & term
+        return constraint
+
+
+    def generator(self, seed=None):
+        """Returns a generator of deals consistent with the inference.
+
+        @param seed: if specified, an integer seed or a numpy.random.Generator.
+        @rtype: DealGenerator
+        """
+        return DealGenerator(self.constraint(), seed, self.known)
+
+
+    def sample(self, count=None, timeout=None, seed=None):
+        """Samples deals consistent with the inference.
+
+        @param count: if specified, the number of deals to sample.
+        @param timeout: if specified, the time budget in seconds.
+        @param seed: if specified, an integer seed or a numpy.random.Generator.
+        @return: a numpy.uint8 array of card owners (see Deal.fromRandomBatch).
+        """
+        return self.generator(seed).generateOwners(count, timeout)
+
+
+    def __replay(self):
+        self.masks = {}
+        self.ranges = self.__propagate({})
+        if self.ranges is None:
+            raise ValueError("Known cards are inconsistent")
+        self.ignored = [index for index, promises in enumerate(self.__promises)
+                        if not self.__apply(promises)]
+
+
+    def __apply(self, promises):
+        """Adds promises to the inference, if they are consistent with it."""
+        masks = dict(self.masks)
+        for key, constraint in promises.items():
+            masks[key] = masks.get(key, ANY) & constraint
+        ranges = self.__propagate(masks)
+        if ranges is None:
+            return False
+        self.masks, self.ranges = masks, ranges
+        return True
+
+
+    def __propagate(self, masks):
+        """Computes the ranges of properties implied by masks and known cards.
+
+        @return: a dict of [minimum, maximum] ranges by (positions, property),
+                 or None if the ranges are inconsistent.
+        """
+        ranges = {}
+        for position in Direction:
+            cards = self.known.get(position, ())
+            values = _values(cards) if cards else {}
+            for property, maximum in _MAXIMA.items():
+                minimum = values.get(property, 0)
+                if len(cards) == 13:
+                    maximum = minimum
+                ranges[(position,), property] = [minimum, maximum]
+        for positions, property in masks:
+            if len(positions) > 1:
+                ranges[positions, property] = [0, len(positions) * _MAXIMA[property]]
+
+        sums = []  # Lists of terms, with the range of their total.
+        for property, total in _TOTALS.items():
+            sums.append(([ranges[(position,), property] for position in Direction],
+                         [total, total]))
+        for position in Direction:
+            sums.append(([ranges[(position,), property] for property in _SUITS],
+                         [13, 13]))
+        for (positions, property), total in ranges.items():
+            if len(positions) > 1:
+                sums.append(([ranges[(position,), property] for position in positions],
+                             total))
+
+        changed = True
+        while changed:
+            changed = False
+            for key, constraint in masks.items():
+                limits = bounds(constraint & valueRange(*ranges[key]))
+                if limits is None:
+                    return None
+                if list(limits) != ranges[key]:
+                    ranges[key][:] = limits
+                    changed = True
+            for terms, total in sums:
+                changed |= _tighten(terms, total)
+            for position in Direction:
+                # Length points are added to high card points.
+                card = ranges[(position,), 'hand-points-card']
+                total = ranges[(position,), 'hand-points-all']
+                if total[0] < card[0]:
+                    total[0], changed = card[0], True
+                if card[1] > total[1]:
+                    card[1], changed = total[1], True
+            if any(minimum > maximum for minimum, maximum in ranges.values()):
+                return None
+        return ranges
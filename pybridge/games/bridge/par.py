@@ -0,0 +1,179 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+This module computes the par result of a deal from its double-dummy table.
+
+The par contract is the contract reached when both sides bid perfectly, with
+knowledge of the double-dummy table: neither side can improve its score by
+bidding on. Contracts which fail are doubled by the opponents, so that a side
+may sacrifice when the penalty is less than the value of the opponents' contract.
+
+Scores are taken from the lookup table of the result module (see bidScore).
+"""
+
+
+from .call import Bid
+from .result import DOUBLED, UNDOUBLED, bidScore
+from .symbols import Direction, Level, Strain, Vulnerable
+
+
+_SIDES = ((Direction.North, Direction.South), (Direction.East, Direction.West))
+
+_VULNERABLE = {Vulnerable.Nil: (False, False),
+               Vulnerable.NorthSouth: (True, False),
+               Vulnerable.EastWest: (False, True),
+               Vulnerable.All: (True, True)}
+
+# All bids, in ascending order. A bid index is 5 * level + strain.
+_BIDS = [Bid(level, strain) for level in Level for strain in Strain]
+
+
+
+
+class ParContract:
+    """A contract which achieves the par score."""
+
+
+    def __init__(self, bid, declarers, doubled, tricksMade, score):
+        """
+        @param bid: the contract bid.
+        @type bid: Bid
+        @param declarers: the positions which may declare the contract.
+        @type declarers: tuple of Direction
+        @param doubled: True if the contract is doubled (a sacrifice).
+        @type doubled: bool
+        @param tricksMade: the number of tricks made by declarer.
+        @type tricksMade: int
+        @param score: the score of declarer.
+        @type score: int
+        """
+        self.bid = bid
+        self.declarers = declarers
+        self.doubled = doubled
+        self.tricksMade = tricksMade
+        self.score = score
+
+
+    def __eq__(self, other):
+        return isinstance(other, ParContract) and \
+               (self.bid, self.declarers, self.doubled, self.tricksMade) == \
+               (other.bid, other.declarers, other.doubled, other.tricksMade)
+
+
+    def __hash__(self):
+        return hash((self.bid, self.declarers, self.doubled, self.tricksMade))
+
+
+    def __repr__(self):
+        return "ParContract(%r, %r, doubled=%r, tricksMade=%r, score=%r)" % \
+               (self.bid, self.declarers, self.doubled, self.tricksMade, self.score)
+
+
+
+
+def calculatePar(table, dealer, vulnerable=Vulnerable.Nil):
+    """Computes the par score and the par contracts of a deal.
+
+    The bidding is solved by backward induction over the ladder of bids: for
+    each bid, the value to both sides of the opponents either passing (and
+    doubling if the contract fails) or bidding on with their best contract.
+    The dealer's side has the first opportunity to bid.
+
+    @param table: for each strain and declarer, the number of tricks made,
+                  as returned by doubledummy.solveTable().
+    @type table: {Strain: {Direction: int}}
+    @param dealer: the dealer of the board.
+    @type dealer: Direction
+    @param vulnerable: the vulnerability of the board.
+    @type vulnerable: Vulnerable
+    @return: the par score, positive for North-South and negative for
+             East-West, and a list of the par contracts. Of the contracts
+             in a strain which achieve par, only the lowest is listed.
+    @rtype: (int, [ParContract])
+    """
+    vulnerability = _VULNERABLE[vulnerable]
+
+    # For each side and strain: the tricks made by the better declarer.
+    # For each side and bid index: the score of the side's contract,
+    # from the point of view of North-South.
+    values, tricks = ([], []), ([], [])
+    for side, positions in enumerate(_SIDES):
+        sign = 1 if side == 0 else -1
+        tricks[side].extend(max(table[strain][position] for position in positions)
+                            for strain in Strain)
+        for index in range(len(_BIDS)):
+            level, strain = divmod(index, 5)
+            made = tricks[side][strain]
+            # Failing contracts are doubled.
+            doubled = DOUBLED if made < level + 7 else UNDOUBLED
+            values[side].append(sign * bidScore(_BIDS[index], doubled,
+                                                vulnerability[side], made))
+
+    # outcome[side][index]: the final score after side bids index, and the
+    # opponents choose between passing and bidding on.
+    # best[side][index]: the best outcome of any bid by side from index up.
+    count = len(_BIDS)
+    outcome = ([0] * count, [0] * count)
+    best = ([None] * (count + 1), [None] * (count + 1))
+    choose = (max, min)  # North-South maximise the score, East-West minimise.
+
+    for index in range(count - 1, -1, -1):
+        for side in (0, 1):
+            opponents = 1 - side
+            value = values[side][index]
+            outbid = best[opponents][index + 1]
+            if outbid is not None and choose[opponents](value, outbid) != value:
+                value = outbid  # Opponents prefer to bid on.
+            outcome[side][index] = value
+        for side in (0, 1):
+            candidates = [outcome[side][index]]
+            if best[side][index + 1] is not None:
+                candidates.append(best[side][index + 1])
+            best[side][index] = choose[side](candidates)
+
+    first = 0 if dealer in _SIDES[0] else 1
+    second = 1 - first
+    score = choose[second](best[second][0], 0)  # Passed out if neither bids.
+    score = choose[first](best[first][0], score)
+
+    # The par contracts are those which score par, and over which the
+    # opponents have no bid which would score better for them than par.
+    # beaten[side]: the lowest bid index which the side may hold at par.
+    beaten = [0, 0]
+    for index in range(count):
+        for side in (0, 1):
+            opponents = 1 - side
+            if choose[opponents](values[opponents][index], score) != score:
+                beaten[side] = index
+
+    contracts, seen = [], set()
+    for index in range(count):
+        level, strain = divmod(index, 5)
+        for side, positions in enumerate(_SIDES):
+            if values[side][index] != score or index < beaten[side]:
+                continue
+            if (side, strain) in seen:
+                continue  # A lower contract in this strain achieves par.
+            seen.add((side, strain))
+            made = tricks[side][strain]
+            declarers = tuple(position for position in positions
+                              if table[Strain(strain)][position] == made)
+            contracts.append(ParContract(_BIDS[index], declarers, made < level + 7, made,
+                                         score if side == 0 else -score))
+    return score, contracts
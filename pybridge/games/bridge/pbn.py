@@ -0,0 +1,564 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+This module reads and writes games in Portable Bridge Notation (PBN).
+
+See http://www.tistis.nl/pbn/ for the PBN specification.
+
+Files are processed one game at a time: readGames() is a generator, which
+holds only the text of the current game in memory, and PBNWriter writes each
+game as soon as it is given. Archives of any size may be converted with
+constant memory.
+
+Each game read is a PBNGame, from which the Board, and reconstructions of the
+Auction and TrickPlay, are available. The tags of the game are also kept, so
+that tags which are not interpreted (such as Scoring) are preserved, as are
+the annotations of calls and cards and the Note tags which they refer to.
+"""
+
+
+import re
+import time
+
+from .auction import Auction, Contract
+from .board import Board
+from .call import Bid, Pass, Double, Redouble
+from .card import Card
+from .deal import Deal
+from .play import TrickPlay
+from .symbols import Direction, Level, Rank, Strain, Suit, Vulnerable
+
+
+# A single pass of this expression tokenizes the text of a game.
+_TOKENS = re.compile(r'''
+      \[\s*(?P<tag>\w+)\s+"(?P<value>(?:[^"\\]|\\.)*)"\s*\]   # Tag pair.
+    | \{[^}]*\}                                              # Comment.
+    | ;[^\n]*                                                # Comment to end of line.
+    | (?P<newline>\n)
+    | (?P<token>[^\s\[\]{};]+)                               # Section data.
+    ''', re.VERBOSE)
+
+# Escaped characters in tag values.
+_ESCAPE = re.compile(r'\\([\\"])')
+
+# Section tokens which annotate calls and cards: notes and suffixes.
+_ANNOTATION = re.compile(r'^(=\d+=|\$\d+)$|[!?]+$')
+
+_DIRECTIONS = dict(zip('NESW', Direction))
+_DIRECTION_NAMES = dict(zip(Direction, 'NESW'))
+
+_VULNERABLE = {'none': Vulnerable.Nil, 'love': Vulnerable.Nil, '-': Vulnerable.Nil,
+               'ns': Vulnerable.NorthSouth, 'ew': Vulnerable.EastWest,
+               'all': Vulnerable.All, 'both': Vulnerable.All}
+_VULNERABLE_NAMES = {Vulnerable.Nil: 'None', Vulnerable.NorthSouth: 'NS',
+                     Vulnerable.EastWest: 'EW', Vulnerable.All: 'All'}
+
+_STRAINS = {'C': Strain.Club, 'D': Strain.Diamond, 'H': Strain.Heart,
+            'S': Strain.Spade, 'N': Strain.NoTrump, 'NT': Strain.NoTrump}
+_STRAIN_NAMES = {Strain.Club: 'C', Strain.Diamond: 'D', Strain.Heart: 'H',
+                 Strain.Spade: 'S', Strain.NoTrump: 'NT'}
+
+_TRUMP_SUITS = {Strain.Club: Suit.Club, Strain.Diamond: Suit.Diamond,
+                Strain.Heart: Suit.Heart, Strain.Spade: Suit.Spade,
+                Strain.NoTrump: None}
+
+_SUITS = dict(zip('CDHS', Suit))
+_RANKS = dict(zip('23456789TJQKA', Rank))
+_RANKS['10'] = Rank.Ten
+
+# Tags written for each game, in order: the mandatory tag set of export format.
+_ROSTER = ('Event', 'Site', 'Date', 'Board', 'West', 'North', 'East', 'South',
+           'Dealer', 'Vulnerable', 'Deal', 'Scoring', 'Declarer', 'Contract', 'Result')
+
+
+
+
+class PBNGame:
+    """A game read from a PBN file.
+
+    @ivar tags: the value of each tag, as a string.
+    @type tags: {str: str}
+    @ivar sections: the data tokens following each tag, line by line.
+    @type sections: {str: [[str]]}
+    @ivar notes: the values of the Note tags following each section, in order.
+    @type notes: {str: [str]}
+    """
+
+
+    def __init__(self, tags, sections, notes=None):
+        self.tags = tags
+        self.sections = sections
+        self.notes = notes or {}
+        self.board = self.__getBoard()
+        self.__auction, self.__play = None, None
+        self.__annotations = {'Auction': {}, 'Play': {}}
+
+    # The auction and play are reconstructed on first access.
+    auction = property(lambda self: self.__getAuction())
+    play = property(lambda self: self.__getPlay())
+    annotations = property(lambda self: self.__getAnnotations())
+
+
+    def __repr__(self):
+        return "PBNGame(%r)" % self.tags.get('Board')
+
+
+    def __getBoard(self):
+        tags = self.tags
+        board = Board()
+        if tags.get('Deal', '?') != '?':
+            board['deal'] = Deal.fromString(tags['Deal'])
+        if tags.get('Dealer', '?') != '?':
+            board['dealer'] = _DIRECTIONS[tags['Dealer'].upper()]
+        if tags.get('Vulnerable', '?') != '?':
+            board['vuln'] = _VULNERABLE[tags['Vulnerable'].lower()]
+        if tags.get('Board', '?').isdigit():
+            board['num'] = int(tags['Board'])
+        for key, tag in (('event', 'Event'), ('site', 'Site')):
+            if tags.get(tag, '?') not in ('?', ''):
+                board[key] = tags[tag]
+        try:
+            board['time'] = tuple(time.strptime(tags.get('Date', ''), '%Y.%m.%d'))
+        except ValueError:
+            pass  # Unknown date.
+        players = dict((position, tags[tag]) for position, tag in
+                       zip(Direction, ('North', 'East', 'South', 'West'))
+                       if tags.get(tag, '?') not in ('?', ''))
+        if players:
+            board['players'] = players
+        return board
+
+
+    def __getAuction(self):
+        if self.__auction is None and self.tags.get('Auction', '?') != '?':
+            self.__auction = self.__buildAuction()
+        return self.__auction
+
+
+    def __buildAuction(self):
+        auction = Auction(_DIRECTIONS[self.tags['Auction'].upper()])
+        annotations = self.__annotations['Auction']
+        for line in self.sections.get('Auction', []):
+            for token, notes in _annotate(line):
+                if token in ('*', '+'):
+                    return auction  # End of the auction.
+                if token == '-':
+                    continue  # No call.
+                if token.upper() == 'AP':  # All pass.
+                    while not auction.isComplete():
+                        auction.makeCall(Pass())
+                else:
+                    call = parseCall(token)
+                    if not auction.isValidCall(call):
+                        raise ValueError("Invalid call %r in board %s"
+                                         % (token, self.tags.get('Board')))
+                    auction.makeCall(call)
+                if notes:
+                    annotations[len(auction) - 1] = notes
+        return auction
+
+
+    def __getPlay(self):
+        if self.__play is None and self.tags.get('Play', '?') != '?' and self.contract:
+            self.__play = self.__buildPlay()
+        return self.__play
+
+
+    def __buildPlay(self):
+        contract = self.contract
+        deal = self.board.get('deal')
+        first = _DIRECTIONS[self.tags['Play'].upper()]
+        play = TrickPlay(contract.declarer, _TRUMP_SUITS[contract.bid.strain])
+        annotations = self.__annotations['Play']
+
+        for line in self.sections.get('Play', []):
+            tokens = _annotate(line)
+            if ('*', []) in tokens:
+                tokens = tokens[:tokens.index(('*', []))]
+            if not tokens:
+                continue
+            # Cards are listed in the same order of positions for each trick.
+            cards = dict((Direction((first.value + i) % 4), item)
+                         for i, item in enumerate(tokens[:4]))
+            for i in range(4):
+                position = play.whoseTurn()
+                if position is None or cards.get(position, ('-',))[0] == '-':
+                    return play  # Play ended early, by a claim.
+                token, notes = cards[position]
+                card = parseCard(token)
+                if deal and not play.isValidCardPlay(card, deal):
+                    raise ValueError("Invalid card %r in board %s" % (token, self.tags.get('Board')))
+                play.playCard(card, position)
+                if notes:
+                    annotations[card] = notes
+        return play
+
+
+    def __getAnnotations(self):
+        """The annotations of calls, by index in the auction, and of cards."""
+        self.__getAuction(), self.__getPlay()  # Annotations are read with them.
+        return self.__annotations
+
+
+    def __tokens(self, tag):
+        for line in self.sections.get(tag, []):
+            for token in line:
+                token = _ANNOTATION.sub('', token)
+                if token:
+                    yield token
+
+
+    contract = property(lambda self: self.__getContract())
+    result = property(lambda self: self.__getResult())
+    table = property(lambda self: self.__getTable())
+
+
+    def __getContract(self):
+        """The contract, from the auction or else from the Contract tag."""
+        if self.auction is not None:
+            return self.auction.contract
+        value = self.tags.get('Contract', '?').upper()
+        declarer = self.tags.get('Declarer', '?').upper()
+        if value in ('?', '', 'PASS') or declarer not in _DIRECTIONS:
+            return None
+        redoubled = value.endswith('XX')
+        doubled = value.endswith('X')
+        bid = parseCall(value.rstrip('X'))
+        declarer = _DIRECTIONS[declarer]
+        lho = Direction((declarer.value + 1) % 4)
+        contract = Contract.__new__(Contract)
+        # The doubler and redoubler are not recorded: assume declarer's LHO
+        # doubled, and declarer redoubled.
+        contract.setCopyableState((bid, declarer, doubled and lho or None,
+                                   redoubled and declarer or None))
+        return contract
+
+
+    def __getResult(self):
+        """The number of tricks made by declarer, or None."""
+        value = self.tags.get('Result', '?')
+        return int(value) if value.isdigit() else None
+
+
+    def __getTable(self):
+        """The double-dummy table, as returned by doubledummy.solveTable()."""
+        if 'OptimumResultTable' not in self.tags:
+            return None
+        table = dict((strain, {}) for strain in Strain)
+        tokens = list(self.__tokens('OptimumResultTable'))
+        for declarer, strain, tricks in zip(tokens[0::3], tokens[1::3], tokens[2::3]):
+            table[_STRAINS[strain.upper()]][_DIRECTIONS[declarer.upper()]] = int(tricks)
+        return table
+
+
+
+
+def _annotate(tokens):
+    """Pairs each data token with the notes and suffixes which annotate it.
+
+    @param tokens: the tokens of a line of a section.
+    @return: a list of (token, [annotation]) pairs.
+    """
+    items = []
+    for token in tokens:
+        stripped = _ANNOTATION.sub('', token)
+        if stripped:
+            items.append((stripped, [token[len(stripped):]] if stripped != token else []))
+        elif items:
+            items[-1][1].append(token)  # A note, or suffix, of the previous token.
+    return items
+
+
+def _annotated(token, notes):
+    """Returns a data token, with its suffixes attached and notes following."""
+    suffixes = ''.join(note for note in notes if note[0] in '!?')
+    return ' '.join([token + suffixes] + [note for note in notes if note[0] not in '!?'])
+
+
+def parseCall(token):
+    """Returns the call which corresponds to a PBN call token, such as 1NT."""
+    token = token.upper()
+    if token in ('P', 'PASS'):
+        return Pass()
+    if token == 'X':
+        return Double()
+    if token == 'XX':
+        return Redouble()
+    if len(token) >= 2 and token[0] in '1234567' and token[1:] in _STRAINS:
+        return Bid(Level(int(token[0]) - 1), _STRAINS[token[1:]])
+    raise ValueError("Invalid call %r" % token)
+
+
+def parseCard(token):
+    """Returns the card which corresponds to a PBN card token, such as SA."""
+    try:
+        return Card(_RANKS[token[1:].upper()], _SUITS[token[0].upper()])
+    except (KeyError, IndexError):
+        raise ValueError("Invalid card %r" % token)
+
+
+def parseHands(dealstr):
+    """Returns the hands of a PBN deal string, as bitboard masks indexed by
+    position value. Unlike Deal.fromString(), hands may hold fewer than 13
+    cards, as in the endings of a deal.
+    """
+    first, hands = dealstr.split(':')
+    masks = [0, 0, 0, 0]
+    start = _DIRECTIONS[first.strip().upper()].value
+    for i, hand in enumerate(hands.split()):
+        for suit, holding in zip(reversed(Suit), hand.split('.')):
+            for rank in holding:
+                masks[(start + i) % 4] |= 1 << Card(_RANKS[rank.upper()], suit).code
+    return masks
+
+
+def formatCall(call):
+    """Returns the PBN token of a call."""
+    if isinstance(call, Bid):
+        return '%s%s' % (call.level.value + 1, _STRAIN_NAMES[call.strain])
+    return {Pass: 'Pass', Double: 'X', Redouble: 'XX'}[call.__class__]
+
+
+def formatCard(card):
+    """Returns the PBN token of a card."""
+    return 'CDHS'[card.suit.value] + '23456789TJQKA'[card.rank.value]
+
+
+def readGames(source, encoding='latin-1'):
+    """Reads the games of a PBN file, one at a time.
+
+    Games are separated by empty lines. A tag value of "#" repeats the value
+    of the tag in the previous game.
+
+    @param source: a path, or a file object open in text mode.
+    @param encoding: the encoding of the file, if source is a path.
+    @return: a generator of PBNGame objects.
+    """
+    if isinstance(source, str):
+        with open(source, encoding=encoding) as f:
+            yield from readGames(f)
+        return
+
+    previous, lines, comment = {}, [], False
+    for line in source:
+        if line.startswith('%'):
+            continue  # Escaped line.
+        if line.strip():
+            lines.append(line)
+            comment = _isOpenComment(line, comment)
+        elif lines and not comment:
+            game = _parseGame(''.join(lines), previous)
+            lines = []
+            if game:
+                previous = game.tags
+                yield game
+    if lines:
+        game = _parseGame(''.join(lines), previous)
+        if game:
+            yield game
+
+
+def _isOpenComment(line, comment):
+    """Returns True if a comment is open after a line, given whether one was
+    open before it. Blank lines within a comment do not end the game.
+    """
+    start, end = line.rfind('{'), line.rfind('}')
+    return start > end if start != end else comment
+
+
+def _parseGame(text, previous):
+    tags, sections, notes = {}, {}, {}
+    section, owner = None, None
+    for match in _TOKENS.finditer(text):
+        tag, token = match.group('tag'), match.group('token')
+        if tag == 'Note':
+            # Notes refer to the annotations of the section before them.
+            notes.setdefault(owner, []).append(_ESCAPE.sub(r'\1', match.group('value')))
+            section = None
+        elif tag:
+            value = _ESCAPE.sub(r'\1', match.group('value'))
+            if value == '#':
+                value = previous.get(tag, '#')
+            tags[tag] = value
+            owner = tag
+            section = sections.setdefault(tag, [])
+            section.append([])
+        elif section is not None:
+            if match.group('newline'):
+                if section[-1]:
+                    section.append([])
+            elif token:
+                section[-1].append(token)
+    if not tags:
+        return None  # Only comments.
+    for section in sections.values():
+        while section and not section[-1]:
+            section.pop()
+    return PBNGame(tags, sections, notes)
+
+
+
+
+class PBNWriter:
+    """Writes games to a PBN file, one at a time."""
+
+
+    def __init__(self, f):
+        """
+        @param f: a file object, open in text mode.
+        """
+        self.file = f
+        self.count = 0
+        f.write('% PBN 2.1\n% EXPORT\n')
+
+
+    def write(self, board, auction=None, play=None, result=None, table=None, tags=None,
+              annotations=None, notes=None):
+        """Writes a game.
+
+        @param board: the board of the game.
+        @type board: Board
+        @param auction: if specified, the auction of the game.
+        @type auction: Auction
+        @param play: if specified, the play of the game.
+        @type play: TrickPlay
+        @param result: if specified, the number of tricks made by declarer.
+        @type result: int
+        @param table: if specified, the double-dummy table of the deal.
+        @type table: {Strain: {Direction: int}}
+        @param tags: if specified, values of tags which override those
+                     computed from the board.
+        @type tags: {str: str}
+        @param annotations: if specified, the notes and suffixes of calls, by
+                            index in the auction, and of cards.
+        @type annotations: {'Auction': {int: [str]}, 'Play': {Card: [str]}}
+        @param notes: if specified, the values of the Note tags which follow
+                      the auction and the play.
+        @type notes: {str: [str]}
+        """
+        values = self.__getTags(board, auction, result)
+        values.update(tags or {})
+        annotations = annotations or {}
+        notes = notes or {}
+        lines = ['']
+        for tag in _ROSTER:
+            lines.append(self.__tag(tag, values.pop(tag, '?')))
+        for tag, value in values.items():
+            if tag not in ('Auction', 'Play', 'OptimumResultTable', 'Note'):
+                lines.append(self.__tag(tag, value))
+
+        if auction is not None:
+            lines.append(self.__tag('Auction', _DIRECTION_NAMES[auction.dealer]))
+            callNotes = annotations.get('Auction', {})
+            calls = [_annotated(formatCall(call), callNotes.get(i, ()))
+                     for i, call in enumerate(auction)]
+            lines.extend(' '.join(calls[i:i+4]) for i in range(0, len(calls), 4))
+            lines.extend(self.__tag('Note', note) for note in notes.get('Auction', ()))
+
+        if play is not None and len(play) > 0:
+            first = play[0].leader
+            cardNotes = annotations.get('Play', {})
+            lines.append(self.__tag('Play', _DIRECTION_NAMES[first]))
+            for trick in play:
+                lines.append(' '.join(_annotated(formatCard(trick[position]),
+                                                 cardNotes.get(trick[position], ()))
+                                      if position in trick else '-' for position in
+                                      (Direction((first.value + i) % 4) for i in range(4))))
+            if not play.isComplete():
+                lines.append('*')
+            lines.extend(self.__tag('Note', note) for note in notes.get('Play', ()))
+
+        if table is not None:
+            lines.append(self.__tag('OptimumResultTable',
+                                    'Declarer;1R\\Denomination\\2R\\Result\\2R'))
+            for position in (Direction.North, Direction.South, Direction.East, Direction.West):
+                for strain in reversed(Strain):
+                    lines.append('%s %s %s' % (_DIRECTION_NAMES[position],
+                                               _STRAIN_NAMES[strain], table[strain][position]))
+
+        self.file.write('\n'.join(lines) + '\n')
+        self.count += 1
+
+
+    def writeGame(self, game):
+        """Writes a game which was read by readGames().
+
+        @param game: a PBNGame object.
+        """
+        self.write(game.board, game.auction, game.play, game.result, game.table,
+                   dict((tag, value) for tag, value in game.tags.items()
+                        if tag not in ('Auction', 'Play', 'OptimumResultTable')),
+                   game.annotations, game.notes)
+
+
+    @staticmethod
+    def __tag(tag, value):
+        return '[%s "%s"]' % (tag, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+
+
+    @staticmethod
+    def __getTags(board, auction, result):
+        tags = {}
+        dealer = board.get('dealer', Direction.North)
+        if board.get('deal'):
+            tags['Deal'] = board['deal'].toString(dealer)
+        if 'dealer' in board:
+            tags['Dealer'] = _DIRECTION_NAMES[board['dealer']]
+        if 'vuln' in board:
+            tags['Vulnerable'] = _VULNERABLE_NAMES[board['vuln']]
+        if 'num' in board:
+            tags['Board'] = str(board['num'])
+        if board.get('time'):
+            tags['Date'] = time.strftime('%Y.%m.%d', tuple(board['time']))
+        for key, tag in (('event', 'Event'), ('site', 'Site')):
+            if board.get(key):
+                tags[tag] = board[key]
+        for position, name in board.get('players', {}).items():
+            tags[position.name] = name
+
+        if auction is not None and auction.isComplete():
+            contract = auction.contract
+            if contract is None:
+                tags['Contract'] = 'Pass'
+                tags['Declarer'] = ''
+            else:
+                tags['Contract'] = formatCall(contract.bid) + \
+                                   (contract.redoubleBy and 'XX' or contract.doubleBy and 'X' or '')
+                tags['Declarer'] = _DIRECTION_NAMES[contract.declarer]
+        if result is not None:
+            tags['Result'] = str(result)
+        return tags
+
+
+
+
+def writeGames(games, f):
+    """Writes games, as read by readGames(), to a PBN file.
+
+    @param games: an iterable of PBNGame objects.
+    @param f: a path, or a file object open in text mode.
+    @return: the number of games written.
+    """
+    if isinstance(f, str):
+        with open(f, 'w', encoding='latin-1') as out:
+            return writeGames(games, out)
+    writer = PBNWriter(f)
+    for game in games:
+        writer.writeGame(game)
+    return writer.count
@@ -16,11 +16,26 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
 
 
+from .bitboard import handToMask, legalMask, maskToHand, trickWinner
 from .symbols import Direction
 
 
+_POSITIONS = tuple(Direction)  # Indexed by position value.
+
+
+
+
 class Trick(dict):
-    """A trick is a set of cards, each played from the hand of a player."""
+    """A trick is a set of cards, each played from the hand of a player.
+
+    The cards of the trick are also kept as a mask (see the bitboard module),
+    from which the winner of a complete trick is found when its last card is
+    played.
+    """
+
+    leadSuit = None
+    cards = 0  # The mask of the cards played.
+    _winner = None
 
 
     def __init__(self, leader, trumpSuit):
@@ -33,8 +48,49 @@ class Trick(dict):
         self.leader = leader
         self.trumpSuit = trumpSuit
 
-    winningCard = property(lambda self: self._getWinningCard())
-    winner = property(lambda self: self.whoPlayed(self.winningCard))
+    winningCard = property(lambda self: self.get(self._winner))
+    winner = property(lambda self: self._winner)
+
+
+    def __setitem__(self, position, card):
+        dict.__setitem__(self, position, card)
+        if self.leadSuit is None:
+            self.leadSuit = card.suit
+        self.cards |= 1 << card.code
+        if len(self) == 4:
+            code = trickWinner(self.cards, self.leadSuit, self.trumpSuit)
+            for player, played in self.items():
+                if played.code == code:
+                    self._winner = player
+
+
+    def __reduce__(self):
+        # The state of the trick is restored as its cards are replayed.
+        return Trick, (self.leader, self.trumpSuit), None, None, iter(self.items())
+
+
+    def copy(self):
+        """Returns a copy of the trick.
+
+        @rtype: Trick
+        """
+        trick = Trick.__new__(Trick)
+        dict.update(trick, self)
+        trick.__dict__.update(self.__dict__)
+        return trick
+
+
+    def takeBack(self):
+        """Removes the last card played to the trick.
+
+        @return: the position and the card taken back.
+        """
+        position, card = dict.popitem(self)
+        self.cards &= ~(1 << card.code)
+        self._winner = None
+        if len(self) == 0:
+            self.leadSuit = None
+        return position, card
 
 
     def isComplete(self):
@@ -42,7 +98,7 @@ class Trick(dict):
         
         @return: True if trick is complete, False otherwise.
         """
-        return set(self.keys()) == set(Direction)  # A card from each position.
+        return len(self) == 4  # A card from each position.
 
 
     def whoseTurn(self):
@@ -50,11 +106,10 @@ class Trick(dict):
         
         @return: the next position to play a card, or None.
         """
-        if self.isComplete():
+        if len(self) == 4:
             return
 
-        numCardsPlayed = len(self)
-        return Direction((self.leader.value + numCardsPlayed) % 4)
+        return _POSITIONS[(self.leader.value + len(self)) % 4]
 
 
     def whoPlayed(self, playedcard):
@@ -68,30 +123,6 @@ class Trick(dict):
                 return position
 
 
-    def _getWinningCard(self):
-        """If the trick is complete, returns the winning card.
-        
-        - In a trump contract, the highest ranked trump card wins.
-        - Otherwise, the highest ranked card following the lead suit wins.
-        
-        @return: the winning card, or None if trick is not complete.
-        """
-        if not self.isComplete():
-            return
-
-        if self.trumpSuit:  # Suit contract.
-            # The highest ranked trump card wins.
-            trumpcards = [c for c in list(self.values()) if c.suit == self.trumpSuit]
-            if trumpcards:
-                return max(trumpcards)
-
-        # No trump cards played, or No Trump contract.
-        # The highest ranked card in the lead card's suit wins.
-        leadsuit = self[self.leader].suit
-        followers = [c for c in list(self.values()) if c.suit == leadsuit]
-        return max(followers)
-
-
 
 
 class TrickPlay(list):
@@ -99,6 +130,11 @@ class TrickPlay(list):
     
     This code is generalised, and could easily be adapted to support a
     variety of trick-taking card games.
+
+    The state of play (cards played from each hand, the current trick, the
+    tricks won by each position and the position on turn) is updated as each
+    card is played, so that queries do not examine the tricks. Cards must
+    therefore only be played with playCard().
     """
 
 
@@ -111,19 +147,28 @@ class TrickPlay(list):
         """
         self.declarer = declarer
         self.trumpSuit = trumpSuit
+        self._played = [0, 0, 0, 0]  # Masks of cards played, by position value.
+        self._won = [0, 0, 0, 0]  # Tricks won, by position value.
+        self._completed = 0  # The number of complete tricks.
+        self._turn = self.lho  # Declarer's LHO leads the first trick.
+        self.claimed = None  # The claimer and tricks of an accepted claim.
+        # Hands of the deal, with their masks, by position value.
+        self._hands = [None, None, None, None]
+        self._handMasks = [0, 0, 0, 0]
 
     # Other positions, respective to declarer.
-    dummy = property(lambda self: Direction((self.declarer.value + 2) % 4))
-    lho = property(lambda self: Direction((self.declarer.value + 1) % 4))
-    rho = property(lambda self: Direction((self.declarer.value + 3) % 4))
+    dummy = property(lambda self: _POSITIONS[(self.declarer.value + 2) % 4])
+    lho = property(lambda self: _POSITIONS[(self.declarer.value + 1) % 4])
+    rho = property(lambda self: _POSITIONS[(self.declarer.value + 3) % 4])
 
 
     def isComplete(self):
-        """Play is complete if there are 13 complete tricks.
+        """Play is complete if there are 13 complete tricks, or if a claim of
+        the remaining tricks has been accepted.
 
         @return: True if play is complete, False otherwise.
         """
-        return len([trick for trick in self if trick.isComplete()]) == 13
+        return self._completed == 13 or self.claimed is not None
 
 
     def isValidCardPlay(self, card, deal):
@@ -137,7 +182,8 @@ class TrickPlay(list):
         In addition, if the current trick has an established lead, then
         card must follow lead suit OR hand must be void in lead suit.
         
-        Assumes that players do not attempt to play cards from other hands.
+        Assumes that players do not attempt to play cards from other hands,
+        and that the hands of deal are not modified during play.
 
         @param card: the candidate card.
         @type card: Card
@@ -145,23 +191,42 @@ class TrickPlay(list):
         @type deal: {Direction: [Card]}
         @return: True if card is playable, False otherwise.
         """
+        return bool(self.legalCardMask(deal) >> card.code & 1)
+
+
+    def legalCardMask(self, deal, position=None):
+        """Returns the cards which may be played from a hand, as a mask.
+
+        @param deal: the original deal of hands, which need only contain the
+                     hand of position.
+        @type deal: {Direction: [Card]}
+        @param position: if specified, the position of the hand. Otherwise,
+                         the position on turn.
+        @return: a mask (see the bitboard module) of the playable cards,
+                 which is empty if position is not on turn.
+        @rtype: int
+        """
         turn = self.whoseTurn()
-        played = [trick[turn] for trick in self if trick.get(turn)]
-        hand = set(deal[turn]) - set(played)  # Cards currently in hand.
+        if turn is None or (position is not None and position != turn):
+            return 0
 
-        # Some sanity checks.
-        if self.isComplete() or card not in hand:
-            return False
+        # Cards currently in hand.
+        hand = self._handMask(deal[turn], turn) & ~self._played[turn.value]
+        if len(self) == 0 or len(self[-1]) == 4:
+            return hand  # First card in the next (new) trick.
+        # Current trick has an established lead: hand must follow suit.
+        return legalMask(hand, self[-1].leadSuit)
 
-        if len(self) == 0 or self[-1].isComplete():
-            return True  # First card in the next (new) trick.
 
-        # Current trick has an established lead: check for revoke.
-        trick = self[-1]
-        leadsuit = trick[trick.leader].suit
-        followers = [c for c in hand if c.suit == leadsuit]
-        # Hand void in lead suit, or card follows lead suit.
-        return followers == [] or card in followers
+    def legalCards(self, deal, position=None):
+        """Returns the cards which may be played from a hand.
+
+        @param deal: the original deal of hands: see legalCardMask().
+        @param position: if specified, the position of the hand.
+        @return: the set of playable cards.
+        @rtype: frozenset
+        """
+        return frozenset(maskToHand(self.legalCardMask(deal, position)))
 
 
     def playCard(self, card, position):
@@ -179,14 +244,93 @@ class TrickPlay(list):
         assert self.whoseTurn() == position
 
         # If current trick is complete, instantiate a new trick.
-        if len(self) == 0 or self[-1].isComplete():
-            trick = Trick(leader=self.whoseTurn(), trumpSuit=self.trumpSuit)
+        if len(self) == 0 or len(self[-1]) == 4:
+            trick = Trick(leader=position, trumpSuit=self.trumpSuit)
             self.append(trick)
         else:
             trick = self[-1]
             assert trick.get(position) is None
 
         trick[position] = card
+        self._played[position.value] |= 1 << card.code
+        if len(trick) == 4:
+            self._completed += 1
+            self._won[trick.winner.value] += 1
+            self._turn = trick.winner  # The winner leads the next trick.
+        else:
+            self._turn = _POSITIONS[(position.value + 1) % 4]
+
+
+    def restoreCards(self, cards):
+        """Plays a sequence of cards from the start of play, each from the
+        position on turn, building each trick directly.
+
+        Please note that the cards are trusted: they are not checked against
+        the rules of play (see Bridge.restoreSnapshot).
+
+        @param cards: the cards played, in order.
+        @type cards: sequence of Card
+        """
+        assert len(self) == 0
+        leader = self.lho  # Declarer's LHO leads the first trick.
+        for start in range(0, len(cards), 4):
+            assert self._completed < 13
+            trick = Trick(leader=leader, trumpSuit=self.trumpSuit)
+            for offset, card in enumerate(cards[start:start + 4]):
+                position = _POSITIONS[(leader.value + offset) % 4]
+                trick[position] = card
+                self._played[position.value] |= 1 << card.code
+            self.append(trick)
+            if len(trick) == 4:
+                self._completed += 1
+                self._won[trick.winner.value] += 1
+                leader = trick.winner  # The winner leads the next trick.
+        self._turn = leader
+        if len(self) > 0 and len(self[-1]) < 4:
+            self._turn = _POSITIONS[(leader.value + len(self[-1])) % 4]
+
+
+    def undoCard(self):
+        """Takes back the last card played, restoring the state of play before
+        it was played.
+
+        @return: the position and the card taken back.
+        """
+        if len(self) == 0:
+            raise IndexError("No card to take back")
+        trick = self[-1]
+        if len(trick) == 4:
+            self._completed -= 1
+            self._won[trick.winner.value] -= 1
+            # Complete tricks may be shared with forks: see fork().
+            trick = self[-1] = trick.copy()
+        position, card = trick.takeBack()
+        self._played[position.value] &= ~(1 << card.code)
+        self._turn = position
+        if len(trick) == 0:
+            self.pop()
+        return position, card
+
+
+    def fork(self):
+        """Returns a copy of the play, in which cards may be played (and taken
+        back) independently.
+
+        Complete tricks do not change, so they are shared with the copy:
+        undoCard() copies a complete trick before taking back its last card.
+        The masks of the hands are shared too, since a hand's mask is only
+        ever replaced by that of another hand.
+
+        @rtype: TrickPlay
+        """
+        play = TrickPlay.__new__(TrickPlay)
+        play.extend(self)
+        play.__dict__.update(self.__dict__)
+        play._played = self._played[:]
+        play._won = self._won[:]
+        if len(self) > 0 and len(self[-1]) < 4:
+            play[-1] = self[-1].copy()
+        return play
 
 
     def whoseTurn(self):
@@ -194,29 +338,23 @@ class TrickPlay(list):
         
         @return: the next position to play a card, or None.
         """
-        if self.isComplete():
+        if self._completed == 13 or self.claimed is not None:
             return
-
-        try:
-            currentTrick = self[-1]  # Raises IndexError if no tricks.
-        except IndexError:
-            return self.lho  # Declarer's LHO leads the first trick.
-
-        if currentTrick.isComplete():
-            return currentTrick.winner  # The winner leads the next trick.
-        else:
-            return currentTrick.whoseTurn()
+        return self._turn  # Kept by playCard() and undoCard().
 
 
     def wonTricks(self):
         """Returns, for each position a list of tricks won by that position.
+
+        Only tricks which were played are listed: tricks credited by an
+        accepted claim are counted by wonTrickCount(), but have no cards.
         
         @return: a dict containing, for each position, the list of won tricks.
         @rtype: {Direction: [Trick]}
         """
-        won = dict([(pos, []) for pos in Direction])
+        won = dict((position, []) for position in Direction)
         for trick in self:
-            if trick.isComplete():  # Trick is complete <=> trick has winner.
+            if len(trick) == 4:  # Trick is complete <=> trick has winner.
                 won[trick.winner].append(trick)
         return won
 
@@ -227,8 +365,54 @@ class TrickPlay(list):
         @return: a 2-tuple containing the declarer and defender trick counts.
         @rtype: (int, int)
         """
-        tricks = self.wonTricks()
-        declarerWon = len(tricks[self.declarer]) + len(tricks[self.dummy])
-        defenceWon = len(tricks[self.lho]) + len(tricks[self.rho])
+        declarerWon = self._won[self.declarer.value] + self._won[self.dummy.value]
+        defenceWon = self._completed - declarerWon
+        if self.claimed is not None:  # Remaining tricks are credited by claim.
+            position, tricks = self.claimed
+            conceded = 13 - self._completed - tricks
+            if position in (self.declarer, self.dummy):
+                declarerWon, defenceWon = declarerWon + tricks, defenceWon + conceded
+            else:
+                declarerWon, defenceWon = declarerWon + conceded, defenceWon + tricks
         return (declarerWon, defenceWon)
 
+
+    def remainingTricks(self):
+        """Returns the number of tricks which have not been completed,
+        including the current trick.
+
+        @rtype: int
+        """
+        return 13 - self._completed
+
+
+    def claimTricks(self, position, tricks):
+        """Credits the remaining tricks in bulk, after a claim has been
+        accepted: the side of position takes tricks of the remaining tricks,
+        and the other side takes the rest. Play is then complete.
+
+        Please note that the claim must be verified before calling this method
+        (see doubledummy.canClaim).
+
+        @param position: the position of the claimer.
+        @type position: Direction
+        @param tricks: the number of remaining tricks claimed.
+        @type tricks: int
+        """
+        assert not self.isComplete()
+        assert 0 <= tricks <= self.remainingTricks()
+        self.claimed = (position, tricks)
+
+
+    def withdrawClaim(self):
+        """Withdraws an accepted claim, so that play may continue."""
+        assert self.claimed is not None
+        self.claimed = None
+
+
+    def _handMask(self, hand, position):
+        """Returns the mask of hand, which is cached while hand is unchanged."""
+        if hand is not self._hands[position.value]:
+            self._hands[position.value] = hand
+            self._handMasks[position.value] = handToMask(hand)
+        return self._handMasks[position.value]
@@ -18,7 +18,17 @@
 
 from twisted.spread import pb
 
-from .symbols import Direction, Strain, Vulnerable
+try:
+    import numpy  # Optional dependency, for scoreMany().
+except ImportError:
+    numpy = None
+
+from .call import Bid
+from .symbols import Direction, Level, Strain, Vulnerable
+
+
+# Double status of a contract, as indexed in the score tables.
+UNDOUBLED, DOUBLED, REDOUBLED = 0, 1, 2
 
 
 class GameResult:
@@ -137,7 +147,7 @@ class GameResult:
                 else:
                     components['slambonus'] = 500
 
-            elif components['odd'] >= 100:  # Game contract (non-slam).
+            if components['odd'] >= 100:  # Game contract, including slams.
                 # 500 for game if vulnerable, 300 if not.
                 if isVulnerable:
                     components['gamebonus'] = 500
@@ -191,6 +201,105 @@ class GameResult:
 
 
 
+class _TableEntry(GameResult):
+    """A contract and result, as read by the scoring rules."""
+
+
+    def __init__(self, bid, doubled, isVulnerable, tricksMade):
+        self.contract = self
+        self.bid = bid
+        self.doubleBy = doubled != UNDOUBLED
+        self.redoubleBy = doubled == REDOUBLED
+        self.isVulnerable = isVulnerable
+        self.tricksMade = tricksMade
+
+
+def _tableIndex(bidCode, doubled, isVulnerable, tricksMade):
+    return ((isVulnerable * 3 + doubled) * 35 + bidCode) * 14 + tricksMade
+
+
+def _buildTables():
+    # For each vulnerability, double status, bid code and tricks made (in
+    # the order of _tableIndex): the duplicate score of declarer, and the
+    # rubber scores above and below the line.
+    duplicate, above, below = [], [], []
+    for isVulnerable in (False, True):
+        for doubled in (UNDOUBLED, DOUBLED, REDOUBLED):
+            for bid in [Bid(level, strain) for level in Level for strain in Strain]:
+                for tricksMade in range(14):
+                    components = _TableEntry(bid, doubled, isVulnerable,
+                                             tricksMade)._getScoreComponents()
+                    duplicate.append(sum(components.values()))
+                    above.append(sum(value for key, value in components.items()
+                                     if key in ('over', 'under', 'slambonus',
+                                                'insultbonus')))
+                    below.append(components.get('odd', 0))
+    return tuple(duplicate), tuple(above), tuple(below)
+
+_DUPLICATE_SCORES, _ABOVE_SCORES, _BELOW_SCORES = _buildTables()
+_scoreArray = None  # _DUPLICATE_SCORES as a NumPy array, built by scoreMany().
+
+
+def bidScore(bid, doubled, isVulnerable, tricksMade):
+    """Returns the duplicate score of a contract, from a lookup table.
+
+    @param bid: the contract bid.
+    @type bid: Bid
+    @param doubled: UNDOUBLED, DOUBLED or REDOUBLED.
+    @param isVulnerable: True if declarer is vulnerable.
+    @param tricksMade: the tricks taken by declarer, in range 0..13.
+    @return: score value: positive for declarer, negative for defenders.
+    @rtype: int
+    """
+    return _DUPLICATE_SCORES[_tableIndex(bid.code, doubled, isVulnerable, tricksMade)]
+
+
+def score(contract, isVulnerable, tricksMade):
+    """Returns the duplicate score of a contract, from a lookup table.
+
+    @param contract: the contract, or None if the auction was passed out.
+    @type contract: Contract or None
+    @param isVulnerable: True if declarer is vulnerable.
+    @param tricksMade: the tricks taken by declarer, in range 0..13.
+    @return: score value: positive for declarer, negative for defenders.
+    @rtype: int
+    """
+    if contract is None:
+        return 0
+    return bidScore(contract.bid, _doubleStatus(contract), isVulnerable, tricksMade)
+
+
+def scoreMany(bids, doubled, isVulnerable, tricksMade):
+    """Computes the duplicate scores of arrays of contracts and results.
+
+    Arguments are arrays (or scalars) which are broadcast together.
+
+    @param bids: the codes of the contract bids (see Call.code), or -1 for
+                 passed out boards, which score 0.
+    @param doubled: UNDOUBLED, DOUBLED or REDOUBLED.
+    @param isVulnerable: True if declarer is vulnerable.
+    @param tricksMade: the tricks taken by declarer, in range 0..13.
+    @return: a numpy.int32 array of scores, positive for declarer.
+    """
+    global _scoreArray
+    if _scoreArray is None:
+        _scoreArray = numpy.array(_DUPLICATE_SCORES, dtype=numpy.int32).reshape(2, 3, 35, 14)
+    bids = numpy.asarray(bids)
+    scores = _scoreArray[numpy.asarray(isVulnerable, dtype=numpy.intp),
+                         doubled, numpy.maximum(bids, 0), tricksMade]
+    return numpy.where(bids < 0, numpy.int32(0), scores)
+
+
+def _doubleStatus(contract):
+    if contract.redoubleBy:
+        return REDOUBLED
+    if contract.doubleBy:
+        return DOUBLED
+    return UNDOUBLED
+
+
+
+
 class DuplicateResult(GameResult, pb.Copyable, pb.RemoteCopy):
     """Represents the result of a completed round of duplicate bridge."""
 
@@ -200,13 +309,9 @@ class DuplicateResult(GameResult, pb.Copyable, pb.RemoteCopy):
         
         @return: score value: positive for declarer, negative for defenders.
         """
-        score = 0
-        if self.contract and self.tricksMade:
-            for key, value in list(self._getScoreComponents().items()):
-                if key in ('odd', 'over', 'under', 'slambonus', 'gamebonus',
-                           'partscore', 'insultbonus'):
-                    score += value
-        return score
+        if self.contract and self.tricksMade is not None:
+            return score(self.contract, self.isVulnerable, self.tricksMade)
+        return 0
 
 
 pb.setUnjellyableForClass(DuplicateResult, DuplicateResult)
@@ -224,15 +329,12 @@ class RubberResult(GameResult, pb.Copyable, pb.RemoteCopy):
         @return: 2-tuple of numeric scores (above the line, below the line):
                  positive for declarer, negative for defenders.
         """
-        above, below = 0, 0
-        if self.contract and self.tricksMade:
-            for key, value in list(self._getScoreComponents().items()):
-                # Note: gamebonus/partscore are not assigned in rubber bridge.
-                if key in ('over', 'under', 'slambonus', 'insultbonus'):
-                    above += value
-                elif key == 'odd':
-                    below += value
-        return above, below
+        if self.contract and self.tricksMade is not None:
+            # Note: gamebonus/partscore are not assigned in rubber bridge.
+            index = _tableIndex(self.contract.bid.code, _doubleStatus(self.contract),
+                                self.isVulnerable, self.tricksMade)
+            return _ABOVE_SCORES[index], _BELOW_SCORES[index]
+        return 0, 0
 
 
 pb.setUnjellyableForClass(RubberResult, RubberResult)
@@ -245,49 +347,74 @@ class Rubber(list):
     
     A game is made by accumulation of 100+ points from below-the-line scores
     without interruption from an opponent's game.
+
+    The games, the winner and the vulnerability of the pairs are updated as
+    each result is appended, so that they are not found by examining the
+    results. Results must therefore only be added with append() or extend().
     """
 
-    games = property(lambda self: self._getGames())
-    winner = property(lambda self: self._getWinner())
+    __pairs = ((Direction.North, Direction.South), (Direction.East, Direction.West))
 
 
-    def _getGames(self):
-        """Returns a list of completed (ie. won) 'games' in this rubber, in the
-        order of their completion.
-        
-        A game is represented as a list of consecutive results from this rubber,
-        coupled with the identifier of the scoring pair.
+    def __init__(self, results=()):
         """
-        games = []
+        @param results: if specified, the results of the rubber so far.
+        @type results: iterable of RubberResult
+        """
+        super().__init__()
+        # The completed (ie. won) games, in the order of their completion.
+        # A game is represented as a list of consecutive results from this
+        # rubber, coupled with the identifier of the scoring pair.
+        self.games = []
+        self.currentGame = []  # The results since the last completed game.
+        self.below = [0, 0]  # Below-the-line totals of the current game, by side.
+        self.winner = None  # The pair which have completed two games.
+        self.vulnerable = Vulnerable.Nil  # The pairs which have completed a game.
+        self.__won = [0, 0]  # The games won by each side.
+        self.extend(results)
 
-        thisgame = []
-        belowNS, belowEW = 0, 0  # Cumulative totals for results in this game.
 
-        for result in self:
-            thisgame.append(result)
-            if result.contract.declarer in (Direction.North, Direction.South):
-                belowNS += result.score[1]
-                if belowNS >= 100:
-                    games.append((thisgame, (Direction.North, Direction.South)))
-            else:
-                belowEW += result.score[1]
-                if belowEW >= 100:
-                    games.append((thisgame, (Direction.East, Direction.West)))
+    def __reduce__(self):
+        # The state of the rubber is restored as its results are appended.
+        return Rubber, (list(self),)
+
+
+    def append(self, result):
+        """Appends a result to the rubber, and updates its games.
 
-            # If either total for this game exceeds 100, proceed to next game.
-            if belowNS >= 100 or belowEW >= 100:  
-                thisgame = []
-                belowNS, belowEW = 0, 0  # Reset accumulators.
+        @param result: the result of a round.
+        @type result: RubberResult
+        """
+        list.append(self, result)
+        self.currentGame.append(result)
+        if not result.contract:
+            return  # Passed out: there is no score.
+
+        side = result.contract.declarer.value % 2
+        self.below[side] += result.score[1]
+        if self.below[side] >= 100:  # Game: proceed to next game.
+            self.games.append((self.currentGame, self.__pairs[side]))
+            self.currentGame = []
+            self.below = [0, 0]  # Reset accumulators.
+            self.__won[side] += 1
+            if self.__won[side] == 2 and self.winner is None:
+                self.winner = self.__pairs[side]
+            self.vulnerable = Vulnerable((self.__won[0] > 0) | (self.__won[1] > 0) << 1)
 
-        return games
 
+    def extend(self, results):
+        for result in results:
+            self.append(result)
 
-    def _getWinner(self):
-        """The rubber is won by the pair which have completed two games."""
-        pairs = [pair for game, pair in self.games]
 
-        for pair in ((Direction.North, Direction.South), (Direction.East, Direction.West)):
-            if pairs.count(pair) >= 2:
-                return pair
-        return None
+    def pop(self):
+        """Removes the last result from the rubber.
 
+        The games of the rubber are found again from its remaining results.
+
+        @return: the result removed.
+        """
+        results = list(self)
+        result = results.pop()
+        self.__init__(results)
+        return result
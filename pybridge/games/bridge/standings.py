@@ -0,0 +1,102 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+Live standings of the pairs of an event.
+
+The standings are kept in order of score, as scores change: when a board is
+scored, only the pairs which played it are moved. The leaders are read from
+the front of the order, and the rank of a pair is found by binary search, so
+that neither depends on the number of boards played.
+"""
+
+
+from bisect import bisect_left, insort
+
+
+class Standings:
+    """A ranking of pairs by score, maintained as scores change.
+
+    Pairs are identified by any hashable value, such as their number in the
+    movement. Pairs with equal scores share a rank, and are listed in order
+    of their identifiers, which must be comparable.
+    """
+
+
+    def __init__(self, scores=None):
+        """
+        @param scores: if specified, a dict of initial scores by pair.
+        """
+        self.scores = {}
+        self.__order = []  # Keys of (-score, pair), from the best score.
+        for pair, score in (scores or {}).items():
+            self.setScore(pair, score)
+
+
+    def __len__(self):
+        return len(self.scores)
+
+
+    def __contains__(self, pair):
+        return pair in self.scores
+
+
+    def setScore(self, pair, score):
+        """Sets the score of a pair, and moves the pair to its rank.
+
+        @param pair: the pair.
+        @param score: the new score of the pair.
+        """
+        if pair in self.scores:
+            self.__remove(pair)
+        self.scores[pair] = score
+        insort(self.__order, (-score, pair))
+
+
+    def removePair(self, pair):
+        """Removes a pair from the standings.
+
+        @param pair: the pair.
+        """
+        self.__remove(pair)
+        del self.scores[pair]
+
+
+    def top(self, count):
+        """Returns the leading pairs.
+
+        @param count: the number of pairs.
+        @return: a list of (pair, score) tuples, from the best score.
+        """
+        return [(pair, -score) for score, pair in self.__order[:count]]
+
+
+    def rank(self, pair):
+        """Returns the rank of a pair: 1 more than the number of pairs with
+        better scores.
+
+        @param pair: the pair.
+        @rtype: int
+        """
+        return bisect_left(self.__order, (-self.scores[pair],)) + 1
+
+
+    def __remove(self, pair):
+        index = bisect_left(self.__order, (-self.scores[pair], pair))
+        del self.__order[index]
+
@@ -0,0 +1,421 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+Duplicate tournaments, in which the same boards are played at many tables.
+
+A tournament owns a set of boards, and a movement which assigns pairs to
+tables in each round. At the start of each round, the boards of the round are
+queued at every table (see Bridge.boardQueue): since boards are dealt online,
+they need not move between tables, and every table plays the same boards at
+the same time.
+
+The pairs of the movement are the users seated at the tables when the first
+round starts, and they must be seated as the movement requires in later
+rounds.
+
+Results are collected from the tables as they are made. When every table has
+finished a board, the board is scored by matchpoints (see the comparison
+module), and the totals of its pairs are updated. A round may have a time
+limit: boards which are unfinished when time runs out are scored without the
+results of the tables which did not finish them, by Neuberg's formula.
+
+The tournament listens to each table's game, and does a constant amount of
+work for each event of a game: only the completion of a board involves the
+other tables.
+"""
+
+
+from zope.interface import implementer
+
+from pybridge.interfaces.observer import ISubject
+from pybridge.network.error import GameError
+
+from .board import Board
+from .comparison import matchpoints, northSouthScore
+from .symbols import Direction
+
+
+class Movement:
+    """A movement assigns the pairs of a tournament to tables, in each round.
+
+    Pairs are numbered from 1.
+    """
+
+    pairs = NotImplemented  # The number of pairs.
+
+
+    def __init__(self, tables, rounds):
+        """
+        @param tables: the number of tables.
+        @param rounds: the number of rounds.
+        """
+        self.tables = tables
+        self.rounds = rounds
+
+
+    def seating(self, round, table):
+        """Returns the pairs which sit at a table, in a round.
+
+        @param round: the round index, from 0.
+        @param table: the table index, from 0.
+        @return: the North-South pair and the East-West pair.
+        """
+        raise NotImplementedError
+
+
+
+
+class MitchellMovement(Movement):
+    """A Mitchell movement: North-South pairs stay at their table, and East-West
+    pairs move up a table after each round.
+
+    North-South pairs are numbered 1 to tables, and East-West pairs are
+    numbered tables + 1 to 2 * tables. North-South pairs are only compared
+    with North-South pairs.
+    """
+
+
+    def __init__(self, tables, rounds=None):
+        """
+        @param tables: the number of tables.
+        @param rounds: if specified, the number of rounds. By default, each
+                       East-West pair meets every North-South pair.
+        """
+        rounds = tables if rounds is None else rounds
+        if not 0 < rounds <= tables:
+            raise ValueError("Mitchell movement of %s tables cannot have %s rounds"
+                             % (tables, rounds))
+        super().__init__(tables, rounds)
+        self.pairs = 2 * tables
+
+
+    def seating(self, round, table):
+        return table + 1, (table - round) % self.tables + self.tables + 1
+
+
+
+
+class HowellMovement(Movement):
+    """A Howell movement, in which every pair meets every other pair.
+
+    Pair 2 * tables stays at the first table, and the other pairs move around
+    the tables in a circle, alternating between North-South and East-West.
+    All pairs are compared with each other.
+    """
+
+
+    def __init__(self, tables, rounds=None):
+        """
+        @param tables: the number of tables.
+        @param rounds: if specified, the number of rounds. By default, each
+                       pair meets every other pair.
+        """
+        rounds = 2 * tables - 1 if rounds is None else rounds
+        if not 0 < rounds <= 2 * tables - 1:
+            raise ValueError("Howell movement of %s tables cannot have %s rounds"
+                             % (tables, rounds))
+        super().__init__(tables, rounds)
+        self.pairs = 2 * tables
+
+
+    def seating(self, round, table):
+        circle = self.pairs - 1  # The number of moving pairs.
+        if table == 0:
+            pairs = self.pairs, round % circle + 1
+        else:
+            pairs = (round + table) % circle + 1, (round - table) % circle + 1
+        if round % 2 == 1:
+            pairs = pairs[1], pairs[0]
+        return pairs
+
+
+
+
+class _TableListener:
+    """Collects the results of a table's game, for the tournament."""
+
+
+    def __init__(self, tournament, table, game):
+        self.tournament = tournament
+        self.table = table
+        self.game = game
+        self.results = len(game.results)  # The results already collected.
+
+
+    def update(self, event, *args, **kwargs):
+        if len(self.game.results) > self.results:  # A board is complete.
+            self.results = len(self.game.results)
+            self.tournament.addResult(self.table, self.game.results[-1])
+
+
+
+
+@implementer(ISubject)
+class Tournament:
+    """A duplicate tournament, which plays the same boards at its tables.
+
+    Listeners are notified of the events 'startRound', 'scoreBoard' and
+    'endRound'.
+    """
+
+
+    def __init__(self, movement, boardsPerRound, boards=None, roundTime=None,
+                 clock=None):
+        """
+        @param movement: the movement of pairs.
+        @type movement: Movement
+        @param boardsPerRound: the number of boards played in each round.
+        @param boards: if specified, the boards to play, in order. Otherwise,
+                       boards are dealt at random.
+        @type boards: iterable of Board
+        @param roundTime: if specified, the time limit of each round, in
+                          seconds.
+        @param clock: if specified, the provider of the time limit (such as
+                      twisted.internet.task.Clock). By default, the reactor.
+        """
+        self.listeners = []
+        self.movement = movement
+        self.boardsPerRound = boardsPerRound
+
+        count = movement.rounds * boardsPerRound
+        if boards is None:
+            board = Board.first()
+            boards = [board]
+            while len(boards) < count:
+                board = next(board)
+                boards.append(board)
+        self.boards = list(boards)[:count]
+        if len(self.boards) < count:
+            raise ValueError("Expected %s boards, got %s" % (count, len(self.boards)))
+
+        self.roundTime = roundTime
+        self.clock = clock
+        self.games = []  # The game of each table.
+        self.round = None  # The index of the current round.
+        self.roundStarted = None  # The time at which the current round started.
+
+        # For each board index, the results of the board as (North-South pair,
+        # East-West pair, North-South score), and when the board is complete,
+        # the matchpoints of each result.
+        self.results = [[] for board in self.boards]
+        self.matchpoints = [None for board in self.boards]
+        # For each pair, the total matchpoints of the pair, and the total of
+        # the tops of the boards which the pair has played.
+        self.totals = dict((pair, [0, 0]) for pair in range(1, movement.pairs + 1))
+        # For each pair, the names of its users, from North or East.
+        self.pairNames = {}
+
+        self.__seats = []  # For each table, the users seated, by position.
+        self.__unfinished = {}  # For each board of the round, the tables playing it.
+        self.__played = []  # For each table, the boards finished in the round.
+        self.__timer = None
+
+
+    def addTable(self, game, seats=None):
+        """Adds a table to the tournament.
+
+        The game of the table is restricted to the boards of the tournament.
+
+        @param game: the game of the table.
+        @type game: Bridge
+        @param seats: if specified, the users seated at the table, by
+                      position, which is kept up to date as users sit and
+                      leave (such as LocalTable.players). Each user has a
+                      name attribute.
+        @type seats: {Direction: user}
+        @return: the table index.
+        """
+        if len(self.games) == self.movement.tables:
+            raise GameError("All tables are in use")
+        if self.round is not None:
+            raise GameError("Tournament in progress")
+        table = len(self.games)
+        game.options['QueuedBoards'] = True
+        game.attach(_TableListener(self, table, game))
+        self.games.append(game)
+        self.__seats.append(seats)
+        self.__played.append(0)
+        return table
+
+
+    def roundBoards(self, round):
+        """Returns the indexes of the boards played in a round.
+
+        @param round: the round index.
+        @rtype: range
+        """
+        return range(round * self.boardsPerRound, (round + 1) * self.boardsPerRound)
+
+
+    def startRound(self):
+        """Starts the next round: the boards of the round are queued at each
+        table, and its time limit is started.
+
+        Tables whose seats are known must be full: the users seated at the
+        start of the first round are entered as the pairs of the movement.
+        """
+        if len(self.games) < self.movement.tables:
+            raise GameError("Tables are not ready")
+        if self.__unfinished:
+            raise GameError("Round in progress")
+        round = 0 if self.round is None else self.round + 1
+        if round == self.movement.rounds:
+            raise GameError("Tournament complete")
+        pairNames = self.__seatedPairs(round)
+
+        self.round = round
+        self.pairNames.update(pairNames)
+        boards = self.roundBoards(round)
+        for table, game in enumerate(self.games):
+            # Each table has its own copy of the boards, which share the deals.
+            game.boardQueue[:] = [Board(self.boards[index]) for index in boards]
+            self.__played[table] = 0
+        self.__unfinished = dict((index, set(range(len(self.games)))) for index in boards)
+
+        if self.roundTime is not None:
+            if self.clock is None:
+                from twisted.internet import reactor
+                self.clock = reactor
+            self.__timer = self.clock.callLater(self.roundTime, self.endRound)
+            self.roundStarted = self.clock.seconds()
+        self.notify('startRound', round=round)
+
+
+    def timeRemaining(self):
+        """Returns the time remaining in the current round, in seconds, or None
+        if the round has no time limit.
+        """
+        if self.__timer is None or not self.__timer.active():
+            return None
+        return max(self.__timer.getTime() - self.clock.seconds(), 0)
+
+
+    def isRoundComplete(self):
+        """Returns True if every board of the current round has been scored."""
+        return not self.__unfinished
+
+
+    def addResult(self, table, result):
+        """Collects the result of the current board of a table.
+
+        This is called by the listener of the table's game.
+
+        @param table: the table index.
+        @param result: the result of the board.
+        @type result: DuplicateResult
+        """
+        if self.round is None or self.__played[table] == self.boardsPerRound:
+            return  # Not a board of the tournament, or the round has ended.
+        index = self.roundBoards(self.round)[self.__played[table]]
+        self.__played[table] += 1
+
+        northSouth, eastWest = self.movement.seating(self.round, table)
+        self.results[index].append((northSouth, eastWest, northSouthScore(result)))
+        unfinished = self.__unfinished[index]
+        unfinished.discard(table)
+        if not unfinished:
+            self.__scoreBoard(index)
+
+
+    def endRound(self):
+        """Ends the current round. Boards which have not been finished at all
+        tables are scored with the results made so far, and the remaining
+        boards of each table are withdrawn.
+        """
+        if self.__timer is not None and self.__timer.active():
+            self.__timer.cancel()
+        self.__timer = None
+        for table, game in enumerate(self.games):
+            self.__played[table] = self.boardsPerRound
+            del game.boardQueue[:]
+        for index in sorted(self.__unfinished):
+            self.__scoreBoard(index)
+
+
+    def percentage(self, pair):
+        """Returns the matchpoint percentage of a pair, or None if the pair
+        has not completed a board.
+        """
+        points, top = self.totals[pair]
+        return 100.0 * points / top if top else None
+
+
+    def __scoreBoard(self, index):
+        """Scores a board by matchpoints, and adds the matchpoints to the
+        totals of its pairs.
+        """
+        del self.__unfinished[index]
+        results = self.results[index]
+        top = self.movement.tables - 1
+        # Boards which were not finished at all tables are scaled to the top.
+        # A board which no table finished has no matchpoints to award.
+        points = matchpoints([score for _, _, score in results], self.movement.tables)
+        self.matchpoints[index] = points
+        for (northSouth, eastWest, _), point in zip(results, points):
+            for pair, award in ((northSouth, point), (eastWest, top - point)):
+                self.totals[pair][0] += award
+                self.totals[pair][1] += top
+        self.notify('scoreBoard', board=index)
+
+        if not self.__unfinished:
+            if self.__timer is not None and self.__timer.active():
+                self.__timer.cancel()
+            self.__timer = None
+            self.notify('endRound', round=self.round)
+
+
+    def __seatedPairs(self, round):
+        """Returns the names of the pairs seated for a round, at the tables
+        whose seats are known.
+
+        In the first round, the users seated enter the pairs of the movement.
+        In later rounds, each pair must be seated as the movement requires.
+        """
+        pairNames = {}
+        for table, seats in enumerate(self.__seats):
+            if seats is None:
+                continue
+            if len(seats) < len(Direction):
+                raise GameError("Table %s is not ready" % (table + 1))
+            names = [seats[position].name for position in Direction]
+            northSouth, eastWest = self.movement.seating(round, table)
+            for pair, partners in ((northSouth, (names[0], names[2])),
+                                   (eastWest, (names[1], names[3]))):
+                expected = self.pairNames.get(pair, partners)
+                if set(partners) != set(expected):
+                    raise GameError("Pair %s is not seated at table %s"
+                                    % (pair, table + 1))
+                pairNames[pair] = expected
+        return pairNames
+
+
+# Implementation of ISubject.
+
+
+    def attach(self, listener):
+        self.listeners.append(listener)
+
+
+    def detach(self, listener):
+        self.listeners.remove(listener)
+
+
+    def notify(self, event, *args, **kwargs):
+        for listener in self.listeners:
+            listener.update(event, *args, **kwargs)
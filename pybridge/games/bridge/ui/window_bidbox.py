@@ -138,9 +138,9 @@ class WindowBidbox:
         """Enables buttons representing the calls available to player."""
         if self.position == self.table.game.getTurn():
             self.window.set_property('sensitive', True)
+            available = self.table.game.auction.legalCalls()
             for call, button in list(self.callButtons.items()):
-                isvalid = self.table.game.auction.isValidCall(call)
-                button.set_property('sensitive', isvalid)
+                button.set_property('sensitive', call in available)
         else:
             self.window.set_property('sensitive', False)
 
@@ -23,7 +23,8 @@ from pybridge.games.bridge.symbols import Direction
 from pybridge.network.error import GameError
 
 from pybridge.ui.cardarea import CardArea
-from pybridge.ui.vocabulary import DIRECTION_NAMES, VULN_SYMBOLS, render_call, render_contract
+from pybridge.ui.vocabulary import DIRECTION_NAMES, SUIT_NAMES, VULN_SYMBOLS, \
+                                   render_call, render_contract
 
 from pybridge.ui.window_gametable import WindowGameTable
 from .window_bidbox import WindowBidbox
@@ -244,24 +245,9 @@ class WindowBridgeTable(WindowGameTable):
         super().setTable(table)
 
         self.table.game.attach(self.eventHandler)
-        self.resetGame()
-
-        for position in Direction:
-            self.redrawHand(position)  # Redraw all hands.
+        self.redrawGame()
 
         if self.table.game.inProgress():
-            # If trick play in progress, redraw trick.
-            if self.table.game.play is not None:
-                self.redrawTrick()
-                if len(self.table.game.play) > 1:
-                    self.trickarea.set_trick(self.table.game.play[-2])
-
-            self.setTurnIndicator()
-
-            for call in self.table.game.auction:
-                position = self.table.game.auction.whoCalled(call)
-                self.biddingview.add_call(call, position)
-
             # If user is a player and auction in progress, open bidding box.
             if self.player and not self.table.game.auction.isComplete():
                 bidbox = self.children.open(WindowBidbox, parent=self)
@@ -278,6 +264,28 @@ class WindowBridgeTable(WindowGameTable):
             self.cardarea.set_player_name(position, player)
 
 
+    def redrawGame(self):
+        """Redraws the hands, trick and auction of the current game."""
+        self.resetGame()
+
+        for position in Direction:
+            self.redrawHand(position)  # Redraw all hands.
+
+        if self.table.game.inProgress():
+            # If trick play in progress, redraw trick.
+            if self.table.game.play is not None:
+                self.redrawTrick()
+                if len(self.table.game.play) > 1:
+                    self.trickarea.set_trick(self.table.game.play[-2])
+
+            self.setTurnIndicator()
+
+            dealer = self.table.game.auction.dealer
+            for index, call in enumerate(self.table.game.auction):
+                position = Direction((dealer.value + index) % 4)
+                self.biddingview.add_call(call, position)
+
+
     def resetGame(self):
         """Clear bidding history, contract, trick counts."""
         self.cardarea.clear()
@@ -510,6 +518,16 @@ class WindowBridgeTable(WindowGameTable):
             self.gameComplete()
 
 
+    def event_acceptClaim(self, tricks, position):
+        self.setTurnIndicator()
+        self.dashboard.set_trickcount(self.table.game)
+        self.gameComplete()
+
+
+    def event_restoreState(self, board):
+        self.redrawGame()
+
+
     def event_revealHand(self, hand, position):
         all = not self.table.game.inProgress()
         self.redrawHand(position, all)  # Show all cards if game has finished.
@@ -533,6 +551,19 @@ class WindowBridgeTable(WindowGameTable):
     def on_card_clicked(self, card, position):
         if self.player:
             if self.table.game.inProgress() and self.table.game.play is not None:
+                # Cards which cannot be played are refused, without a request.
+                deal = self.table.game.board['deal']
+                if deal.get(position) and \
+                   card not in self.table.game.play.legalCards(deal, position):
+                    if position != self.table.game.getTurn():
+                        text = _("It is not %s's turn to play a card.") % DIRECTION_NAMES[position]
+                    else:
+                        leadSuit = self.table.game.play[-1].leadSuit
+                        text = _("You must follow suit: play a card in %s.") % SUIT_NAMES[leadSuit]
+                    context = self.statusbar.get_context_id('turn')
+                    self.statusbar.pop(context)
+                    self.statusbar.push(context, text)
+                    return
                 d = self.player.callRemote('playCard', card)
                 d.addErrback(self.errback)
 
@@ -96,17 +96,17 @@ class RubberScoreSheet(Gtk.TreeView):
         self.store.clear()
         self.store.append(['', '', True])  # The initial dividing line.
 
-        for _ in rubber.games:
-            #aboveiters, belowiters = [], []
-            for result in rubber:
-                above, below = result.score
-                if result.contract.declarer in (Direction.North, Direction.South) and below > 0 \
-                or result.contract.declarer in (Direction.East, Direction.West) and above < 0:
-                    self.store.prepend([str(above), '', False])
-                    self.store.append([str(below), '', False])
-                else:
-                    self.store.prepend(['', str(above), False])
-                    self.store.append(['', str(below), False])
+        for result in rubber:
+            if not result.contract:
+                continue  # Passed out: there is no score.
+            above, below = result.score
+            if result.contract.declarer in (Direction.North, Direction.South) and below > 0 \
+            or result.contract.declarer in (Direction.East, Direction.West) and above < 0:
+                self.store.prepend([str(above), '', False])
+                self.store.append([str(below), '', False])
+            else:
+                self.store.prepend(['', str(above), False])
+                self.store.append(['', str(below), False])
 
 
     def _row_separator(self, model, iter):
@@ -178,3 +178,7 @@ class WindowScoreSheet:
     def event_playCard(self, card, position):
         self.update()
 
+
+    def event_acceptClaim(self, tricks, position):
+        self.update()
+
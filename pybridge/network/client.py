@@ -36,6 +36,9 @@ from pybridge.network.usermanager import LocalUserManager, RemoteUserManager
 pb.setUnjellyableForClass(LocalTableManager, RemoteTableManager)
 pb.setUnjellyableForClass(LocalUserManager, RemoteUserManager)
 
+from pybridge.network.standings import LocalStandings, RemoteStandings
+pb.setUnjellyableForClass(LocalStandings, RemoteStandings)
+
 
 # TODO: this class should be split into:
 #   - a factory class which establishes connections with servers
@@ -224,6 +227,25 @@ class NetworkClient:
         return d
 
 
+    def createTournament(self, tournamentid, tables, movement='Mitchell',
+                         boardsPerRound=2, roundTime=None):
+        d = self.avatar.callRemote('createTournament', tournamentid, tables,
+                                   movement, boardsPerRound, roundTime)
+        d.addErrback(self.errback)
+        return d
+
+
+    def startRound(self, tournamentid):
+        d = self.avatar.callRemote('startRound', tournamentid)
+        d.addErrback(self.errback)
+        return d
+
+
+    def getStandings(self, tournamentid):
+        d = self.avatar.callRemote('getStandings', tournamentid)
+        return d
+
+
     def getUserInformation(self, username):
         # TODO: cache user information once retrieved.
         d = self.avatar.callRemote('getUserInformation', username)
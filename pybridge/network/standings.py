@@ -0,0 +1,93 @@
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+from pybridge.games.bridge.standings import Standings
+from .roster import LocalRoster, RemoteRoster
+
+
+class _TournamentListener:
+    """Relays the boards scored by a tournament to its standings."""
+
+
+    def __init__(self, standings):
+        self.standings = standings
+
+
+    def update(self, event, **kwargs):
+        if event == 'scoreBoard':
+            self.standings.scoreBoard(kwargs['board'])
+
+
+
+
+class LocalStandings(LocalRoster):
+    """The standings of the pairs of a running tournament.
+
+    Each entry is a dict of the matchpoints, top and percentage of a pair, and
+    the names of its users if they are known.
+    When a board is scored, the entries of the pairs which played it are
+    updated, and relayed to RemoteStandings objects.
+    """
+
+
+    def __init__(self, tournament):
+        LocalRoster.__init__(self)
+        self.tournament = tournament
+        self.standings = Standings()  # The ranking of pairs by percentage.
+        tournament.attach(_TournamentListener(self))
+
+
+    def getStateToCacheAndObserveFor(self, perspective, observer):
+        self.observers.append(observer)
+        return dict(self)
+
+
+    def scoreBoard(self, board):
+        """Updates the pairs which played a board of the tournament.
+
+        @param board: the board index.
+        """
+        for northSouth, eastWest, _ in self.tournament.results[board]:
+            for pair in (northSouth, eastWest):
+                percentage = self.tournament.percentage(pair)
+                if percentage is not None:
+                    points, top = self.tournament.totals[pair]
+                    info = {'points': points, 'top': top, 'percentage': percentage}
+                    if pair in self.tournament.pairNames:
+                        info['names'] = self.tournament.pairNames[pair]
+                    self[pair] = info
+                    self.standings.setScore(pair, percentage)
+                    self.notify('updatePair', pair=pair, info=info)
+
+
+
+
+class RemoteStandings(RemoteRoster):
+
+
+    def setCopyableState(self, state):
+        RemoteRoster.setCopyableState(self, state)
+        self.standings = Standings(dict((pair, info['percentage'])
+                                        for pair, info in state.items()))
+
+
+    def observe_updatePair(self, pair, info):
+        self[pair] = info
+        self.standings.setScore(pair, info['percentage'])
+        self.notify('updatePair', pair=pair, info=info)
+
@@ -22,15 +22,27 @@ from twisted.python import log
 from . import database as db
 from pybridge import __version__ as SERVER_VERSION
 from pybridge.games import SUPPORTED_GAMES
+from pybridge.games.bridge.game import Bridge
+from pybridge.games.bridge.tournament import HowellMovement, MitchellMovement, \
+                                            Tournament
 
 from pybridge.network.error import DeniedRequest, IllegalRequest
 from pybridge.network.localtable import LocalTable
+from pybridge.network.standings import LocalStandings
 from pybridge.network.tablemanager import LocalTableManager
 from pybridge.network.usermanager import LocalUserManager
 
 
 availableTables = LocalTableManager()
 onlineUsers = LocalUserManager()
+runningTournaments = {}  # Tournaments, by identifier.
+tournamentStandings = {}  # Standings of tournaments, by identifier.
+
+MOVEMENTS = {'Mitchell': MitchellMovement, 'Howell': HowellMovement}
+# Limits of the tournaments which users may create.
+MAX_TOURNAMENT_TABLES = 15
+MAX_BOARDS_PER_ROUND = 8
+MAX_ROUND_TIME = 4 * 60 * 60  # Seconds.
 
 
 # Information about this server, for relay to clients.
@@ -91,3 +103,47 @@ def createTable(tableid, gamename, **tableOptions):
 
     return table
 
+
+def createTournament(tournamentid, tables, movement='Mitchell', boardsPerRound=2,
+                     roundTime=None):
+    """Create a duplicate tournament, with a new table for each table of its
+    movement. Tables are identified by the tournament identifier followed by
+    the table number.
+
+    @param tournamentid: a unique identifier for the tournament.
+    @param tables: the number of tables.
+    @param movement: a movement identifier, 'Mitchell' or 'Howell'.
+    @param boardsPerRound: the number of boards played in each round.
+    @param roundTime: if specified, the time limit of each round, in seconds.
+    @return: the tournament, whose pairs are entered by the users seated at
+             its tables when its first round is started.
+    """
+    if tournamentid in runningTournaments:
+        raise DeniedRequest("Tournament name exists")
+    if movement not in MOVEMENTS:
+        raise DeniedRequest("Unsupported movement %s" % movement)
+
+    tableids = ["%s %d" % (tournamentid, table + 1) for table in range(tables)]
+    for tableid in tableids:
+        if not 0 < len(tableid) <= 20 or re.search("[^A-Za-z0-9_ ]", tableid):
+            raise IllegalRequest("Invalid tournament identifier format")
+        if tableid in availableTables:
+            raise DeniedRequest("Table name exists")
+
+    try:
+        tournament = Tournament(MOVEMENTS[movement](tables), boardsPerRound,
+                                roundTime=roundTime)
+    except ValueError as err:
+        raise IllegalRequest(err)
+
+    for tableid in tableids:
+        # Tables remain open between rounds, while pairs move.
+        table = LocalTable(tableid, Bridge, config={'CloseWhenEmpty': False})
+        table.close = lambda table=table: availableTables.closeTable(table)
+        availableTables.openTable(table)
+        tournament.addTable(table.game, table.players)
+
+    runningTournaments[tournamentid] = tournament
+    tournamentStandings[tournamentid] = LocalStandings(tournament)
+    log.msg("New tournament %s with %s tables" % (tournamentid, tables))
+    return tournament
@@ -43,6 +43,7 @@ class RegisteredUser(pb.Avatar):
         self.clientVersion = None
         self.accountRecord = db.UserAccount.byUsername(self.name)
         self.joinedTables = {}  # All tables which client is observing.
+        self.directedTournaments = {}  # All tournaments created by client.
 
 
     def attached(self, mind):
@@ -89,6 +90,13 @@ class RegisteredUser(pb.Avatar):
             raise DeniedRequest("Unknown roster name \'%s\'" % name)
 
 
+    def perspective_getStandings(self, tournamentid):
+        """Provides standings of tournament requested by client."""
+        if tournamentid not in server.tournamentStandings:
+            raise DeniedRequest("Unknown tournament \'%s\'" % tournamentid)
+        return server.tournamentStandings[tournamentid]
+
+
     def perspective_getServerData(self):
         """Provides a dict of public information about the server."""
         return server.publicData
@@ -153,6 +161,43 @@ class RegisteredUser(pb.Avatar):
         return table
 
 
+    def perspective_createTournament(self, tournamentid, tables,
+                                     movement='Mitchell', boardsPerRound=2,
+                                     roundTime=None):
+        """Creates a tournament, which is directed by this user.
+
+        Returns the standings of the tournament.
+        """
+        if not isinstance(tournamentid, str):
+            raise IllegalRequest("Invalid parameter for tournament identifier")
+        if not isinstance(tables, int) or not isinstance(boardsPerRound, int):
+            raise IllegalRequest("Invalid parameter for tournament size")
+        if roundTime is not None and not isinstance(roundTime, (int, float)):
+            raise IllegalRequest("Invalid parameter for round time")
+        # The boards of every round are dealt when the tournament is created.
+        if not 1 <= tables <= server.MAX_TOURNAMENT_TABLES:
+            raise DeniedRequest("Tournaments have 1 to %s tables"
+                                % server.MAX_TOURNAMENT_TABLES)
+        if not 1 <= boardsPerRound <= server.MAX_BOARDS_PER_ROUND:
+            raise DeniedRequest("Rounds have 1 to %s boards"
+                                % server.MAX_BOARDS_PER_ROUND)
+        if roundTime is not None and not 0 < roundTime <= server.MAX_ROUND_TIME:
+            raise DeniedRequest("Rounds last at most %s seconds"
+                                % server.MAX_ROUND_TIME)
+
+        tournament = server.createTournament(tournamentid, tables, movement,
+                                             boardsPerRound, roundTime)
+        self.directedTournaments[tournamentid] = tournament
+        return server.tournamentStandings[tournamentid]
+
+
+    def perspective_startRound(self, tournamentid):
+        """Starts the next round of a tournament directed by this user."""
+        if tournamentid not in self.directedTournaments:
+            raise DeniedRequest("Not director of tournament")
+        self.directedTournaments[tournamentid].startRound()  # May raise GameError.
+
+
     def perspective_leaveTable(self, tableid):
         """Leaves a table."""
         self.oldVersionCheck()  # TODO: remove after 0.4
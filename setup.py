@@ -24,6 +24,7 @@ setup(
     long_description = 'With PyBridge, you can play contract bridge with your friends, over the Internet or a local network.',
     download_url = 'http://sourceforge.net/project/showfiles.php?group_id=114287',
     packages = ['pybridge', 'pybridge.common', 'pybridge.games', 'pybridge.games.bridge', 'pybridge.games.bridge.ui', 'pybridge.interfaces', 'pybridge.network', 'pybridge.server', 'pybridge.ui'],
+    package_data = {'pybridge': ['modules/biddingsystem/*.xml']},
     scripts = ['bin/pybridge', 'bin/pybridge-server'],
     data_files = [('share/applications', ['bin/pybridge.desktop']),
                   ('share/doc/pybridge', ['AUTHORS', 'COPYING', 'INSTALL', 'NEWS', 'README']),
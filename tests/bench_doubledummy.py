@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+# PyBridge -- online contract bridge made easy.
+# Copyright (C) 2004-2007 PyBridge Project.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+
+
+"""
+Benchmark of the double-dummy solver, over a suite of fixed PBN deals.
+
+Usage: bench_doubledummy.py [--full] [--tables] [--python]
+
+By default, only endings of 9 and 10 cards are solved. With --full, complete
+deals are solved as well. With --tables, the double-dummy tables of the
+complete deals are computed across all processors.
+
+Searches are made by the DDS library, if it is installed, which solves each
+deal in a few milliseconds. With --python, searches are made by the solver of
+the doubledummy module, which may take many seconds for a complete deal.
+"""
+
+
+import os
+import sys
+
+# Determine the base directory.
+currentdir = os.path.dirname(os.path.abspath(sys.argv[0]))
+basedir = os.path.abspath(os.path.join(currentdir, '..'))
+
+# Find the Python module path, relative to the base directory.
+if os.path.exists(os.path.join(basedir, 'lib')):
+        pythonver = 'python%d.%d' % sys.version_info[:2]
+        pythonpath = os.path.join(basedir, 'lib', pythonver, 'site-packages')
+else:
+        pythonpath = basedir
+
+sys.path.insert(0, pythonpath)
+
+
+import time
+
+from pybridge.games.bridge.doubledummy import DoubleDummySolver, TRUMP_SUITS, \
+                                             dds, solveTables
+from pybridge.games.bridge.pbn import parseHands
+from pybridge.games.bridge.symbols import Direction, Strain
+
+
+# Endings: deal, strain, leader, tricks taken by the side not on lead.
+ENDINGS = [
+    ("N:J.A9.AKQ.A95 953.5.T942.7 K7.T6.63.T63 4.KJ2.875.J4", Strain.Club, Direction.West, 9),
+    ("N:KT64.Q3..AQ8 8.T.A983.KT2 A7.KJ964.T.7 J.A85.QJ6.J3", Strain.Spade, Direction.South, 1),
+    ("N:.9753.J62.Q3 JT2.J64..752 654..T7.K984 3.QT.K983.J6", Strain.Diamond, Direction.South, 3),
+    ("N:T97.T542.T5. A86.AK9.2.43 .Q.J96.QJ986 QJ..AQ83.KT2", Strain.NoTrump, Direction.East, 1),
+    ("N:QT92.J4.Q94. 6.83.853.KJT 7.K.A72.Q832 A.QT97.T6.A6", Strain.Heart, Direction.South, 4),
+    ("N:AQ.AT3.KJ.T3 J42.92.Q95.J .J76.AT82.Q4 K85.Q4.64.K5", Strain.Spade, Direction.North, 3),
+    ("N:T85.KJ82..AJ5 K2.A7.K.KT643 A7.Q3.QJ6432. QJ643.54.T.87", Strain.Club, Direction.North, 5),
+    ("N:92.QT.AKQ9.J3 KJ.976.T643.4 743..J52.9862 AQT65.43.87.A", Strain.Heart, Direction.West, 4),
+    ("N:Q.86.QT94.KQ3 A74.Q7.A6.J87 93.9.KJ32.AT2 JT62.KJ5.87.9", Strain.NoTrump, Direction.North, 7),
+]
+
+# Complete deals: deal, strain, leader, tricks taken by declarer.
+DEALS = [
+    # http://bridgehands.com/D/Duke_of_Cumberland_Hand.htm
+    ("N:..Q8765432.AQT84 65432.T9872.JT9. T987.6543..76532 AKQJ.AKQJ.AK.KJ9",
+     Strain.Club, Direction.West, 13),
+    ("N:..Q8765432.AQT84 65432.T9872.JT9. T987.6543..76532 AKQJ.AKQJ.AK.KJ9",
+     Strain.NoTrump, Direction.West, 2),
+    ("N:.63.AKQ987.A9732 A8654.KQ5.T.QJT6 J973.J98742.3.K4 KQT2.AT.J6542.85",
+     Strain.NoTrump, Direction.North, 8),
+    ("N:.63.AKQ987.A9732 A8654.KQ5.T.QJT6 J973.J98742.3.K4 KQT2.AT.J6542.85",
+     Strain.Spade, Direction.North, 9),
+    # http://bridgehands.com/B/John_Bennett_Murder.htm
+    ("S:KJ985.K762.85.KT Q72.AJ3.AQT92.J6 AT63.T85.4.A9842 4.Q94.KJ763.Q753",
+     Strain.NoTrump, Direction.West, 6),
+]
+
+
+def run(cases, native):
+    totalTime, totalNodes = 0, 0
+    for dealstr, strain, leader, expected in cases:
+        solver = DoubleDummySolver(parseHands(dealstr), TRUMP_SUITS[strain], native)
+        start = time.time()
+        tricks = solver.tricks(leader)
+        elapsed = time.time() - start
+        totalTime += elapsed
+        totalNodes += solver.nodes
+        status = tricks == expected and "ok" or "WRONG (expected %s)" % expected
+        print("%-60s %-8s %-6s %2s %9s nodes %8.2fs  %s" % (dealstr, strain.name,
+              leader.name, tricks, solver.nodes, elapsed, status))
+    print("Total: %s nodes in %.2fs, %.2fs per solve\n"
+          % (totalNodes, totalTime, totalTime / len(cases)))
+
+
+def runTables(cases):
+    dealstrs = sorted(set(dealstr for dealstr, strain, leader, expected in cases))
+    start = time.time()
+    for dealstr, table in zip(dealstrs, solveTables(dealstrs)):
+        print(dealstr)
+        for strain, tricks in table.items():
+            print("  %-8s %s" % (strain.name, " ".join("%s %2s" % (declarer.name[0], n)
+                                                       for declarer, n in tricks.items())))
+    elapsed = time.time() - start
+    print("Total: %s tables in %.2fs, %.2fs per table\n"
+          % (len(dealstrs), elapsed, elapsed / len(dealstrs)))
+
+
+if __name__ == '__main__':
+    native = dds is not None and '--python' not in sys.argv[1:]
+    print("Solver: %s" % (native and "DDS" or "Python"))
+    print("Endings")
+    run(ENDINGS, native)
+    if '--full' in sys.argv[1:]:
+        print("Complete deals")
+        run(DEALS, native)
+    if '--tables' in sys.argv[1:]:
+        print("Double-dummy tables")
+        runTables(DEALS)
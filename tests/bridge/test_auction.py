@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from pybridge.games.bridge.auction import Auction
@@ -101,3 +102,110 @@ class TestAuction(unittest.TestCase):
         except StopIteration:
             pass
 
+
+
+    def testWhoCalled(self):
+        """Checking whoCalled() with repeated calls"""
+        for call in self.calls:
+            self.auction.makeCall(call)
+        self.assertEqual(self.auction.whoCalled(Bid(Level.One, Strain.Club)), Direction.South)
+        self.assertEqual(self.auction.whoCalled(Double()), Direction.West)
+        self.assertEqual(self.auction.whoCalled(Pass()), Direction.North)  # Most recent.
+        self.assertEqual(self.auction.whoCalled(Bid(Level.Two, Strain.Club)), None)
+        self.assertEqual(self.auction.contract.declarer, Direction.West)
+
+
+    def testIncrementalState(self):
+        """Checking auction state against the calls made, in random auctions"""
+        rng = random.Random(1)
+        calls = [Bid(l, s) for l in Level for s in Strain] + [Pass(), Double(), Redouble()]
+        for dealer in Direction:
+            for _ in range(50):
+                auction = Auction(dealer=dealer)
+                while not auction.isComplete():
+                    valid = [c for c in calls if auction.isValidCall(c)]
+                    # Favour passes, so that auctions are of realistic length.
+                    auction.makeCall(rng.choice(valid + [Pass()] * len(valid)))
+
+                    bids = [c for c in auction if isinstance(c, Bid)]
+                    bid = bids and bids[-1] or None
+                    since = auction[auction.index(bid) + 1:] if bid else []
+                    self.assertIs(auction.currentBid, bid)
+                    self.assertIs(auction.currentDouble, Double() in since and Double() or None)
+                    self.assertIs(auction.currentRedouble, Redouble() in since and Redouble() or None)
+                    last = len(auction) - 1 - auction[::-1].index(auction[-1])
+                    self.assertEqual(auction.whoCalled(auction[-1]),
+                                     Direction((dealer.value + last) % 4))
+
+                if auction.isPassedOut():
+                    self.assertEqual(auction, [Pass()] * 4)
+                    self.assertEqual(auction.contract, None)
+                else:
+                    first = [i for i, c in enumerate(auction) if isinstance(c, Bid)
+                             and c.strain == bid.strain and i % 2 == auction.index(bid) % 2][0]
+                    self.assertEqual(auction.contract.declarer,
+                                     Direction((dealer.value + first) % 4))
+
+
+    def testUndoAndFork(self):
+        """Calls taken back restore the auction, and forks are independent"""
+        rng = random.Random(4)
+        calls = [Bid(l, s) for l in Level for s in Strain] + [Pass(), Double(), Redouble()]
+        state = lambda auction: (list(auction), auction.currentBid, auction.currentDouble,
+                                 auction.currentRedouble, auction.whoseTurn(),
+                                 auction.legalCalls(), auction.contract and
+                                 (auction.contract.bid, auction.contract.declarer))
+        for _ in range(50):
+            auction = Auction(dealer=self.dealer)
+            states = []
+            while not auction.isComplete():
+                states.append(state(auction))
+                auction.makeCall(rng.choice(list(auction.legalCalls())))
+            final = state(auction)
+
+            fork = auction.fork()
+            while len(fork) > 0:
+                fork.undoCall()
+                self.assertEqual(state(fork), states[len(fork)])
+            self.assertEqual(state(auction), final)
+            self.assertRaises(IndexError, fork.undoCall)
+
+            # Calls made to a fork are not made to the original auction.
+            fork = auction.fork()
+            fork.undoCall()
+            fork.makeCall(auction[-1])
+            self.assertEqual(state(fork), final)
+            self.assertEqual(len(auction), len(states))
+
+
+    def testLegalCalls(self):
+        """Checking legalCalls() against the rules of bidding"""
+        rng = random.Random(2)
+        calls = [Bid(l, s) for l in Level for s in Strain] + [Pass(), Double(), Redouble()]
+
+        def isLegal(call):
+            bids = [(i, c) for i, c in enumerate(self.auction) if isinstance(c, Bid)]
+            if isinstance(call, Pass):
+                return True
+            if isinstance(call, Bid):
+                return not bids or call > bids[-1][1]
+            if not bids:
+                return False
+            index, bid = bids[-1]
+            since = self.auction[index + 1:]
+            byOpponents = (len(self.auction) - index) % 2 == 1
+            if isinstance(call, Double):
+                return byOpponents and Double() not in since
+            return not byOpponents and Double() in since and Redouble() not in since
+
+        for _ in range(100):
+            self.auction = Auction(dealer=self.dealer)
+            while not self.auction.isComplete():
+                legal = self.auction.legalCalls()
+                self.assertEqual(legal, frozenset(c for c in calls if isLegal(c)))
+                self.assertEqual(self.auction.legalCallMask(),
+                                 sum(1 << c.code for c in legal))
+                for call in calls:
+                    self.assertEqual(self.auction.isValidCall(call), call in legal)
+                self.auction.makeCall(rng.choice(list(legal) + [Pass()] * len(legal)))
+            self.assertEqual(self.auction.legalCalls(), frozenset())
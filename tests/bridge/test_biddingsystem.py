@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pybridge.games.bridge.auction import Auction
+from pybridge.games.bridge.biddingsystem import ANY, STANDARD_ENGLISH, bounds, \
+                                                loadSystem, valueRange
+from pybridge.games.bridge.call import Bid, Pass, Double
+from pybridge.games.bridge.symbols import Direction, Level, Strain
+
+
+def bid(level, strain):
+    return Bid(Level(level - 1), strain)
+
+
+
+
+class TestBiddingSystem(unittest.TestCase):
+
+
+    def setUp(self):
+        self.system = loadSystem(STANDARD_ENGLISH, cache=False)
+
+
+    def rules(self, *calls):
+        return [rule.name for rule in self.system.matchingRules(calls)]
+
+
+    def testConstraints(self):
+        """Constraint masks hold ranges and alternatives of values"""
+        self.assertEqual(bounds(valueRange(12, 19)), (12, 19))
+        self.assertEqual(bounds(ANY), (0, 40))
+        self.assertEqual(bounds(valueRange(12, 19) & valueRange(20, 22)), None)
+
+
+    def testSystem(self):
+        """Rules are compiled from the XML definition"""
+        self.assertEqual(self.system.title, "Standard English Acol")
+        self.assertEqual(self.system.roots, ('openings', 'overcalls'))
+        rule = self.system.contexts['openings'].rules[0]
+        self.assertEqual(rule.name, 'open-1-suit')
+        self.assertEqual(rule.responses, ('respond-1-suit',))
+        self.assertEqual(self.system.contexts['openings'].byCall[bid(1, Strain.Heart).code],
+                         (rule,))
+
+
+    def testMatchingRules(self):
+        """Rules match calls from the contexts in scope"""
+        heart = bid(1, Strain.Heart)
+        self.assertEqual(self.rules(heart), ['open-1-suit'])
+        self.assertEqual(self.rules(Pass(), Pass(), heart), ['open-1-suit'])
+        self.assertEqual(self.rules(heart, Pass(), bid(2, Strain.Heart)), ['single-raise'])
+        self.assertEqual(self.rules(heart, Double()), ['double-takeout'])
+        self.assertEqual(self.rules(bid(3, Strain.Spade), Double()), ['double-penalty'])
+        self.assertEqual(self.rules(heart, bid(1, Strain.Spade)), [])
+        self.assertEqual(self.rules(heart, Pass(), bid(1, Strain.Spade)), [])
+        # Later calls of a side, after an unmatched call, are not openings.
+        notrump, club = bid(1, Strain.NoTrump), bid(2, Strain.Club)
+        self.assertEqual(self.rules(notrump, Pass(), club, Pass(), bid(2, Strain.Heart)), [])
+        self.assertEqual(self.system.node([notrump, Pass(), club, Pass(),
+                                           bid(2, Strain.Heart)]).promises, {})
+
+
+    def testPromises(self):
+        """Calls promise the registers of their rules"""
+        auction = Auction(Direction.East)
+        auction.makeCall(bid(1, Strain.Heart))
+        promises = self.system.promises(auction)
+        self.assertEqual(bounds(promises[(Direction.East,), 'hand-points-all']), (12, 19))
+        self.assertEqual(bounds(promises[(Direction.East,), 'heart-count']), (4, 40))
+
+        promises = self.system.promises(auction, Double())
+        self.assertEqual(bounds(promises[(Direction.South,), 'hand-points-card']), (12, 40))
+
+        auction.makeCall(Pass())
+        auction.makeCall(bid(2, Strain.Heart))
+        constraints = self.system.constraints(auction)
+        self.assertEqual(bounds(constraints[(Direction.East,), 'heart-count']), (4, 40))
+        self.assertEqual(bounds(constraints[(Direction.West,), 'hand-points-card']), (6, 9))
+
+        # Opponents' suit is counted by a penalty double.
+        node = self.system.node([bid(3, Strain.Spade), Double()])
+        self.assertEqual(node.bounds((0, 2), 'spade-count'), (0, 8))
+
+
+    def testAlternatives(self):
+        """Exact register values are alternatives"""
+        system = loadSystem(STANDARD_ENGLISH, cache=False,
+                            roots=('openings', 'convention-blackwood-ace'))
+        node = system.node([bid(4, Strain.NoTrump), Pass(), bid(5, Strain.Club)])
+        self.assertEqual([rule.name for rule in node.rules], ['blackwood-response-club'])
+        self.assertEqual(node.constraints[(2,), 'ace-count'], (1 << 0) | (1 << 4))
+
+
+    def testCache(self):
+        """Compiled systems are cached on disk"""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'system.xml')
+            shutil.copy(STANDARD_ENGLISH, path)
+            loadSystem(path)
+            cachepath = os.path.join(directory, '__pycache__', 'system.xml.pickle')
+            self.assertTrue(os.path.exists(cachepath))
+            system = loadSystem(path)
+            self.assertEqual(self.rules(bid(1, Strain.NoTrump)), ['open-1-notrump'])
+            self.assertEqual([rule.name for rule in
+                              system.matchingRules([bid(1, Strain.NoTrump)])],
+                             ['open-1-notrump'])
+
+            # A stale cache, which refers to missing code, is compiled again.
+            with open(cachepath, 'wb') as f:
+                f.write(b'cpybridge.missing\nSystem\n.')
+            system = loadSystem(path)
+            self.assertEqual(len(system.matchingRules([bid(1, Strain.NoTrump)])), 1)
+        finally:
+            shutil.rmtree(directory)
+
+
+    def testNodeLimit(self):
+        """Sequences beyond the limit of nodes are interpreted, but not kept"""
+        system = loadSystem(STANDARD_ENGLISH, cache=False)
+        system.maxNodes = 2
+        calls = [bid(1, Strain.Heart), Pass(), bid(2, Strain.Heart)]
+        node = system.node(calls)
+        self.assertEqual(system.nodes, 2)
+        self.assertIsNot(system.node(calls), node)
+        self.assertEqual(system.node(calls).rules, node.rules)
+        self.assertIs(system.node(calls[:1]), system.node(calls[:1]))
@@ -0,0 +1,64 @@
+import unittest
+
+from pybridge.games.bridge import bitboard
+from pybridge.games.bridge.card import Card
+from pybridge.games.bridge.deal import Deal
+from pybridge.games.bridge.symbols import Direction, Rank, Suit
+
+
+class TestBitboard(unittest.TestCase):
+
+    deal = Deal.fromString(
+        "S:KJ985.K762.85.KT Q72.AJ3.AQT92.J6 AT63.T85.4.A9842 4.Q94.KJ763.Q753")
+
+
+    def testCardCodes(self):
+        """Bit positions follow the sort order of cards"""
+        cards = sorted(Card(r, s) for r in Rank for s in Suit)
+        self.assertEqual([bitboard.cardCode(c) for c in cards], list(range(52)))
+        self.assertEqual(bitboard.CARDS, cards)
+
+
+    def testRoundTrip(self):
+        """Conversion between hands and masks is lossless"""
+        for hand in self.deal.values():
+            mask = bitboard.handToMask(hand)
+            self.assertEqual(bitboard.popcount(mask), 13)
+            self.assertEqual(bitboard.maskToHand(mask), sorted(hand))
+
+        masks = self.deal.toMasks()
+        self.assertEqual(sum(masks.values()), bitboard.FULL_MASK)
+        self.assertEqual(Deal.fromMasks(masks), self.deal)
+
+
+    def testSuitOperations(self):
+        """Suit holdings, lengths and card membership"""
+        mask = self.deal.toMasks()[Direction.North]  # AT63.T85.4.A9842
+        self.assertEqual(bitboard.suitLengths(mask), (5, 1, 3, 4))
+        self.assertEqual(bitboard.suitLength(mask, Suit.Spade), 4)
+        self.assertEqual(bitboard.fromSuitMasks(bitboard.suitMasks(mask)), mask)
+
+        ace = Card(Rank.Ace, Suit.Spade)
+        self.assertTrue(bitboard.hasCard(mask, ace))
+        mask = bitboard.removeCard(mask, ace)
+        self.assertFalse(bitboard.hasCard(mask, ace))
+        self.assertEqual(bitboard.suitLength(mask, Suit.Spade), 3)
+        self.assertEqual(bitboard.addCard(mask, ace), self.deal.toMasks()[Direction.North])
+
+
+    def testTricks(self):
+        """Legal cards and trick winners"""
+        mask = self.deal.toMasks()[Direction.North]  # AT63.T85.4.A9842
+        hearts = bitboard.suitMask(mask, Suit.Heart) << 26
+        self.assertEqual(bitboard.legalMask(mask, Suit.Heart), hearts)
+        self.assertEqual(bitboard.legalMask(mask), mask)
+        self.assertEqual(bitboard.legalMask(mask & ~hearts, Suit.Heart), mask & ~hearts)
+
+        trick = bitboard.handToMask([Card(Rank.Four, Suit.Heart), Card(Rank.King, Suit.Heart),
+                                     Card(Rank.Two, Suit.Club), Card(Rank.Ace, Suit.Spade)])
+        self.assertEqual(bitboard.trickWinner(trick, Suit.Heart),
+                         Card(Rank.King, Suit.Heart).code)
+        self.assertEqual(bitboard.trickWinner(trick, Suit.Heart, Suit.Club),
+                         Card(Rank.Two, Suit.Club).code)
+        self.assertEqual(bitboard.trickWinner(trick, Suit.Heart, Suit.Diamond),
+                         Card(Rank.King, Suit.Heart).code)
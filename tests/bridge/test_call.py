@@ -0,0 +1,44 @@
+import copy
+import unittest
+from twisted.spread import jelly, pb
+
+from pybridge.games.bridge.call import Call, Bid, Pass, Double, Redouble
+from pybridge.games.bridge.symbols import Level, Strain
+
+
+class TestCall(unittest.TestCase):
+
+    bids = [Bid(l, s) for l in Level for s in Strain]
+    calls = bids + [Pass(), Double(), Redouble()]
+
+
+    def testInterning(self):
+        """Testing that each call is a unique, canonical instance"""
+        for level in Level:
+            for strain in Strain:
+                self.assertIs(Bid(level, strain), Bid(level, strain))
+        for callclass in (Pass, Double, Redouble):
+            self.assertIs(callclass(), callclass())
+        for code, call in enumerate(self.calls):
+            self.assertEqual(call.code, code)
+            self.assertIs(Call.fromCode(code), call)
+            self.assertIs(copy.deepcopy(call), call)
+        self.assertRaises(TypeError, Bid, Strain.Club, Level.One)
+
+
+    def testCompare(self):
+        """Testing comparison of calls"""
+        self.assertEqual(sorted(reversed(self.calls)), self.calls)
+        for bid in self.bids:
+            self.assertTrue(bid < Pass())
+        self.assertNotEqual(Pass(), Double())
+        self.assertRaises(TypeError, lambda: Pass() < 42)
+
+
+    def testSerialization(self):
+        """Testing that remote copies of calls are canonical instances"""
+        broker = pb.Broker()
+        broker.serializingPerspective = broker.unserializingPerspective = None
+        copied = jelly.unjelly(jelly.jelly(self.calls, invoker=broker), invoker=broker)
+        for c1, c2 in zip(self.calls, copied):
+            self.assertIs(c1, c2)
@@ -1,4 +1,6 @@
+import copy
 import unittest
+from twisted.spread import jelly, pb
 
 from pybridge.games.bridge.card import Card
 from pybridge.games.bridge.symbols import Rank, Suit
@@ -49,3 +51,25 @@ class TestCard(unittest.TestCase):
         cards.sort()  # Smallest to largest.
         self.assertEqual(cards, [Card(r, s) for s in Suit for r in Rank])
 
+
+
+    def testInterning(self):
+        """Testing that each card is a unique, canonical instance"""
+        for r in Rank:
+            for s in Suit:
+                card = Card(r, s)
+                self.assertIs(card, Card(r, s))
+                self.assertIs(card, Card.fromCode(card.code))
+                self.assertEqual(card.code, s.value*13 + r.value)
+                self.assertIs(copy.deepcopy(card), card)
+        self.assertRaises(TypeError, Card, Suit.Spade, Rank.Ace)
+
+
+    def testSerialization(self):
+        """Testing that remote copies of cards are canonical instances"""
+        broker = pb.Broker()
+        broker.serializingPerspective = broker.unserializingPerspective = None
+        cards = [Card(r, s) for r in Rank for s in Suit]
+        copied = jelly.unjelly(jelly.jelly(cards, invoker=broker), invoker=broker)
+        for c1, c2 in zip(cards, copied):
+            self.assertIs(c1, c2)
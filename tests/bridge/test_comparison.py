@@ -0,0 +1,113 @@
+import random
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pybridge.games.bridge.auction import Auction
+from pybridge.games.bridge.board import Board
+from pybridge.games.bridge.call import Bid, Pass
+from pybridge.games.bridge.comparison import Session, butlerImps, butlerImpsMany, \
+                                             crossImps, crossImpsMany, datum, imps, \
+                                             impsMany, matchpoints, matchpointsMany, \
+                                             northSouthScore
+from pybridge.games.bridge.result import DuplicateResult
+from pybridge.games.bridge.symbols import Direction, Level, Strain, Vulnerable
+
+
+def pairwiseMatchpoints(scores):
+    return [sum(1.0 if score > other else 0.5 if score == other else 0.0
+                for other in scores) - 0.5 for score in scores]
+
+
+def pairwiseCrossImps(scores):
+    return [sum(imps(score - other) for other in scores) / (len(scores) - 1)
+            for score in scores]
+
+
+
+
+class TestComparison(unittest.TestCase):
+
+
+    def testImps(self):
+        """Differences in score are converted to IMPs"""
+        for difference, expected in [(0, 0), (10, 0), (20, 1), (40, 1), (50, 2),
+                                     (420, 9), (430, 10), (620, 12), (1430, 16),
+                                     (4000, 24), (7600, 24), (-50, -2), (-1100, -15)]:
+            self.assertEqual(imps(difference), expected)
+
+
+    def testMatchpoints(self):
+        """Scores earn matchpoints for the scores beaten and tied"""
+        scores = [420, 450, 420, -50, 420, 170]
+        self.assertEqual(matchpoints(scores), [3, 5, 3, 0, 3, 1])
+        # Neuberg: a board played 3 times, scaled to a top of 5.
+        self.assertEqual(matchpoints([100, 0, -100], 6), [4.5, 2.5, 0.5])
+        self.assertEqual(matchpoints([], 6), [])
+
+        rng = random.Random(1)
+        for _ in range(20):
+            scores = [rng.choice(range(-500, 1000, 10)) for _ in range(rng.randrange(1, 30))]
+            self.assertEqual(matchpoints(scores), pairwiseMatchpoints(scores))
+            crosses = crossImps(scores)
+            for cross, expected in zip(crosses, pairwiseCrossImps(scores) if len(scores) > 1
+                                       else [0.0]):
+                self.assertAlmostEqual(cross, expected)
+
+
+    def testButler(self):
+        """Butler IMPs are scored against a trimmed datum"""
+        scores = [420, 450, 420, -50, 420, 1430]
+        self.assertEqual(datum(scores), 430)  # (420 + 450 + 420 + 420) / 4
+        self.assertEqual(butlerImps(scores), [0, 1, 0, -10, 0, 14])
+        self.assertEqual(datum([100, 200], trim=1), 150)
+
+
+    def testSession(self):
+        """Session totals are credited to both pairs of each result"""
+        board = Board(num=1, dealer=Direction.North, vuln=Vulnerable.Nil)
+        results = []
+        for declarer, tricks in ((Direction.North, 10), (Direction.East, 9),
+                                 (Direction.North, 10)):
+            auction = Auction(declarer)
+            for call in [Bid(Level.Four, Strain.Spade), Pass(), Pass(), Pass()]:
+                auction.makeCall(call)
+            results.append(DuplicateResult(board, auction.contract, tricks))
+        self.assertEqual(northSouthScore(results[0]), 420)
+        self.assertEqual(northSouthScore(results[1]), 50)
+
+        session = Session()
+        for table, result in enumerate(results):
+            session.addResult(result, 'NS%d' % table, 'EW%d' % table)
+        session.addScore(2, -100, 'NS0', 'EW1')
+        session.addScore(2, 100, 'NS1', 'EW0')
+
+        # Board 2 is scaled to a top of 2: its top is 1.75, and its bottom 0.25.
+        totals = session.matchpoints()
+        self.assertEqual(totals['NS0'], (1.5 + 0.25, 4))
+        self.assertEqual(totals['EW0'], (0.5 + 0.25, 4))
+        self.assertEqual(totals['NS1'], (0 + 1.75, 4))
+        self.assertEqual(session.percentages()['EW2'], 25.0)
+        # Board 1 has a datum of 420, and board 2 a datum of 0.
+        self.assertEqual(session.butlerImps()['NS1'], -9 + 3)
+        self.assertEqual(session.crossImps()['EW1'], 9 + 5)
+
+
+    @unittest.skipIf(numpy is None, "NumPy not available")
+    def testMany(self):
+        """Arrays of boards are scored as their rows"""
+        rng = numpy.random.default_rng(2)
+        scores = rng.integers(-60, 100, size=(30, 25)) * 10
+        points = matchpointsMany(scores)
+        crosses = crossImpsMany(scores)
+        butler = butlerImpsMany(scores)
+        for row in range(len(scores)):
+            board = scores[row].tolist()
+            self.assertEqual(points[row].tolist(), matchpoints(board))
+            self.assertTrue(numpy.allclose(crosses[row], crossImps(board)))
+            self.assertEqual(butler[row].tolist(), butlerImps(board))
+        self.assertEqual(matchpointsMany([100, 0, -100], 6).tolist(), [4.5, 2.5, 0.5])
+        self.assertEqual(impsMany([-1100, 0, 430]).tolist(), [-15, 0, 10])
@@ -1,7 +1,12 @@
 import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from pybridge.games.bridge.card import Card
-from pybridge.games.bridge.deal import Deal
+from pybridge.games.bridge.deal import Deal, comb
 from pybridge.games.bridge.symbols import Direction, Rank, Suit
 
 
@@ -61,19 +66,61 @@ class TestDeck(unittest.TestCase):
             self.fail(e, deal)
 
 
-    @unittest.skip("not used")
+    @unittest.skipIf(numpy is None, "NumPy not available")
+    def test_generateRandomBatch(self):
+        """Testing generation of batches of random deals"""
+        batch = Deal.fromRandomBatch(100, seed=42)
+        self.assertEqual(batch.shape, (100, 52))
+        for position in Direction:
+            self.assertTrue(((batch == position.value).sum(axis=1) == 13).all())
+
+        # The same seed reproduces the same batch.
+        self.assertTrue((Deal.fromRandomBatch(100, seed=42) == batch).all())
+
+        for row in batch[:10]:
+            deal = Deal.fromOwners(row)
+            self.validateDeal(deal)
+            self.assertEqual(deal.toOwners(), row.tolist())
+
+
     def test_toIndex(self):
         """Testing toIndex method over a set of known deals"""
         for index, deal in list(self.samples.items()):
             self.assertEqual(deal.toIndex(), index)
 
 
-    @unittest.skip("not used")
     def test_fromIndex(self):
         """Testing Deal.fromIndex over a set of known indexes"""
         for index, deal in list(self.samples.items()):
             self.assertEqual(Deal.fromIndex(index), deal)
 
+
+    def test_indexBounds(self):
+        """Testing the first and last deal indexes"""
+        last = comb(52, 13) * comb(39, 13) * comb(26, 13)
+        self.assertEqual(last, 53644737765488792839237440000)
+        for index in (1, 2, last - 1, last):
+            deal = Deal.fromIndex(index)
+            self.validateDeal(deal)
+            self.assertEqual(deal.toIndex(), index)
+
+
+    def test_indexMany(self):
+        """Testing bulk conversion of deals to and from indexes"""
+        deals = list(self.samples.values())
+        indexes = list(self.samples.keys())
+        self.assertEqual(Deal.toIndexMany(deals), indexes)
+        self.assertEqual(Deal.fromIndexMany(indexes), deals)
+
+
+    @unittest.skipIf(numpy is None, "NumPy not available")
+    def test_indexManyArray(self):
+        """Testing bulk conversion of owner arrays to and from indexes"""
+        batch = Deal.fromRandomBatch(500, seed=7)
+        indexes = Deal.toIndexMany(batch)
+        self.assertEqual(indexes[:20], [Deal.fromOwners(row).toIndex() for row in batch[:20]])
+        self.assertTrue((Deal.fromIndexMany(indexes, owners=True) == batch).all())
+
     def test_fromString(self):
         deal_str = "S:KJ985.K762.85.KT Q72.AJ3.AQT92.J6 AT63.T85.4.A9842 4.Q94.KJ763.Q753"
         deal = Deal.fromString(deal_str)
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pybridge.games.bridge.board import Board
+from pybridge.games.bridge.deal import Deal
+from pybridge.games.bridge.dealstore import DealStore, packOwners, unpackOwners
+from pybridge.games.bridge.symbols import Direction, Vulnerable
+
+
+@unittest.skipIf(numpy is None, "NumPy not available")
+class TestDealStore(unittest.TestCase):
+
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'deals.db')
+
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+    def testPacking(self):
+        """Card owners are packed in 13 bytes per deal"""
+        owners = Deal.fromRandomBatch(100, seed=1)
+        packed = packOwners(owners)
+        self.assertEqual(packed.shape, (100, 13))
+        self.assertTrue((unpackOwners(packed) == owners).all())
+
+
+    def testAppend(self):
+        """Boards and deals are appended, and read as boards"""
+        board = next(Board.first(Deal.fromRandom()))
+        deal = Deal.fromRandom()
+        with DealStore(self.path, 'a') as store:
+            self.assertEqual(len(store), 0)
+            self.assertEqual(store.append([board, deal]), 2)
+            self.assertEqual(len(store), 2)
+
+        store = DealStore(self.path)
+        self.assertEqual(os.path.getsize(self.path), 16 + 2*16)
+        copy = store[0]
+        self.assertEqual(copy['deal'], board['deal'])
+        self.assertEqual(copy['dealer'], Direction.East)
+        self.assertEqual(copy['vuln'], Vulnerable.NorthSouth)
+        self.assertEqual(copy['num'], 2)
+        self.assertEqual(store[1]['deal'], deal)
+        self.assertNotIn('num', store[1])
+        self.assertEqual(store.deal(1), deal)
+
+        # A read-only store cannot be appended to.
+        self.assertRaises(IOError, store.append, [deal])
+
+
+    def testRecords(self):
+        """Records are sliced, sampled and searched"""
+        owners = Deal.fromRandomBatch(1000, seed=2)
+        store = DealStore(self.path, 'a')
+        store.appendOwners(owners, dealer=numpy.arange(1000) % 4, num=numpy.arange(1000) + 1)
+        self.assertTrue((store.owners() == owners).all())
+
+        records = store[10:20]
+        self.assertEqual(len(records), 10)
+        self.assertEqual(records[3]['num'], 14)
+        self.assertEqual([board['num'] for board in records], list(range(11, 21)))
+
+        sample = store.sample(50, seed=3)
+        self.assertEqual(len(sample), 50)
+        self.assertEqual(len(set(board['num'] for board in sample)), 50)
+
+        deal = Deal.fromOwners(owners[567])
+        self.assertEqual(store.find(deal), [567])
+        self.assertEqual(store.find(deal.toIndex(), chunksize=100), [567])
+        self.assertEqual(store.dealIndexes(567, 568), [deal.toIndex()])
+
+        # Board numbers which do not fit in a record are refused.
+        self.assertRaises(ValueError, store.appendOwners, owners[:1], num=65536)
+        self.assertEqual(len(store), 1000)
+
+
+    def testInvalid(self):
+        """Files which are not deal stores are rejected"""
+        with open(self.path, 'wb') as f:
+            f.write(b'Not a deal store')
+        self.assertRaises(ValueError, DealStore, self.path)
+        self.assertRaises(ValueError, DealStore, self.path, 'w')
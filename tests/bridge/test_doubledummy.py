@@ -0,0 +1,144 @@
+import unittest
+
+from pybridge.games.bridge.bitboard import popcount
+from pybridge.games.bridge.deal import Deal
+from pybridge.games.bridge.doubledummy import DoubleDummySolver, canClaim, dds, solve, \
+                                             solvePlay, solveStrain, solveTable, solveTables
+from pybridge.games.bridge.pbn import parseCard, parseHands
+from pybridge.games.bridge.play import TrickPlay
+from pybridge.games.bridge.symbols import Direction, Strain, Suit
+
+
+class TestDoubleDummy(unittest.TestCase):
+
+    # Endings, with the tricks which the side not on lead can take.
+    # Results have been verified with an independent double-dummy solver.
+    endings = [
+        ("N:72..T8.QJ3 QJT.A4.6.4 .QJ75.7.T8 A.K6.5.762", None, Direction.North, 2),
+        ("N:T643.4..92 A2.76.86.6 98..T4.QJ4 7.KJ82..T3", Suit.Heart, Direction.West, 1),
+        ("N:J2.AT.92.T AQ4.J6.A.9 3.4.KJ3.K4 KT8..6.J87", Suit.Club, Direction.North, 6),
+        ("N:T8.A65.T7. A4.3..AK98 J93.QJ2..T Q..A2.6432", Suit.Heart, Direction.South, 2),
+        ("N:75..T752.3 8.83.Q.T65 QJ..J98.82 K9.A74.K6.", None, Direction.South, 7),
+        ("N:3.8432.7.A7 AT4..J4.J93 .75.T85.Q54 K87.K.K63.K", Suit.Diamond, Direction.South, 6),
+        ("N:AQ.6.3.QJ63 532.T53.7.T T864..K5.84 K9.874.2.K9", None, Direction.East, 4),
+    ]
+
+    # http://bridgehands.com/D/Duke_of_Cumberland_Hand.htm
+    duke = Deal.fromString(
+        "N:..Q8765432.AQT84 65432.T9872.JT9. T987.6543..76532 AKQJ.AKQJ.AK.KJ9")
+
+    # Tricks for each declarer (North, East, South, West), in each strain.
+    dukeTable = {Strain.Club: (13, 0, 13, 0), Strain.Diamond: (9, 4, 9, 4),
+                 Strain.Heart: (0, 13, 0, 12), Strain.Spade: (0, 13, 0, 12),
+                 Strain.NoTrump: (2, 10, 2, 10)}
+
+    # Each hand holds a complete suit.
+    suits = Deal.fromString("N:AKQJT98765432... .AKQJT98765432.. "
+                            "..AKQJT98765432. ...AKQJT98765432")
+
+
+    # The backends of the solver: this module, and DDS if it is installed.
+    backends = [False] + [True] * (dds is not None)
+
+
+    def testEndings(self):
+        """Tricks taken in endings"""
+        for (dealstr, trumpSuit, leader, expected), native in \
+                [(ending, native) for ending in self.endings for native in self.backends]:
+            hands = parseHands(dealstr)
+            solver = DoubleDummySolver(hands, trumpSuit, native)
+            self.assertEqual(solver.tricks(leader), expected, dealstr)
+            # Tricks of both sides add up to the number of remaining tricks.
+            remaining = popcount(hands[leader.value])
+            self.assertEqual(solver.tricks(leader, side=leader), remaining - expected)
+            self.assertTrue(solver.canTake(expected, leader))
+            self.assertFalse(solver.canTake(expected + 1, leader))
+
+
+    def testWithinTrick(self):
+        """Search resumes from a position within a trick"""
+        hands = parseHands("N:AQ.6.3.QJ63 532.T53.7.T T864..K5.84 K9.874.2.K9")
+        played = [parseCard('S2'), parseCard('S8')]
+        for card, position in zip(played, [Direction.East, Direction.South]):
+            hands[position.value] &= ~(1 << card.code)
+        for native in self.backends:
+            solver = DoubleDummySolver(hands, native=native)
+            self.assertEqual(solver.tricks(Direction.East, played, side=Direction.West), 2)
+
+        hands = parseHands("N:3.8432.7.A7 AT4..J4.J93 .75.T85.Q54 K87.K.K63.K")
+        played = [parseCard('H7'), parseCard('HK'), parseCard('H2')]
+        for card, position in zip(played, [Direction.South, Direction.West, Direction.North]):
+            hands[position.value] &= ~(1 << card.code)
+        for native in self.backends:
+            solver = DoubleDummySolver(hands, Suit.Diamond, native)
+            self.assertEqual(solver.tricks(Direction.South, played), 6)
+
+
+    def testSolve(self):
+        """Tricks taken by declarer in a full deal"""
+        self.assertEqual(solve(self.duke, Strain.Club, Direction.West), 13)
+        self.assertEqual(solve(self.duke, Strain.Spade, Direction.West), 0)
+        self.assertEqual(solve(self.duke, Strain.NoTrump, Direction.West), 2)
+
+
+    def testSolvePlay(self):
+        """Tricks taken by declarer from a position in a play session"""
+        for trumpSuit, expected in [(Suit.Club, 12), (None, 2)]:
+            play = TrickPlay(Direction.South, trumpSuit)
+            self.assertEqual(solvePlay(self.duke, play), 13 if trumpSuit else 2)
+            play.playCard(parseCard('HA'), Direction.West)
+            play.playCard(parseCard('D2'), Direction.North)
+            play.playCard(parseCard('H2'), Direction.East)
+            self.assertEqual(solvePlay(self.duke, play), expected)
+            play.playCard(parseCard('H3'), Direction.South)
+            self.assertEqual(solvePlay(self.duke, play), expected)
+
+
+    def testCanClaim(self):
+        """Claims are verified against every defence"""
+        for trumpSuit, expected in [(Suit.Club, 12), (None, 2)]:
+            play = TrickPlay(Direction.South, trumpSuit)
+            play.playCard(parseCard('HA'), Direction.West)
+            play.playCard(parseCard('D2'), Direction.North)
+            for claimer, tricks in [(Direction.South, expected),
+                                    (Direction.North, expected),
+                                    (Direction.West, 13 - expected)]:
+                self.assertTrue(canClaim(self.duke, play, claimer, tricks))
+                self.assertFalse(canClaim(self.duke, play, claimer, tricks + 1))
+
+
+    def testSolveTable(self):
+        """Double-dummy table of a deal"""
+        table = solveTable(self.duke)
+        for strain, tricks in self.dukeTable.items():
+            self.assertEqual(table[strain], dict(zip(Direction, tricks)))
+
+
+    @unittest.skipIf(dds is None, "DDS not available")
+    def testNative(self):
+        """The DDS backend agrees with this module on complete deals"""
+        for strain in (Strain.Club, Strain.Diamond, Strain.NoTrump):
+            self.assertEqual(solveStrain(self.duke, strain),
+                             dict(zip(Direction, self.dukeTable[strain])))
+        hands = self.duke.toMasks()
+        for trumpSuit, native in [(None, True), (None, False), (Suit.Heart, True)]:
+            solver = DoubleDummySolver(hands, trumpSuit, native)
+            self.assertEqual(solver.tricks(Direction.North),
+                             self.dukeTable[Strain.NoTrump if trumpSuit is None
+                                            else Strain.Heart][Direction.West.value])
+
+
+    def testSolveTables(self):
+        """Double-dummy tables computed across processes, in order"""
+        rotated = Deal(dict((Direction((position.value + 1) % 4), hand)
+                            for position, hand in self.suits.items()))
+        deals = [self.suits, rotated.toString(), self.suits]
+        tables = list(solveTables(deals, processes=2))
+        self.assertEqual(tables, [solveTable(self.suits), solveTable(rotated),
+                                  solveTable(self.suits)])
+        self.assertNotEqual(tables[0], tables[1])
+
+        # Closing the generator cancels outstanding searches.
+        results = solveTables(iter([self.suits] * 20), processes=1)
+        self.assertEqual(next(results), tables[0])
+        results.close()
@@ -0,0 +1,69 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pybridge.games.bridge.bitboard import handToMask
+from pybridge.games.bridge.deal import Deal
+from pybridge.games.bridge import evaluation
+from pybridge.games.bridge.symbols import Direction
+
+
+class TestEvaluation(unittest.TestCase):
+
+    # http://bridgehands.com/D/Duke_of_Cumberland_Hand.htm
+    duke = Deal.fromString(
+        "N:..Q8765432.AQT84 65432.T9872.JT9. T987.6543..76532 AKQJ.AKQJ.AK.KJ9")
+
+
+    def testTables(self):
+        """Tables hold the metrics of each suit holding"""
+        for table in (evaluation.LENGTH, evaluation.POINTS, evaluation.HONOURS,
+                      evaluation.CONTROLS, evaluation.QUICK_TRICKS, evaluation.LOSERS):
+            self.assertEqual(len(table), 8192)
+            self.assertEqual(table[0], 0)
+
+        ace, king, queen, two = 1 << 12, 1 << 11, 1 << 10, 1
+        self.assertEqual(evaluation.POINTS[8191], 10)
+        self.assertEqual(evaluation.HONOURS[8191], 5)
+        self.assertEqual(evaluation.CONTROLS[ace | king], 3)
+        for holding, tricks, losers in [(ace | king, 2, 0), (ace | queen, 1.5, 1),
+                                        (ace | two, 1, 1), (king | queen | two, 1, 1),
+                                        (king | two, 0.5, 1), (king, 0, 1),
+                                        (queen | two, 0, 2), (8191, 2, 0)]:
+            self.assertEqual(evaluation.QUICK_TRICKS[holding], tricks)
+            self.assertEqual(evaluation.LOSERS[holding], losers)
+
+
+    def testHands(self):
+        """Hands are evaluated as cards or as masks"""
+        west = self.duke[Direction.West]
+        for hand in (west, handToMask(west)):
+            self.assertEqual(evaluation.points(hand), 31)
+            self.assertEqual(evaluation.honours(hand), 12)
+            self.assertEqual(evaluation.controls(hand), 10)
+            self.assertEqual(evaluation.quickTricks(hand), 6.5)
+            self.assertEqual(evaluation.losers(hand), 2)
+            self.assertEqual(evaluation.lengths(hand), (3, 2, 4, 4))
+
+        self.assertEqual(evaluation.evaluateDeal(self.duke, evaluation.POINTS),
+                         {Direction.North: 8, Direction.East: 1,
+                          Direction.South: 0, Direction.West: 31})
+
+
+    @unittest.skipIf(numpy is None, "NumPy not available")
+    def testArrays(self):
+        """Batches of deals are evaluated as arrays"""
+        owners = Deal.fromRandomBatch(50, seed=1)
+        deals = [Deal.fromOwners(row) for row in owners]
+        for position in Direction:
+            holdings = evaluation.holdingsArray(owners, position)
+            self.assertEqual(holdings.shape, (50, 4))
+            for table in (evaluation.POINTS, evaluation.LOSERS, evaluation.QUICK_TRICKS):
+                self.assertEqual(evaluation.evaluateArray(holdings, table).tolist(),
+                                 [evaluation.evaluate(deal[position], table) for deal in deals])
+            lengths = evaluation.lookupArray(holdings, evaluation.LENGTH)
+            self.assertEqual(lengths.tolist(),
+                             [list(evaluation.lengths(deal[position])) for deal in deals])
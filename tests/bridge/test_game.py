@@ -1,5 +1,9 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import unittest
 
+from twisted.trial import unittest as trial
+
 from pybridge.games.bridge.board import Board
 from pybridge.games.bridge.call import Bid, Pass, Double, Redouble
 from pybridge.games.bridge.card import Card
@@ -116,3 +120,192 @@ class TestGameRuns(unittest.TestCase):
         self.assertEqual(self.game.inProgress(), False)  # Game complete.
         #self.game.getState()
 
+
+
+    def testSnapshot(self):
+        """Games are restored from snapshots, as they are replayed from state"""
+        self.game.start(board)
+        for call in [Bid(Level.One, Strain.NoTrump), Double(), Pass(), Pass(), Pass()]:
+            self.game.makeCall(call, position=self.game.getTurn())
+        for i in range(6):
+            turn = self.game.getTurn()
+            card = min(self.game.play.legalCards(board['deal']), key=lambda card: card.code)
+            if turn == self.game.play.dummy:
+                turn = self.game.play.declarer
+            self.game.playCard(card, position=turn)
+
+        def restore(state):
+            state = dict(state, board=Board(state['board']))
+            state['board']['deal'] = dict(state['board']['deal'])
+            game = Bridge()
+            game.setState(state)
+            return game
+
+        state = self.game.getState()
+        self.assertEqual(state['snapshot']['calls'], [0 * 5 + 4, 36, 35, 35, 35])
+        self.assertNotIn('auction', state)  # Moves are not sent twice.
+        for game in (restore(state), restore(self.game.getState(snapshot=False))):
+            self.assertEqual(list(game.auction), list(self.game.auction))
+            self.assertEqual(game.contract.doubleBy, Direction.East)
+            self.assertEqual([dict(trick) for trick in game.play],
+                             [dict(trick) for trick in self.game.play])
+            self.assertEqual(game.getTurn(), self.game.getTurn())
+            self.assertEqual(game.play.wonTrickCount(), self.game.play.wonTrickCount())
+            self.assertEqual(game.visibleHands, {Direction.South: hands[Direction.South]})
+
+        self.game.acceptClaim(7, Direction.North)
+        events = []
+
+        class Listener:
+            def update(self, event, *args, **kwargs):
+                events.append(event)
+
+        game = Bridge()
+        game.attach(Listener())
+        game.restoreSnapshot(Board(board), self.game.getSnapshot())
+        self.assertEqual(events, ['restoreState'])  # Notified once.
+        self.assertEqual(game.inProgress(), False)
+        self.assertEqual(game.play.wonTrickCount(), self.game.play.wonTrickCount())
+
+        # Snapshots are checked for consistency.
+        bad = dict(state, snapshot=dict(state['snapshot'], cards=[0, 1, 2, 3, 0]))
+        self.assertRaises(GameError, restore, bad)
+        bad = dict(state, snapshot=dict(state['snapshot'], cards=[0, 13]))
+        self.assertRaises(GameError, restore, bad)  # East does not hold a club.
+        bad = dict(state, snapshot=dict(state['snapshot'], calls=[0, 0]))
+        self.assertRaises(GameError, restore, bad)
+
+
+    def testForkAndUndo(self):
+        """Forks of a game are played, and taken back, without notification"""
+        events = []
+
+        class Listener:
+            def update(self, event, *args, **kwargs):
+                events.append(event)
+
+        self.game.attach(Listener())
+        self.game.start(board)
+        self.players[Direction.North].makeCall(Bid(Level.One, Strain.NoTrump))
+        del events[:]
+
+        fork = self.game.fork()
+        for call in [Pass(), Pass(), Pass()]:
+            fork.makeCall(call, position=fork.getTurn())
+        self.assertNotEqual(fork.play, None)
+        card = board['deal'][Direction.East][0]
+        fork.playCard(card, position=Direction.East)
+        self.assertIn(Direction.South, fork.visibleHands)  # Dummy is revealed.
+        self.assertEqual(events, [])
+        self.assertEqual(len(self.game.auction), 1)
+        self.assertEqual(self.game.play, None)
+        self.assertEqual(self.game.visibleHands, {})
+
+        self.assertEqual(fork.undo(), card)
+        self.assertEqual(fork.visibleHands, {})
+        self.assertEqual(fork.undo(), Pass())
+        self.assertEqual(fork.play, None)
+        self.assertEqual(fork.getTurn(), Direction.West)
+        fork.undo()
+        fork.undo()
+        self.assertEqual(fork.undo(), Bid(Level.One, Strain.NoTrump))
+        self.assertRaises(GameError, fork.undo)
+        self.assertEqual(fork.getTurn(), Direction.North)
+
+        # A passed out game has a result, which is taken back.
+        for call in [Pass()] * 4:
+            fork.makeCall(call, position=fork.getTurn())
+        self.assertEqual(len(fork.results), 1)
+        self.assertEqual(len(fork.visibleHands), 4)
+        fork.undo()
+        self.assertEqual((fork.results, fork.visibleHands), ([], {}))
+        self.assertEqual(fork.inProgress(), True)
+        self.assertEqual(self.game.results, [])
+
+
+    def testForkSharing(self):
+        """Forks share a complete auction and the board until they change"""
+        self.game.start(Board(board, deal={Direction.North: hands[Direction.North]}))
+        for call in [Bid(Level.One, Strain.NoTrump), Pass(), Pass(), Pass()]:
+            self.game.makeCall(call, position=self.game.getTurn())
+        fork = self.game.fork()
+        self.assertIs(fork.auction, self.game.auction)
+        self.assertIs(fork.board, self.game.board)
+
+        fork.revealHand(hands[Direction.South], Direction.South)
+        self.assertIn(Direction.South, fork.board['deal'])
+        self.assertNotIn(Direction.South, self.game.board['deal'])
+        self.assertEqual(fork.undo(), Pass())
+        self.assertEqual(len(fork.auction), 3)
+        self.assertEqual(len(self.game.auction), 4)
+        self.assertEqual(self.game.auction.isComplete(), True)
+
+
+
+
+class TestClaims(trial.TestCase):
+    """Claims are verified in workers, so tests wait on Deferreds."""
+
+
+    def setUp(self):
+        self.game = Bridge()
+        self.events = []
+        self.game.attach(self)
+        self.game.start(board)
+        # South declares, in No Trumps: West leads, and wins every trick.
+        for call in [Pass(), Pass(), Bid(Level.One, Strain.NoTrump), Pass(),
+                     Pass(), Pass()]:
+            self.game.makeCall(call, position=self.game.getTurn())
+
+
+    def update(self, event, *args, **kwargs):
+        self.events.append(event)
+
+
+    def testAcceptClaim(self):
+        """A guaranteed claim is accepted, and completes play"""
+        d = self.game.claim(13, position=Direction.West)
+
+        def accepted(tricks):
+            self.assertEqual(tricks, 13)
+            self.assertEqual(self.game.inProgress(), False)
+            self.assertEqual(self.game.play.wonTrickCount(), (0, 13))
+            self.assertEqual(self.game.result.tricksMade, 0)
+            self.assertIn('acceptClaim', self.events)
+            self.assertEqual(len(self.game.visibleHands), 4)
+
+            # An accepted claim may be taken back.
+            self.assertEqual(self.game.undo(), None)
+            self.assertEqual(self.game.inProgress(), True)
+            self.assertEqual(self.game.results, [])
+
+        return d.addCallback(accepted)
+
+
+    def testRejectClaim(self):
+        """A claim which is not guaranteed is rejected"""
+        self.game.playCard(board['deal'][Direction.West][0], position=Direction.West)
+        d = self.game.claim(1, position=Direction.South)
+        self.assertFailure(d, GameError)
+
+        def rejected(error):
+            self.assertEqual(self.game.inProgress(), True)
+            self.assertNotIn('acceptClaim', self.events)
+
+        return d.addCallback(rejected)
+
+
+    def testInvalidClaim(self):
+        """Claims are only made, for the remaining tricks, by players in play"""
+        self.assertRaises(GameError, self.game.claim, 0, position=Direction.North)
+        self.assertRaises(GameError, self.game.claim, 14, position=Direction.South)
+        self.assertRaises(TypeError, self.game.claim, '1', position=Direction.South)
+
+
+    def testClaimExecutor(self):
+        """Claims may be verified by an executor, such as a pool of processes"""
+        executor = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn'))
+        self.addCleanup(executor.shutdown)
+        self.game.claimExecutor = executor
+        d = self.game.claim(0, position=Direction.South)
+        return d.addCallback(self.assertEqual, 0)
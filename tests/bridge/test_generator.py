@@ -0,0 +1,126 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pybridge.games.bridge.deal import Deal
+from pybridge.games.bridge.generator import DealGenerator, Length, Losers, Points, \
+                                            Predicate, Shape, balanced
+from pybridge.games.bridge.symbols import Direction, Rank, Suit
+
+
+North, East, South, West = Direction
+
+
+def points(hand):
+    return sum(max(card.rank.value - Rank.Ten.value, 0) for card in hand)
+
+
+def lengths(hand):
+    return [len([card for card in hand if card.suit == suit]) for suit in Suit]
+
+
+def losers(hand):
+    count = 0
+    for suit in Suit:
+        ranks = [card.rank for card in hand if card.suit == suit]
+        counted = min(len(ranks), 3)
+        honours = (Rank.Ace, Rank.King, Rank.Queen)[:counted]
+        count += counted - len([rank for rank in ranks if rank in honours])
+    return count
+
+
+@unittest.skipIf(numpy is None, "NumPy not available")
+class TestDealGenerator(unittest.TestCase):
+
+
+    def testConstraints(self):
+        """Generated deals satisfy the constraint"""
+        constraint = Points(North, 15, 17) & balanced(North) & Length(South, Suit.Heart, 5)
+        generator = DealGenerator(constraint, seed=1)
+        deals = generator.generate(200)
+        self.assertEqual(len(deals), 200)
+        for deal in deals:
+            self.assertTrue(15 <= points(deal[North]) <= 17)
+            self.assertIn(sorted(lengths(deal[North])), ([3, 3, 3, 4], [2, 3, 4, 4], [2, 3, 3, 5]))
+            self.assertTrue(lengths(deal[South])[Suit.Heart.value] >= 5)
+
+        # Rejected deals are counted.
+        self.assertTrue(generator.tried > generator.accepted >= 200)
+        self.assertTrue(0 < generator.acceptanceRate() < 0.05)
+
+
+    def testOperators(self):
+        """Constraints are combined with and, or and not"""
+        constraint = ~Losers(East, 0, 6) | Points((North, South), 30)
+        for deal in DealGenerator(constraint, seed=2).generate(100):
+            self.assertTrue(losers(deal[East]) > 6 or
+                            points(deal[North]) + points(deal[South]) >= 30)
+
+
+    def testShape(self):
+        """Shape patterns match suit lengths, in order or in any order"""
+        constraint = Shape(West, '5xxx', 'any 6511')
+        for deal in DealGenerator(constraint, seed=3).generate(100):
+            spades, hearts, diamonds, clubs = reversed(lengths(deal[West]))
+            self.assertTrue(spades == 5 or sorted([spades, hearts, diamonds, clubs]) == [1, 1, 5, 6])
+        self.assertRaises(ValueError, Shape, West, '5xx')
+
+
+    def testPredicate(self):
+        """Arbitrary predicates are evaluated over Deal objects"""
+        constraint = Points(South, 0, 5) & Predicate(lambda deal: Rank.Two in
+                                                     [card.rank for card in deal[South]])
+        for deal in DealGenerator(constraint, seed=4).generate(20):
+            self.assertTrue(points(deal[South]) <= 5)
+            self.assertIn(Rank.Two, [card.rank for card in deal[South]])
+
+
+    def testReproducible(self):
+        """The same seed generates the same deals"""
+        first = DealGenerator(Points(North, 20), seed=5).generateOwners(10)
+        second = DealGenerator(Points(North, 20), seed=5).generateOwners(10)
+        self.assertTrue((first == second).all())
+        self.assertIsInstance(Deal.fromOwners(first[0]), Deal)
+
+
+    def testTimeout(self):
+        """Generation stops when the time budget is exhausted"""
+        generator = DealGenerator(Points(North, 37), seed=6)  # Very rare.
+        self.assertEqual(generator.generate(timeout=0.1), [])
+        self.assertEqual(generator.accepted, 0)
+        self.assertRaises(ValueError, generator.generate)
+        for owners in (generator.generateOwners(0), generator.generateOwners(timeout=0)):
+            self.assertEqual((owners.shape, owners.dtype), ((0, 52), numpy.uint8))
+
+        # Without a timeout, generation gives up after maxTries candidates.
+        generator.maxTries = 5000
+        tried = generator.tried
+        self.assertEqual(generator.generate(1), [])
+        self.assertTrue(5000 <= generator.tried - tried < 5000 + generator.maxBatchSize)
+
+
+    def testBoards(self):
+        """Generated boards follow the duplicate rotation"""
+        boards = DealGenerator(seed=7).boards(5)
+        self.assertEqual([board['num'] for board in boards], [1, 2, 3, 4, 5])
+        self.assertEqual([board['dealer'] for board in boards],
+                         [North, East, South, West, North])
+
+
+    def testKnown(self):
+        """Known cards are dealt to their holders"""
+        deal = Deal.fromRandom()
+        played = deal[East][:3]
+        generator = DealGenerator(Points(North, 10), seed=4,
+                                  known={South: deal[South], East: played})
+        for generated in generator.generate(100):
+            self.assertEqual(generated[South], deal[South])
+            self.assertTrue(set(played) <= set(generated[East]))
+            self.assertTrue(all(len(generated[position]) == 13 for position in Direction))
+            self.assertTrue(points(generated[North]) >= 10)
+
+        self.assertRaises(ValueError, DealGenerator,
+                          known={North: deal[South][:1], South: deal[South]})
@@ -0,0 +1,89 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pybridge.games.bridge.auction import Auction
+from pybridge.games.bridge.biddingsystem import STANDARD_ENGLISH, loadSystem
+from pybridge.games.bridge.call import Bid, Pass
+from pybridge.games.bridge.deal import Deal
+from pybridge.games.bridge.evaluation import lengths, points
+from pybridge.games.bridge.inference import AuctionInference
+from pybridge.games.bridge.symbols import Direction, Level, Strain
+
+
+North, East, South, West = Direction
+
+
+def bid(level, strain):
+    return Bid(Level(level - 1), strain)
+
+
+
+
+class TestAuctionInference(unittest.TestCase):
+
+    system = loadSystem(STANDARD_ENGLISH, cache=False)
+
+    deal = Deal.fromString(
+        "N:AK32.Q54.K93.J82 QJ9.KT98.A82.K93 T8.AJ762.QJ5.T74 7654.3.T764.AQ65")
+
+
+    def testPropagation(self):
+        """Promises are propagated to the ranges of all hands"""
+        inference = AuctionInference(self.system, North, known={South: self.deal[South]})
+        self.assertEqual(inference.bounds(South, 'hand-points-card'), (8, 8))
+        self.assertEqual(inference.bounds((East, West), 'hand-points-card'), (0, 32))
+
+        inference.makeCall(bid(1, Strain.NoTrump))
+        self.assertEqual(inference.bounds(North, 'hand-points-card'), (12, 14))
+        self.assertEqual(inference.bounds(North, 'heart-count'), (2, 4))
+        # South holds five hearts, so opponents hold 0 to 6 hearts each.
+        self.assertEqual(inference.bounds(East, 'heart-count'), (0, 6))
+        self.assertEqual(inference.bounds((East, West), 'hand-points-card'), (18, 20))
+        self.assertEqual(inference.ignored, [])
+
+
+    def testAuction(self):
+        """Auctions are followed through the bidding system"""
+        auction = Auction(West)
+        for call in [bid(1, Strain.Heart), Pass(), bid(3, Strain.Heart)]:
+            auction.makeCall(call)
+        inference = AuctionInference.fromAuction(self.system, auction)
+        self.assertEqual(inference.bounds(West, 'heart-count'), (4, 9))
+        self.assertEqual(inference.bounds(East, 'heart-count'), (4, 9))
+        self.assertEqual(inference.bounds(East, 'hand-points-card'), (10, 12))
+        self.assertEqual(inference.bounds((West, East), 'heart-count'), (8, 13))
+        self.assertEqual(inference.bounds(North, 'heart-count'), (0, 5))
+
+
+    def testInconsistent(self):
+        """Promises inconsistent with known cards are disregarded"""
+        inference = AuctionInference(self.system, North, known={North: self.deal[South]})
+        inference.makeCall(bid(1, Strain.Spade))  # Two spades.
+        self.assertEqual(inference.ignored, [0])
+        self.assertEqual(inference.bounds(North, 'hand-points-card'), (8, 8))
+
+        inference = AuctionInference(self.system, North)
+        inference.makeCall(bid(1, Strain.Spade))
+        self.assertEqual(inference.ignored, [])
+        inference.reveal(North, self.deal[South])
+        self.assertEqual(inference.ignored, [0])
+
+
+    @unittest.skipIf(numpy is None, "NumPy not available")
+    def testSample(self):
+        """Sampled deals are consistent with the inference"""
+        auction = Auction(North)
+        auction.makeCall(bid(1, Strain.NoTrump))
+        inference = AuctionInference.fromAuction(self.system, auction,
+                                                 known={South: self.deal[South]})
+        owners = inference.sample(200, seed=1)
+        self.assertEqual(len(owners), 200)
+        for row in owners:
+            deal = Deal.fromOwners(row)
+            self.assertEqual(deal[South], self.deal[South])
+            self.assertTrue(12 <= points(deal[North]) <= 14)
+            self.assertTrue(all(2 <= length <= 5 for length in lengths(deal[North])))
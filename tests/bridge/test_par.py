@@ -0,0 +1,94 @@
+import unittest
+
+from pybridge.games.bridge.call import Bid
+from pybridge.games.bridge.par import ParContract, calculatePar
+from pybridge.games.bridge.symbols import Direction, Level, Strain, Vulnerable
+
+
+EW = (Direction.East, Direction.West)
+NS = (Direction.North, Direction.South)
+
+
+def makeTable(tricks):
+    """Builds a double-dummy table from tuples of tricks (N, E, S, W)."""
+    return dict((strain, dict(zip(Direction, tricks[strain]))) for strain in Strain)
+
+
+class TestPar(unittest.TestCase):
+
+    # Results have been verified with an independent par calculator.
+
+    # N:43.832.83.J87543 AT2.AKQT95.2.AK9 KQJ986.7.KT97.Q2 75.J64.AQJ654.T6
+    slam = makeTable({Strain.Club: (4, 9, 4, 9), Strain.Diamond: (3, 10, 3, 10),
+                      Strain.Heart: (0, 12, 0, 12), Strain.Spade: (5, 8, 5, 8),
+                      Strain.NoTrump: (1, 11, 1, 11)})
+
+    # N:AKQJ4..J983.J862 T985.K653.64.Q54 732.QT942.A752.7 6.AJ87.KQT.AKT93
+    sacrifice = makeTable({Strain.Club: (3, 9, 4, 9), Strain.Diamond: (9, 4, 9, 4),
+                           Strain.Heart: (5, 8, 5, 8), Strain.Spade: (7, 5, 7, 5),
+                           Strain.NoTrump: (5, 7, 5, 7)})
+
+    # http://bridgehands.com/D/Duke_of_Cumberland_Hand.htm
+    duke = makeTable({Strain.Club: (13, 0, 13, 0), Strain.Diamond: (9, 4, 9, 4),
+                      Strain.Heart: (0, 13, 0, 12), Strain.Spade: (0, 13, 0, 12),
+                      Strain.NoTrump: (2, 10, 2, 10)})
+
+    # Both sides make 1NT, and nothing else.
+    notrump = makeTable({Strain.Club: (5, 5, 5, 5), Strain.Diamond: (5, 5, 5, 5),
+                         Strain.Heart: (5, 5, 5, 5), Strain.Spade: (5, 5, 5, 5),
+                         Strain.NoTrump: (7, 7, 7, 6)})
+
+
+    def testSlam(self):
+        """Par contract is a slam, scored with its game bonus"""
+        for vulnerable, expected in [(Vulnerable.Nil, -980), (Vulnerable.NorthSouth, -980),
+                                     (Vulnerable.EastWest, -1430), (Vulnerable.All, -1430)]:
+            score, contracts = calculatePar(self.slam, Direction.North, vulnerable)
+            self.assertEqual(score, expected)
+            self.assertEqual(contracts, [ParContract(Bid(Level.Six, Strain.Heart),
+                                                     EW, False, 12, -expected)])
+
+
+    def testSacrifice(self):
+        """Par contracts are doubled sacrifices"""
+        score, contracts = calculatePar(self.sacrifice, Direction.North, Vulnerable.Nil)
+        self.assertEqual(score, 100)
+        self.assertEqual(contracts, [ParContract(Bid(Level.Three, Strain.Heart), EW, True, 8, -100),
+                                     ParContract(Bid(Level.Four, Strain.Club), EW, True, 9, -100)])
+        self.assertEqual(contracts[0].score, -100)
+
+        # Vulnerable sacrifices cost more than the contract is worth.
+        score, contracts = calculatePar(self.sacrifice, Direction.North, Vulnerable.EastWest)
+        self.assertEqual(score, 110)
+        self.assertEqual(contracts, [ParContract(Bid(Level.Three, Strain.Diamond), NS, False, 9, 110)])
+
+
+    def testDeclarers(self):
+        """Only declarers which make the most tricks are listed"""
+        score, contracts = calculatePar(self.duke, Direction.South, Vulnerable.All)
+        self.assertEqual(score, -2210)
+        self.assertEqual(contracts, [ParContract(Bid(Level.Seven, Strain.Heart),
+                                                 (Direction.East,), False, 13, 2210),
+                                     ParContract(Bid(Level.Seven, Strain.Spade),
+                                                 (Direction.East,), False, 13, 2210)])
+
+
+    def testDealer(self):
+        """Dealer's side has the first opportunity to bid"""
+        for dealer in Direction:
+            score, contracts = calculatePar(self.notrump, dealer)
+            if dealer in NS:
+                self.assertEqual(score, 90)
+                self.assertEqual(contracts, [ParContract(Bid(Level.One, Strain.NoTrump),
+                                                         NS, False, 7, 90)])
+            else:
+                self.assertEqual(score, -90)
+                self.assertEqual(contracts, [ParContract(Bid(Level.One, Strain.NoTrump),
+                                                         (Direction.East,), False, 7, 90)])
+
+
+    def testPassedOut(self):
+        """Board is passed out when no contract makes"""
+        table = makeTable(dict((strain, (6, 6, 6, 6)) for strain in Strain))
+        self.assertEqual(calculatePar(table, Direction.North), (0, []))
+
@@ -0,0 +1,197 @@
+import io
+import unittest
+
+from pybridge.games.bridge.call import Bid, Pass, Double
+from pybridge.games.bridge.card import Card
+from pybridge.games.bridge.deal import Deal
+from pybridge.games.bridge.pbn import PBNWriter, parseCall, parseCard, readGames, \
+                                      writeGames
+from pybridge.games.bridge.symbols import Direction, Level, Rank, Strain, Suit, Vulnerable
+
+
+SAMPLE = r'''% PBN 2.1
+% EXPORT
+[Event "Club Pairs"]
+[Site "London"]
+[Date "2007.03.14"]
+[Board "1"]
+[West "Wilma"]
+[North "Nancy"]
+[East "Eve"]
+[South "Sam"]
+[Dealer "N"]
+[Vulnerable "None"]
+[Deal "N:.63.AKQ987.A9732 A8654.KQ5.T.QJT6 J973.J98742.3.K4 KQT2.AT.J6542.85"]
+[Scoring "MP"]
+[Declarer "S"]
+[Contract "4HX"]
+[Result "9"]
+[Auction "N"]
+1D 1S 2H! =1= 2S
+3H Pass 4H X
+AP
+[Note "1:five plus"]
+[Play "W"]
+SK H3 S4 S3 ; ruffed
+D2 DA DT D3
+C5 CA C6 C4
+HA! H6 HQ H2
+{ The rest
+
+  is claimed. }
+*
+[OptimumResultTable "Declarer;1R\Denomination\2R\Result\2R"]
+N NT 8
+N S 9
+N H 10
+N D 10
+N C 9
+S NT 8
+S S 9
+S H 10
+S D 10
+S C 9
+E NT 4
+E S 4
+E H 3
+E D 3
+E C 4
+W NT 4
+W S 4
+W H 3
+W D 3
+W C 4
+
+[Event "#"]
+[Site "#"]
+[Date "#"]
+[Board "2"]
+[Dealer "E"]
+[Vulnerable "Both"]
+[Deal "E:A8654.KQ5.T.QJT6 J973.J98742.3.K4 KQT2.AT.J6542.85 .63.AKQ987.A9732"]
+[Declarer "W"]
+[Contract "3NTXX"]
+[Result "7"]
+'''
+
+
+class TestPBN(unittest.TestCase):
+
+
+    def setUp(self):
+        self.games = list(readGames(io.StringIO(SAMPLE)))
+
+
+    def testBoard(self):
+        """Boards are built from tags"""
+        self.assertEqual(len(self.games), 2)
+        board = self.games[0].board
+        self.assertEqual(board['deal'], Deal.fromString(self.games[0].tags['Deal']))
+        self.assertEqual(board['dealer'], Direction.North)
+        self.assertEqual(board['vuln'], Vulnerable.Nil)
+        self.assertEqual(board['num'], 1)
+        self.assertEqual(board['event'], "Club Pairs")
+        self.assertEqual(board['time'][:3], (2007, 3, 14))
+        self.assertEqual(board['players'][Direction.West], "Wilma")
+        self.assertEqual(self.games[0].tags['Scoring'], "MP")
+
+        # Tag values of "#" repeat those of the previous game.
+        board = self.games[1].board
+        self.assertEqual(board['event'], "Club Pairs")
+        self.assertEqual(board['dealer'], Direction.East)
+        self.assertEqual(board['vuln'], Vulnerable.All)
+
+
+    def testAuction(self):
+        """Auctions are reconstructed, with their annotations kept aside"""
+        auction = self.games[0].auction
+        self.assertEqual(auction.dealer, Direction.North)
+        self.assertEqual(len(auction), 11)
+        self.assertEqual(auction[2], Bid(Level.Two, Strain.Heart))
+        self.assertTrue(auction.isComplete())
+        contract = self.games[0].contract
+        self.assertEqual(contract.bid, Bid(Level.Four, Strain.Heart))
+        self.assertEqual(contract.declarer, Direction.South)
+        self.assertEqual(contract.doubleBy, Direction.West)
+        self.assertEqual(self.games[1].auction, None)
+        self.assertEqual(self.games[0].annotations['Auction'], {2: ['!', '=1=']})
+        self.assertEqual(self.games[0].notes, {'Auction': ["1:five plus"]})
+
+
+    def testContract(self):
+        """Contracts are taken from tags, without an auction"""
+        contract = self.games[1].contract
+        self.assertEqual(contract.bid, Bid(Level.Three, Strain.NoTrump))
+        self.assertEqual(contract.declarer, Direction.West)
+        self.assertEqual(contract.redoubleBy, Direction.West)
+        self.assertEqual(self.games[1].result, 7)
+
+
+    def testPlay(self):
+        """Play is reconstructed, in columns from the opening leader"""
+        play = self.games[0].play
+        self.assertEqual(len(play), 4)
+        self.assertEqual(play.trumpSuit, Suit.Heart)
+        self.assertEqual(play[0].winner, Direction.North)
+        self.assertEqual(play[1].leader, Direction.North)
+        self.assertEqual(play[3][Direction.West], Card(Rank.Ace, Suit.Heart))
+        self.assertEqual(play.wonTrickCount(), (3, 1))
+        self.assertEqual(self.games[0].annotations['Play'],
+                         {Card(Rank.Ace, Suit.Heart): ['!']})
+
+
+    def testTable(self):
+        """Optimum result tables are read as double-dummy tables"""
+        table = self.games[0].table
+        self.assertEqual(table[Strain.Heart],
+                         dict(zip(Direction, (10, 3, 10, 3))))
+        self.assertEqual(table[Strain.NoTrump][Direction.West], 4)
+        self.assertEqual(self.games[1].table, None)
+
+
+    def testRoundTrip(self):
+        """Games written are read back unchanged"""
+        f = io.StringIO()
+        self.assertEqual(writeGames(self.games, f), 2)
+        games = list(readGames(io.StringIO(f.getvalue())))
+        for game, copy in zip(self.games, games):
+            self.assertEqual(copy.board, game.board)
+            self.assertEqual(copy.result, game.result)
+            self.assertEqual(copy.table, game.table)
+            self.assertEqual(copy.tags['Contract'], game.tags['Contract'])
+        self.assertEqual(list(games[0].auction), list(self.games[0].auction))
+        self.assertEqual([dict(trick) for trick in games[0].play],
+                         [dict(trick) for trick in self.games[0].play])
+        self.assertEqual(games[0].tags['Scoring'], "MP")
+        # Annotations are written with the notes which they refer to.
+        self.assertIn('1D 1S 2H! =1= 2S\n3H Pass 4H X\nPass Pass Pass\n[Note "1:five plus"]',
+                      f.getvalue())
+        self.assertEqual(games[0].annotations, self.games[0].annotations)
+        self.assertEqual(games[0].notes, self.games[0].notes)
+
+
+    def testWriter(self):
+        """Contract tags are computed from the auction"""
+        f = io.StringIO()
+        writer = PBNWriter(f)
+        game = self.games[0]
+        writer.write(game.board, game.auction)
+        text = f.getvalue()
+        self.assertIn('[Contract "4HX"]', text)
+        self.assertIn('[Declarer "S"]', text)
+        self.assertIn('[Auction "N"]\n1D 1S 2H 2S\n3H Pass 4H X\nPass Pass Pass\n', text)
+        self.assertEqual(writer.count, 1)
+
+
+    def testErrors(self):
+        """Invalid calls and cards are rejected"""
+        self.assertEqual(parseCall('pass'), Pass())
+        self.assertEqual(parseCall('X'), Double())
+        self.assertEqual(parseCall('7N'), Bid(Level.Seven, Strain.NoTrump))
+        self.assertEqual(parseCard('D10'), Card(Rank.Ten, Suit.Diamond))
+        self.assertRaises(ValueError, parseCall, '8S')
+        self.assertRaises(ValueError, parseCard, 'ZA')
+
+        text = SAMPLE.replace('1D 1S', '1D 1C')
+        game = next(readGames(io.StringIO(text)))
+        self.assertRaises(ValueError, lambda: game.auction)
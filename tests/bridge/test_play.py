@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from pybridge.games.bridge.card import Card
@@ -57,6 +58,121 @@ class TestTrickPlay(unittest.TestCase):
         s = self.stepThroughTrickPlay()
         self.assertEqual(self.trickplay.whoseTurn(), self.trickplay.lho)
 
+
+    def testIncrementalState(self):
+        """Checking play state against the tricks played, in random deals"""
+        rng = random.Random(3)
+        for trumpSuit in (None, Suit.Club, Suit.Heart):
+            for _ in range(10):
+                deal = Deal.fromRandom()
+                play = TrickPlay(Direction(rng.randrange(4)), trumpSuit)
+                won = dict((position, 0) for position in Direction)
+                while not play.isComplete():
+                    turn = play.whoseTurn()
+                    played = set(trick[turn] for trick in play if turn in trick)
+                    hand = [card for card in deal[turn] if card not in played]
+                    if play and len(play[-1]) < 4:
+                        leadsuit = play[-1][play[-1].leader].suit
+                        followers = [card for card in hand if card.suit == leadsuit]
+                    else:
+                        followers = []
+                    valid = followers or hand
+                    for position in Direction:
+                        for card in deal[position]:
+                            self.assertEqual(play.isValidCardPlay(card, deal), card in valid)
+                        legal = play.legalCards(deal, position)
+                        self.assertEqual(legal, frozenset(valid if position == turn else ()))
+                    play.playCard(rng.choice(valid), turn)
+
+                    trick = play[-1]
+                    if trick.isComplete():
+                        trumps = [card for card in trick.values() if card.suit == trumpSuit]
+                        lead = trick[trick.leader].suit
+                        best = max(trumps or [card for card in trick.values()
+                                              if card.suit == lead])
+                        self.assertEqual(trick.winningCard, best)
+                        self.assertEqual(trick.winner, trick.whoPlayed(best))
+                        won[trick.winner] += 1
+                    else:
+                        self.assertEqual(trick.winner, None)
+                declarerWon = won[play.declarer] + won[play.dummy]
+                self.assertEqual(play.wonTrickCount(), (declarerWon, 13 - declarerWon))
+                self.assertEqual(dict((p, len(t)) for p, t in play.wonTricks().items()), won)
+                self.assertEqual(play.whoseTurn(), None)
+
+
+    def testUndoAndFork(self):
+        """Cards taken back restore the play, and forks are independent"""
+        rng = random.Random(5)
+        deal = Deal.fromRandom()
+        play = TrickPlay(Direction.East, Suit.Diamond)
+        state = lambda play: ([dict(trick) for trick in play], play.whoseTurn(),
+                              play.wonTrickCount(), play.legalCards(deal))
+        states = []
+        while not play.isComplete():
+            states.append(state(play))
+            play.playCard(rng.choice(list(play.legalCards(deal))), play.whoseTurn())
+        final = state(play)
+
+        fork = play.fork()
+        while len(fork) > 0:
+            count = sum(len(trick) for trick in fork)
+            position, card = fork.undoCard()
+            self.assertEqual(state(fork), states[count - 1])
+            self.assertEqual(fork.whoseTurn(), position)
+        self.assertEqual(state(play), final)  # Shared tricks are unchanged.
+        self.assertRaises(IndexError, fork.undoCard)
+
+        # Cards played in a fork are not played in the original.
+        play = TrickPlay(Direction.East, Suit.Diamond)
+        play.playCard(deal[Direction.South][0], Direction.South)
+        fork = play.fork()
+        card = [c for c in deal[Direction.West] if c in fork.legalCards(deal)][0]
+        fork.playCard(card, Direction.West)
+        self.assertEqual(len(play[-1]), 1)
+        self.assertEqual(play.whoseTurn(), Direction.West)
+
+    def testRestoreCards(self):
+        """Cards restored in sequence give the state of play of the cards"""
+        rng = random.Random(7)
+        deal = Deal.fromRandom()
+        play = TrickPlay(Direction.North, None)
+        state = lambda play: ([dict(trick) for trick in play], play.whoseTurn(),
+                              play.wonTrickCount(), play.legalCards(deal))
+        cards = []
+        while not play.isComplete():
+            if len(cards) in (0, 17, 51):
+                restored = TrickPlay(Direction.North, None)
+                restored.restoreCards(cards)
+                self.assertEqual(state(restored), state(play))
+            card = rng.choice(list(play.legalCards(deal)))
+            play.playCard(card, play.whoseTurn())
+            cards.append(card)
+        restored = TrickPlay(Direction.North, None)
+        restored.restoreCards(cards)
+        self.assertEqual(state(restored), state(play))
+        self.assertTrue(restored.isComplete())
+
+
+    def testClaimTricks(self):
+        """Tricks of an accepted claim are credited in bulk"""
+        for _ in range(5):
+            self.trickplay.playCard(*self.getValidArgsForPlayCard())
+        declarerWon, defenceWon = self.trickplay.wonTrickCount()
+        self.assertEqual(self.trickplay.remainingTricks(), 12)
+
+        self.trickplay.claimTricks(self.trickplay.lho, 9)
+        self.assertEqual(self.trickplay.isComplete(), True)
+        self.assertEqual(self.trickplay.whoseTurn(), None)
+        self.assertEqual(self.trickplay.wonTrickCount(),
+                         (declarerWon + 3, defenceWon + 9))
+        # Only the tricks played are listed.
+        self.assertEqual(sum(len(tricks) for tricks in self.trickplay.wonTricks().values()), 1)
+
+        self.trickplay.withdrawClaim()
+        self.trickplay.claimTricks(self.trickplay.dummy, 12)
+        self.assertEqual(self.trickplay.wonTrickCount(), (declarerWon + 12, defenceWon))
+
 '''
     def testWhoseTurn(self):
         """whoseTurn"""
@@ -0,0 +1,108 @@
+import copy
+import random
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pybridge.games.bridge.auction import Auction
+from pybridge.games.bridge.board import Board
+from pybridge.games.bridge.call import Bid, Pass, Double, Redouble
+from pybridge.games.bridge.result import DOUBLED, REDOUBLED, UNDOUBLED, \
+                                         DuplicateResult, Rubber, RubberResult, \
+                                         bidScore, score, scoreMany
+from pybridge.games.bridge.symbols import Direction, Level, Strain, Vulnerable
+
+
+def bid(level, strain):
+    return Bid(Level(level - 1), strain)
+
+
+def contract(calls, dealer=Direction.North):
+    auction = Auction(dealer)
+    for call in calls + [Pass(), Pass(), Pass()]:
+        auction.makeCall(call)
+    return auction.contract
+
+
+
+
+class TestResult(unittest.TestCase):
+
+
+    def testScore(self):
+        """Scores are looked up by contract, vulnerability and tricks made"""
+        self.assertEqual(bidScore(bid(3, Strain.NoTrump), UNDOUBLED, True, 9), 600)
+        self.assertEqual(bidScore(bid(1, Strain.Club), UNDOUBLED, False, 7), 70)
+        self.assertEqual(bidScore(bid(4, Strain.Spade), DOUBLED, False, 7), -500)
+        self.assertEqual(bidScore(bid(7, Strain.NoTrump), REDOUBLED, True, 13), 2980)
+        self.assertEqual(bidScore(bid(2, Strain.Heart), DOUBLED, True, 9), 870)
+        self.assertEqual(bidScore(bid(6, Strain.Diamond), UNDOUBLED, False, 0), -600)
+
+        redoubled = contract([bid(2, Strain.Heart), Double(), Redouble()])
+        self.assertEqual(score(redoubled, True, 9), 1240)
+        self.assertEqual(score(None, True, 9), 0)
+
+
+    def testResults(self):
+        """Results are scored by the duplicate and rubber schemes"""
+        board = Board(dealer=Direction.North, vuln=Vulnerable.NorthSouth)
+        doubled = contract([bid(2, Strain.Heart), Double()])
+        self.assertEqual(DuplicateResult(board, doubled, 9).score, 870)
+        self.assertEqual(RubberResult(board, doubled, 9).score, (200 + 50, 120))
+        self.assertEqual(DuplicateResult(board, doubled, 5).score, -800)
+        self.assertEqual(RubberResult(board, doubled, 5).score, (-800, 0))
+        self.assertEqual(DuplicateResult(board, None).score, 0)
+
+
+    def testRubber(self):
+        """Games, winner and vulnerability are updated as results are added"""
+        board = Board(dealer=Direction.North, vuln=Vulnerable.Nil)
+        north = lambda *calls: contract(list(calls))
+        east = lambda *calls: contract(list(calls), Direction.East)
+        results = [RubberResult(board, north(bid(2, Strain.Spade)), 8),   # 60 NS.
+                   RubberResult(board, None),                             # Passed out.
+                   RubberResult(board, east(bid(3, Strain.NoTrump)), 9),  # Game EW.
+                   RubberResult(board, north(bid(2, Strain.Heart)), 8),   # 60 NS.
+                   RubberResult(board, north(bid(1, Strain.Club)), 8),    # 20 NS.
+                   RubberResult(board, north(bid(1, Strain.NoTrump)), 7), # Game NS.
+                   RubberResult(board, north(bid(4, Strain.Spade)), 10)]  # Game NS.
+        rubber = Rubber()
+        expected = [(0, Vulnerable.Nil), (0, Vulnerable.Nil), (1, Vulnerable.EastWest),
+                    (1, Vulnerable.EastWest), (1, Vulnerable.EastWest),
+                    (2, Vulnerable.All), (3, Vulnerable.All)]
+        for result, (games, vulnerable) in zip(results, expected):
+            rubber.append(result)
+            self.assertEqual((len(rubber.games), rubber.vulnerable), (games, vulnerable))
+            self.assertEqual(rubber.winner, None if games < 3 else
+                             (Direction.North, Direction.South))
+        self.assertEqual(rubber.games[0], (results[:3], (Direction.East, Direction.West)))
+        self.assertEqual(rubber.games[1], (results[3:6], (Direction.North, Direction.South)))
+        self.assertEqual(rubber.currentGame, [])
+
+        self.assertEqual(rubber.pop(), results[-1])
+        self.assertEqual(rubber.winner, None)
+        rubber.pop()
+        self.assertEqual(rubber.below, [80, 0])
+        self.assertEqual(rubber.currentGame, results[3:5])
+
+        duplicate = copy.copy(rubber)
+        self.assertEqual((duplicate.games, duplicate.below, duplicate.vulnerable),
+                         (rubber.games, rubber.below, rubber.vulnerable))
+
+
+    @unittest.skipIf(numpy is None, "NumPy not available")
+    def testScoreMany(self):
+        """Arrays of results are scored together"""
+        rng = random.Random(1)
+        cases = [(rng.randrange(-1, 35), rng.randrange(3), rng.randrange(2),
+                  rng.randrange(14)) for _ in range(1000)]
+        scores = scoreMany(*[numpy.array(column) for column in zip(*cases)])
+        bids = [Bid(level, strain) for level in Level for strain in Strain]
+        for (code, doubled, vulnerable, tricks), value in zip(cases, scores):
+            expected = code >= 0 and bidScore(bids[code], doubled, vulnerable, tricks) or 0
+            self.assertEqual(value, expected)
+        # Scalars are broadcast.
+        self.assertEqual(scoreMany([14, 18], UNDOUBLED, False, 10).tolist(), [430, 420])
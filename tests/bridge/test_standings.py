@@ -0,0 +1,56 @@
+import unittest
+
+from pybridge.games.bridge.call import Bid, Pass
+from pybridge.games.bridge.game import Bridge
+from pybridge.games.bridge.standings import Standings
+from pybridge.games.bridge.symbols import Level, Strain
+from pybridge.games.bridge.tournament import MitchellMovement, Tournament
+from pybridge.network.standings import LocalStandings
+
+
+class TestStandings(unittest.TestCase):
+
+
+    def testStandings(self):
+        """Pairs are ranked by score as scores change"""
+        standings = Standings({1: 50.0, 2: 62.5, 3: 40.0})
+        self.assertEqual(standings.top(2), [(2, 62.5), (1, 50.0)])
+        self.assertEqual([standings.rank(pair) for pair in (1, 2, 3)], [2, 1, 3])
+
+        standings.setScore(3, 62.5)  # Tied pairs share a rank.
+        self.assertEqual(standings.top(5), [(2, 62.5), (3, 62.5), (1, 50.0)])
+        self.assertEqual([standings.rank(pair) for pair in (1, 2, 3)], [3, 1, 1])
+
+        standings.removePair(2)
+        self.assertEqual(len(standings), 2)
+        self.assertNotIn(2, standings)
+        self.assertEqual(standings.top(1), [(3, 62.5)])
+        self.assertEqual(standings.rank(1), 2)
+
+
+    def testLocalStandings(self):
+        """Standings of a tournament are updated as boards are scored"""
+        tournament = Tournament(MitchellMovement(2), 1)
+        for table in range(2):
+            tournament.addTable(Bridge())
+        standings = LocalStandings(tournament)
+        self.events = events = []
+        standings.attach(self)
+
+        tournament.startRound()
+        for table, tricks in enumerate([10, 9]):
+            game = tournament.games[table]
+            game.start()
+            for call in [Bid(Level.Four, Strain.Spade), Pass(), Pass(), Pass()]:
+                game.makeCall(call, position=game.getTurn())
+            game.acceptClaim(tricks, game.play.declarer)
+            if table == 0:  # The board is scored only when complete.
+                self.assertEqual(events, [])
+        self.assertEqual(sorted(pair for pair, _ in events), [1, 2, 3, 4])
+        self.assertEqual(standings[1], {'points': 1, 'top': 1, 'percentage': 100.0})
+        self.assertEqual(standings.standings.top(2), [(1, 100.0), (4, 100.0)])
+        self.assertEqual(standings.standings.rank(2), 3)
+
+
+    def update(self, event, pair, info):
+        self.events.append((pair, info))
@@ -0,0 +1,161 @@
+import unittest
+
+from twisted.internet.task import Clock
+
+from pybridge.games.bridge.call import Bid, Pass
+from pybridge.games.bridge.game import Bridge
+from pybridge.games.bridge.symbols import Direction, Level, Strain
+from pybridge.games.bridge.tournament import HowellMovement, MitchellMovement, \
+                                             Tournament
+from pybridge.network.error import GameError
+
+
+class TestTournament(unittest.TestCase):
+
+
+    def setUp(self):
+        self.clock = Clock()
+        self.tournament = Tournament(MitchellMovement(3), 2, roundTime=600,
+                                     clock=self.clock)
+        self.events = []
+        self.tournament.attach(self)
+        for table in range(3):
+            self.tournament.addTable(Bridge())
+
+
+    def update(self, event, **kwargs):
+        self.events.append((event, kwargs))
+
+
+    def playBoard(self, table, tricks):
+        """Plays the next board at table, in 4 Spades by the dealer, which is
+        claimed for tricks.
+        """
+        game = self.tournament.games[table]
+        game.start()
+        for call in [Bid(Level.Four, Strain.Spade), Pass(), Pass(), Pass()]:
+            game.makeCall(call, position=game.getTurn())
+        game.acceptClaim(tricks, game.play.declarer)
+
+
+    def testMovements(self):
+        """Movements seat every pair once in each round, against new opponents"""
+        for movement in (MitchellMovement(5), HowellMovement(4)):
+            met = set()
+            for round in range(movement.rounds):
+                seated = [pair for table in range(movement.tables)
+                          for pair in movement.seating(round, table)]
+                self.assertEqual(sorted(seated), list(range(1, movement.pairs + 1)))
+                for table in range(movement.tables):
+                    pairs = frozenset(movement.seating(round, table))
+                    self.assertNotIn(pairs, met)
+                    met.add(pairs)
+        self.assertEqual(len(met), 4 * 7)  # Every pair of the Howell meets every other.
+        self.assertRaises(ValueError, MitchellMovement, 3, 4)
+
+
+    def testRounds(self):
+        """Every table plays the same boards, which are scored when complete"""
+        tournament = self.tournament
+        self.assertRaises(GameError, tournament.addTable, Bridge())
+        tournament.startRound()
+        boards = [[board['deal'] for board in game.boardQueue] for game in tournament.games]
+        self.assertEqual(boards, [[tournament.boards[0]['deal'], tournament.boards[1]['deal']]] * 3)
+
+        for table, tricks in enumerate([10, 11, 9]):
+            self.playBoard(table, tricks)
+        self.assertEqual(tournament.matchpoints[0], [1, 2, 0])
+        self.assertEqual(tournament.matchpoints[1], None)
+        self.assertEqual(tournament.totals[1], [1, 2])
+        self.assertEqual(tournament.totals[6], [2, 2])  # East-West at table 3.
+
+        # Tables may not play beyond the boards of the round.
+        for table, tricks in enumerate([10, 10, 10]):
+            self.playBoard(table, tricks)
+        self.assertFalse(tournament.games[0].isNextGameReady())
+        self.assertRaises(GameError, tournament.games[0].start)
+        self.assertTrue(tournament.isRoundComplete())
+        self.assertEqual([event for event, _ in self.events],
+                         ['startRound', 'scoreBoard', 'scoreBoard', 'endRound'])
+        self.assertEqual(tournament.percentage(1), 50.0)
+        self.assertEqual(tournament.timeRemaining(), None)
+
+        # East-West pairs move up a table.
+        tournament.startRound()
+        self.playBoard(0, 10)
+        self.assertEqual(tournament.results[2], [(1, 6, 420)])
+
+
+    def testTimeLimit(self):
+        """Unfinished boards are scored when time runs out"""
+        tournament = self.tournament
+        tournament.startRound()
+        self.clock.advance(100)
+        self.assertEqual(tournament.timeRemaining(), 500)
+        self.assertRaises(GameError, tournament.startRound)
+
+        self.playBoard(0, 10)
+        self.playBoard(1, 9)
+        self.playBoard(0, 10)
+        game = tournament.games[1]
+        game.start()  # In play when time runs out.
+        self.clock.advance(500)
+        self.assertTrue(tournament.isRoundComplete())
+        # Neuberg: a board played at 2 of 3 tables, scaled to a top of 2.
+        self.assertEqual(tournament.matchpoints[0], [1.75, 0.25])
+        self.assertEqual(tournament.matchpoints[1], [1])
+        self.assertEqual(tournament.games[2].boardQueue, [])
+
+        # Boards finished late are not scored, and no more boards are played.
+        for call in [Pass(), Pass(), Pass(), Pass()]:
+            game.makeCall(call, position=game.getTurn())
+        self.assertEqual(len(game.results), 2)
+        self.assertEqual(len(tournament.results[1]), 1)
+        self.assertRaises(GameError, game.start)
+        tournament.startRound()
+        self.assertEqual(tournament.round, 1)
+
+
+    def testTimeLimitBeforeResults(self):
+        """Boards which no table finished are scored without awards"""
+        tournament = self.tournament
+        tournament.startRound()
+        self.clock.advance(600)
+        self.assertTrue(tournament.isRoundComplete())
+        self.assertEqual(tournament.matchpoints[:2], [[], []])
+        self.assertEqual(tournament.totals[1], [0, 0])
+        self.assertEqual([event for event, _ in self.events],
+                         ['startRound', 'scoreBoard', 'scoreBoard', 'endRound'])
+        tournament.startRound()
+        self.assertEqual(tournament.round, 1)
+
+
+    def testPairNames(self):
+        """Pairs are entered by the users seated in the first round"""
+
+        class User:
+            def __init__(self, name):
+                self.name = name
+
+        tournament = Tournament(MitchellMovement(2), 1)
+        seats = [{}, {}]
+        for table in range(2):
+            tournament.addTable(Bridge(), seats[table])
+        self.assertRaises(GameError, tournament.startRound)  # Seats are empty.
+
+        for table, names in enumerate(['abcd', 'efgh']):
+            for position, name in zip(Direction, names):
+                seats[table][position] = User(name)
+        tournament.startRound()
+        self.assertEqual(tournament.pairNames,
+                         {1: ('a', 'c'), 2: ('e', 'g'), 3: ('b', 'd'), 4: ('f', 'h')})
+        tournament.endRound()
+
+        # East-West pairs must move up a table.
+        self.assertRaises(GameError, tournament.startRound)
+        seats[0][Direction.East], seats[1][Direction.East] = \
+            seats[1][Direction.East], seats[0][Direction.East]
+        seats[0][Direction.West], seats[1][Direction.West] = \
+            seats[1][Direction.West], seats[0][Direction.West]
+        tournament.startRound()
+        self.assertEqual(tournament.round, 1)